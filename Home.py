@@ -9,7 +9,7 @@ Aplicación principal con sistema de login
 
 import streamlit as st
 import streamlit_authenticator as stauth
-from utils.config import APP_TITLE, APP_VERSION, validate_config
+from utils.config import APP_TITLE, APP_VERSION, OPENAI_API_KEY, validate_config
 import yaml
 from yaml.loader import SafeLoader
 
@@ -27,10 +27,15 @@ st.set_page_config(
 # VALIDAR CONFIGURACIÓN
 # ============================================
 if not validate_config():
-    st.error("⚠️ Por favor configura el archivo .env con tu OPENAI_API_KEY")
-    st.info("Copia .env.example a .env y agrega tu API key de OpenAI")
+    st.error("⚠️ Por favor revisa la configuración del archivo .env")
     st.stop()
 
+if not OPENAI_API_KEY:
+    st.info(
+        "ℹ️ Sin OPENAI_API_KEY los análisis con IA están desactivados. Copia env.example a .env y agrega "
+        "tu API key, o define OPENAI_API_BASE para usar el servidor local (`python -m utils.mock_llm_server`)"
+    )
+
 # ============================================
 # SISTEMA DE LOGIN SIMPLE
 # ============================================
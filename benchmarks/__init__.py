@@ -0,0 +1,6 @@
+"""
+Benchmarks end-to-end del pipeline (scraping, ingestión, features, métricas,
+gráficos y reportes) sobre fixtures sintéticos de varios tamaños.
+
+    python -m benchmarks.run --sizes small,medium --compare
+"""
@@ -0,0 +1,257 @@
+"""
+============================================
+CASOS DE BENCHMARK
+============================================
+
+Cada caso recibe los fixtures de un tamaño y devuelve la función a medir
+(sin argumentos) y el número de elementos que procesa. La preparación
+(construir entradas, archivos temporales) queda fuera de la medición. Los
+casos que reservan recursos (ej: un servidor local) devuelven además una
+función de limpieza, que el runner llama al terminar de medir.
+
+Un caso que no puede ejecutarse en el entorno (ej: falta python-docx)
+lanza SkipBenchmark con el motivo.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+from utils import analytics
+from utils.llm_cache import LLMResponseCache
+from utils.mock_llm_server import MockBehavior, start_mock_server
+from utils.openai_helper import LLMClient
+from utils.pdf_generator import PDFReportGenerator
+from utils.simple_parser import process_text_file
+from utils.visualizations import AdvancedVisualizations
+
+# Registro: nombre -> función de preparación
+BENCHMARKS = {}
+
+
+class SkipBenchmark(Exception):
+    """El caso no puede ejecutarse en este entorno"""
+
+
+def benchmark(name):
+    """Registra una función de preparación con el nombre dado"""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def _team_data_module():
+    """utils.process_team_data (requiere python-docx)"""
+    try:
+        from utils import process_team_data
+    except ImportError as e:
+        raise SkipBenchmark(f"python-docx no instalado ({e})")
+    return process_team_data
+
+
+# ============================================
+# SCRAPING (PARSEO HTML)
+# ============================================
+
+@benchmark('scraper.box_scores')
+def _box_scores(fx):
+    scraper, urls = fx['scraper'], fx['box_score_urls']
+    return (lambda: [scraper.get_box_score_data(url) for url in urls]), len(urls)
+
+
+@benchmark('scraper.schedule')
+def _schedule(fx):
+    scraper = fx['scraper']
+    return scraper.get_irvine_matches, 1
+
+
+# ============================================
+# INGESTIÓN DE TEXTO
+# ============================================
+
+@benchmark('ingest.simple_parser')
+def _simple_parser(fx):
+    team_texts = fx['team_texts']
+    return (lambda: [process_text_file(text, team) for team, text in team_texts]), len(fx['matches'])
+
+
+@benchmark('ingest.word_document')
+def _word_document(fx):
+    process_team_data = _team_data_module()
+    from docx import Document
+
+    doc = Document()
+    for line in fx['document'].split('\n'):
+        doc.add_paragraph(line)
+    path = Path(tempfile.mkdtemp(prefix='bench_docx_')) / 'equipos.docx'
+    doc.save(path)
+
+    return (lambda: process_team_data.process_word_document(str(path))), len(fx['matches'])
+
+
+@benchmark('features.add_advanced_features')
+def _advanced_features(fx):
+    process_team_data = _team_data_module()
+    raw = fx['raw_matches']
+    return (lambda: process_team_data.add_advanced_features(raw.copy())), len(raw)
+
+
+# ============================================
+# MÉTRICAS MULTI-TEAM
+# ============================================
+
+def _metric_case(name, block, frame='matches'):
+    """Registra un bloque de utils.analytics aplicado a un fixture"""
+    @benchmark(f'metrics.{name}')
+    def setup(fx):
+        df = fx[frame]
+        return (lambda: block(df)), len(df)
+    return setup
+
+
+_metric_case('win_rate_by_season', analytics.win_rate_by_season)
+_metric_case('home_away_split', analytics.home_away_split)
+_metric_case('goals_per_game', analytics.goals_per_game)
+_metric_case('monthly_performance', analytics.monthly_performance)
+_metric_case('november_decline', analytics.november_decline)
+_metric_case('academic_performance', analytics.academic_performance)
+_metric_case('home_advantage_table', analytics.home_advantage_table)
+
+
+@benchmark('metrics.opponent_quality_impact')
+def _opponent_quality(fx):
+    df_rated, bins = fx['df_rated'], fx['quality_bins']
+    return (lambda: analytics.opponent_quality_impact(df_rated, *bins)), len(df_rated)
+
+
+@benchmark('metrics.compute_scope_metrics')
+def _scope_metrics(fx):
+    df, df_rated, bins = fx['matches'], fx['df_rated'], fx['quality_bins']
+    return (lambda: analytics.compute_scope_metrics(df, df_rated, bins, n_boot=200, n_perm=200)), len(df)
+
+
+# ============================================
+# GRÁFICOS
+# ============================================
+
+@benchmark('figures.advanced_visualizations')
+def _figures(fx):
+    viz = AdvancedVisualizations()
+    df = fx['matches']
+    win_rate = analytics.win_rate_by_season(df)
+    monthly = analytics.monthly_performance(df)
+    matrix = monthly.pivot(index='Equipo', columns='Mes', values='Win %').fillna(0)
+
+    teams = win_rate.groupby('Equipo')['Win %'].mean()
+    radar = {team: {'Win %': value, 'Local': value, 'Visitante': value} for team, value in teams.head(4).items()}
+    first, second = list(radar)[:2]
+
+    def build():
+        return [
+            viz.create_radar_chart(first, radar[first]),
+            viz.create_multi_radar(radar),
+            viz.create_comparison_bar(first, radar[first], second, radar[second]),
+            viz.create_heatmap(matrix.values, list(matrix.columns), list(matrix.index)),
+            viz.create_timeline_chart(win_rate, 'Temporada', 'Win %'),
+            viz.create_scatter_plot(win_rate, 'Total', 'Win %', color_col='Equipo'),
+            viz.create_box_plot(win_rate, 'Win %', x_col='Temporada'),
+            viz.create_pie_chart(['W', 'L', 'T'], df['resultado_code'].value_counts().reindex(['W', 'L', 'T']).tolist()),
+        ]
+
+    return build, 8
+
+
+# ============================================
+# REPORTES PDF
+# ============================================
+
+@benchmark('reports.generate_full_report')
+def _pdf_report(fx):
+    # Mismo armado de stored_data que la página de Reports
+    scraper = fx['scraper']
+    players = {}
+    for i, url in enumerate(fx['box_score_urls']):
+        box = scraper.get_box_score_data(url)
+        roster = next(iter(box['rosters'].values()))
+        for player in roster:
+            players[f"{player['nombre']} #{i}"] = {
+                'goles': int(player['g']), 'asistencias': int(player['a']), 'tiros': int(player['sh']),
+                'amarillas': 0, 'rojas': 0,
+            }
+    stored_data = {
+        'total_goals': sum(p['goles'] for p in players.values()),
+        'total_cards': len(fx['box_score_urls']),
+        'players': players,
+    }
+
+    # generate_full_report escribe en ./outputs: se ejecuta en una carpeta temporal
+    work_dir = tempfile.mkdtemp(prefix='bench_pdf_')
+
+    def build():
+        previous = os.getcwd()
+        os.chdir(work_dir)
+        try:
+            return PDFReportGenerator(filename="benchmark.pdf").generate_full_report(dict(stored_data))
+        finally:
+            os.chdir(previous)
+
+    return build, len(players)
+
+
+# ============================================
+# CLIENTE IA (SERVIDOR MOCK LOCAL)
+# ============================================
+
+# Latencia fija del servidor mock por petición (segundos)
+MOCK_LATENCY = 0.02
+
+
+def _mock_client(behavior, max_concurrency=4):
+    """
+    LLMClient contra un servidor mock nuevo, con caché vacía en una carpeta temporal
+
+    Returns:
+        tuple: (cliente, función de limpieza que cierra el servidor y la sesión HTTP)
+    """
+    server = start_mock_server(behavior)
+    cache = LLMResponseCache(Path(tempfile.mkdtemp(prefix='bench_llm_')) / 'cache.sqlite')
+    client = LLMClient(api_key='sk-local', api_base=server.api_base, max_concurrency=max_concurrency,
+                       backoff=0.01, cache=cache)
+
+    def teardown():
+        client.session.close()
+        server.shutdown()
+        server.server_close()
+
+    return client, teardown
+
+
+def _team_requests(fx):
+    """Una petición por equipo (mismo tamaño que los fixtures)"""
+    return {
+        team: {'messages': [{'role': 'user', 'content': f"Analiza a {team}"}], 'max_tokens': 200}
+        for team, _ in fx['team_texts']
+    }
+
+
+@benchmark('llm.complete_many')
+def _llm_complete_many(fx):
+    client, teardown = _mock_client(MockBehavior(latency=MOCK_LATENCY))
+    requests = _team_requests(fx)
+    return (lambda: list(client.complete_many(requests, use_cache=False))), len(requests), teardown
+
+
+@benchmark('llm.cache_hits')
+def _llm_cache_hits(fx):
+    client, teardown = _mock_client(MockBehavior(latency=MOCK_LATENCY))
+    requests = _team_requests(fx)
+    list(client.complete_many(requests))
+    return (lambda: list(client.complete_many(requests))), len(requests), teardown
+
+
+@benchmark('llm.retries')
+def _llm_retries(fx):
+    client, teardown = _mock_client(MockBehavior(latency=MOCK_LATENCY, error_rate=0.2, retry_after=0.01, seed=7))
+    requests = _team_requests(fx)
+    return (lambda: list(client.complete_many(requests, use_cache=False))), len(requests), teardown
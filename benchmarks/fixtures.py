@@ -0,0 +1,110 @@
+"""
+============================================
+FIXTURES DE BENCHMARK
+============================================
+
+Datos fijos (semilla constante) para cada tamaño de benchmark, generados
+con utils.synthetic_data: partidos con el esquema del CSV multi-equipo,
+texto del documento de equipos y HTML de calendario/box score.
+"""
+
+import re
+from functools import lru_cache
+
+import numpy as np
+from bs4 import BeautifulSoup
+
+from utils.ratings import EloRatingEngine, add_rating_features
+from utils.analytics import opponent_quality_thresholds
+from utils.scraper_3c2a import Scraper3C2A
+from utils.synthetic_data import (
+    generate_matches, render_box_score_html, render_schedule_html, render_team_document_text, to_raw_matches
+)
+
+# Semilla fija de todos los fixtures
+FIXTURE_SEED = 2024
+
+# Tamaños: equipos, temporadas, partidos por temporada y box scores
+SIZES = {
+    'small': {'n_teams': 8, 'n_seasons': 3, 'games_per_season': 12, 'n_box_scores': 10},
+    'medium': {'n_teams': 40, 'n_seasons': 5, 'games_per_season': 20, 'n_box_scores': 50},
+    'large': {'n_teams': 200, 'n_seasons': 10, 'games_per_season': 30, 'n_box_scores': 200},
+}
+
+BASE_URL = "https://3c2asports.org"
+
+
+class FixtureScraper(Scraper3C2A):
+    """
+    Scraper3C2A que lee páginas de un diccionario en vez de la red
+
+    El parseo (BeautifulSoup + extractores) es el mismo que en producción.
+    """
+
+    def __init__(self, pages):
+        """
+        Args:
+            pages (dict): {url: html}
+        """
+        super().__init__()
+        self.pages = pages
+
+    def _get_soup(self, url):
+        html = self.pages.get(url)
+        return BeautifulSoup(html, 'html.parser') if html is not None else None
+
+
+@lru_cache(maxsize=None)
+def load_fixture(size):
+    """
+    Construye (una vez por proceso) los fixtures de un tamaño
+
+    Args:
+        size (str): Clave de SIZES
+
+    Returns:
+        dict: matches, raw_matches, df_rated, quality_bins, document,
+              team_texts, scraper, box_score_urls, schedule_url
+    """
+    spec = SIZES[size]
+    matches = generate_matches(
+        spec['n_teams'], spec['n_seasons'], spec['games_per_season'], seed=FIXTURE_SEED
+    )
+
+    engine = EloRatingEngine().fit(matches)
+    df_rated = add_rating_features(matches, engine)
+
+    # Texto del documento dividido por equipo (entrada de simple_parser)
+    document = render_team_document_text(matches)
+    sections = re.split(r'===\s*([A-Z\s]+)\s*===', document)
+    team_texts = [(sections[i].strip(), sections[i + 1]) for i in range(1, len(sections), 2)]
+
+    # Páginas HTML servidas por FixtureScraper
+    rng = np.random.default_rng(FIXTURE_SEED)
+    sample = matches.iloc[rng.choice(len(matches), size=spec['n_box_scores'], replace=False)]
+    pages = {}
+    box_score_urls = []
+    for i, match in enumerate(sample.itertuples(index=False)):
+        url = f"{BASE_URL}/boxscore/{size}/{i:05d}"
+        pages[url] = render_box_score_html(match, rng)
+        box_score_urls.append(url)
+
+    first_team = matches['equipo'].iloc[0]
+    first_season = matches['temporada'].iloc[0]
+    team_season = matches[(matches['equipo'] == first_team) & (matches['temporada'] == first_season)]
+    schedule_url = f"{BASE_URL}/schedule/{size}"
+    pages[schedule_url] = render_schedule_html(team_season)
+    scraper = FixtureScraper(pages)
+    scraper.irvine_schedule_url = schedule_url
+
+    return {
+        'matches': matches,
+        'raw_matches': to_raw_matches(matches),
+        'df_rated': df_rated,
+        'quality_bins': opponent_quality_thresholds(df_rated),
+        'document': document,
+        'team_texts': team_texts,
+        'scraper': scraper,
+        'box_score_urls': box_score_urls,
+        'schedule_url': schedule_url,
+    }
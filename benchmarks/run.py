@@ -0,0 +1,238 @@
+"""
+============================================
+BENCHMARK RUNNER
+============================================
+
+Ejecuta los casos de benchmarks.cases sobre los fixtures de cada tamaño,
+escribe los resultados en JSON y los compara con un baseline guardado:
+
+    python -m benchmarks.run                              # small y medium
+    python -m benchmarks.run --sizes small,medium,large --repeat 7
+    python -m benchmarks.run --compare                    # falla si hay regresiones
+    python -m benchmarks.run --update-baseline            # guarda el baseline
+
+Los tiempos dependen de la máquina: el baseline de benchmarks/baseline.json
+solo es comparable en el mismo entorno. Se compara el mínimo de cada caso
+(el menos afectado por ruido del sistema) y se marca regresión si supera el
+baseline en más de --tolerance (relativo) y --min-delta-ms (absoluto, para
+ignorar ruido en casos muy rápidos).
+"""
+
+import argparse
+import contextlib
+import fnmatch
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from .cases import BENCHMARKS, SkipBenchmark
+from .fixtures import SIZES, load_fixture
+
+BENCHMARKS_DIR = Path(__file__).parent
+BASELINE_PATH = BENCHMARKS_DIR / "baseline.json"
+RESULTS_DIR = BENCHMARKS_DIR.parent / "outputs" / "benchmarks"
+
+DEFAULT_SIZES = ('small', 'medium')
+DEFAULT_TOLERANCE = 0.5
+DEFAULT_MIN_DELTA_MS = 5.0
+
+
+def time_case(fn, repeat=5, warmup=1):
+    """
+    Mide una función (salida estándar silenciada)
+
+    Args:
+        fn (callable): Función sin argumentos
+        repeat (int): Repeticiones medidas
+        warmup (int): Repeticiones previas sin medir
+
+    Returns:
+        list: Tiempos en segundos
+    """
+    timings = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(warmup):
+            fn()
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, pattern='*', repeat=5, warmup=1):
+    """
+    Ejecuta los casos que coinciden con el patrón en cada tamaño
+
+    Args:
+        sizes (tuple): Claves de SIZES
+        pattern (str): Patrón glob sobre el nombre del caso (ej: 'metrics.*')
+        repeat (int): Repeticiones medidas
+        warmup (int): Repeticiones previas sin medir
+
+    Returns:
+        dict: Resultados con metadatos del entorno y un registro por caso
+    """
+    results = []
+    for size in sizes:
+        with contextlib.redirect_stdout(io.StringIO()):
+            fixture = load_fixture(size)
+
+        for name, setup in BENCHMARKS.items():
+            if not fnmatch.fnmatch(name, pattern):
+                continue
+
+            key = f"{name}[{size}]"
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    fn, items, *teardown = setup(fixture)
+            except SkipBenchmark as e:
+                print(f"   ⏭️ {key}: {e}")
+                results.append({'key': key, 'name': name, 'size': size, 'status': 'skipped', 'reason': str(e)})
+                continue
+
+            try:
+                timings = time_case(fn, repeat, warmup)
+            finally:
+                for cleanup in teardown:
+                    cleanup()
+            median = statistics.median(timings)
+            record = {
+                'key': key,
+                'name': name,
+                'size': size,
+                'status': 'ok',
+                'items': items,
+                'repeat': repeat,
+                'median_ms': median * 1000,
+                'min_ms': min(timings) * 1000,
+                'max_ms': max(timings) * 1000,
+                'stdev_ms': statistics.stdev(timings) * 1000 if len(timings) > 1 else 0.0,
+                'items_per_s': items / median if median > 0 else None,
+            }
+            results.append(record)
+            print(f"   ⏱️ {key:<48} {record['median_ms']:>10.2f} ms  ({items:,} elementos)")
+
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'sizes': {size: SIZES[size] for size in sizes},
+        'results': results,
+    }
+
+
+def compare_to_baseline(current, baseline, tolerance=DEFAULT_TOLERANCE, min_delta_ms=DEFAULT_MIN_DELTA_MS):
+    """
+    Compara los tiempos mínimos con el baseline
+
+    Args:
+        current (dict): Resultado de run_benchmarks
+        baseline (dict): Resultado guardado
+        tolerance (float): Aumento relativo permitido (0.5 = +50%)
+        min_delta_ms (float): Aumento absoluto mínimo para contar como regresión
+
+    Returns:
+        list: Un registro por caso con baseline_ms, min_ms, ratio y status
+              ('regression', 'improvement', 'ok' o 'new')
+    """
+    reference = {r['key']: r for r in baseline.get('results', []) if r.get('status') == 'ok'}
+
+    comparison = []
+    for record in current['results']:
+        if record['status'] != 'ok':
+            continue
+        base = reference.get(record['key'])
+        if base is None:
+            comparison.append({'key': record['key'], 'min_ms': record['min_ms'], 'status': 'new'})
+            continue
+
+        ratio = record['min_ms'] / base['min_ms'] if base['min_ms'] > 0 else float('inf')
+        delta = record['min_ms'] - base['min_ms']
+        if ratio > 1 + tolerance and delta > min_delta_ms:
+            status = 'regression'
+        elif ratio < 1 / (1 + tolerance) and -delta > min_delta_ms:
+            status = 'improvement'
+        else:
+            status = 'ok'
+
+        comparison.append({
+            'key': record['key'],
+            'baseline_ms': base['min_ms'],
+            'min_ms': record['min_ms'],
+            'ratio': ratio,
+            'status': status,
+        })
+    return comparison
+
+
+# ============================================
+# LÍNEA DE COMANDOS
+# ============================================
+
+def main(argv=None):
+    """Punto de entrada: python -m benchmarks.run"""
+    parser = argparse.ArgumentParser(description="Benchmarks end-to-end del pipeline de Soccer Analytics")
+    parser.add_argument('--sizes', default=','.join(DEFAULT_SIZES), help=f"Tamaños ({', '.join(SIZES)})")
+    parser.add_argument('--filter', default='*', help="Patrón de casos (ej: 'metrics.*')")
+    parser.add_argument('--repeat', type=int, default=5, help="Repeticiones medidas por caso")
+    parser.add_argument('--warmup', type=int, default=1, help="Repeticiones de calentamiento")
+    parser.add_argument('--output', default=None, help="Archivo JSON de resultados")
+    parser.add_argument('--baseline', default=str(BASELINE_PATH), help="Baseline a comparar/actualizar")
+    parser.add_argument('--compare', action='store_true', help="Comparar con el baseline (exit 1 si hay regresiones)")
+    parser.add_argument('--update-baseline', action='store_true', help="Guardar los resultados como baseline")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help="Aumento relativo permitido")
+    parser.add_argument('--min-delta-ms', type=float, default=DEFAULT_MIN_DELTA_MS, help="Aumento absoluto mínimo")
+    args = parser.parse_args(argv)
+
+    sizes = [s.strip() for s in args.sizes.split(',') if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        parser.error(f"Tamaños desconocidos: {', '.join(unknown)}")
+
+    print(f"🏁 Benchmarks ({', '.join(sizes)}), {args.repeat} repeticiones")
+    current = run_benchmarks(sizes, args.filter, args.repeat, args.warmup)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"bench_{datetime.now():%Y%m%d_%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    exit_code = 0
+    baseline_path = Path(args.baseline)
+    if args.compare:
+        if not baseline_path.exists():
+            print(f"⚠️ No existe el baseline {baseline_path}")
+        else:
+            baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+            comparison = compare_to_baseline(current, baseline, args.tolerance, args.min_delta_ms)
+            current['comparison'] = comparison
+
+            print(f"\n📊 Comparación con el baseline ({baseline.get('created_at', '?')})")
+            icons = {'regression': '🔴', 'improvement': '🟢', 'ok': '⚪', 'new': '🆕'}
+            for row in comparison:
+                ratio = f"x{row['ratio']:.2f}" if 'ratio' in row else ''
+                print(f"   {icons[row['status']]} {row['key']:<48} {row['min_ms']:>10.2f} ms {ratio}")
+
+            regressions = [row for row in comparison if row['status'] == 'regression']
+            if regressions:
+                print(f"\n❌ {len(regressions)} regresiones (tolerancia +{args.tolerance:.0%})")
+                exit_code = 1
+            else:
+                print("\n✅ Sin regresiones")
+
+    output.write_text(json.dumps(current, indent=2, ensure_ascii=False), encoding='utf-8')
+    print(f"💾 Resultados: {output}")
+
+    if args.update_baseline:
+        baseline_path.write_text(json.dumps(current, indent=2, ensure_ascii=False), encoding='utf-8')
+        print(f"💾 Baseline actualizado: {baseline_path}")
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -122,8 +122,43 @@ with tab2:
                         for item in result.get('recomendaciones', []):
                             st.info(f"💡 {item}")
                     
+                    elif "Resumen de temporada" in analysis_type:
+                        season_data = {
+                            'equipo': 'Irvine Valley',
+                            'ultimo_partido': {
+                                'oponente': analysis_data['oponente'],
+                                'goles_favor': analysis_data['total_goles_irvine'],
+                                'goles_contra': analysis_data['total_goles_oponente'],
+                                'tarjetas': analysis_data['total_tarjetas_irvine']
+                            }
+                        }
+                        
+                        if 'scraped_matches' in st.session_state:
+                            df_matches = st.session_state['scraped_matches']
+                            season_data['partidos'] = int(len(df_matches))
+                            season_data['resultados'] = {
+                                str(k): int(v) for k, v in df_matches['resultado'].value_counts().items()
+                            }
+                        
+                        # El texto aparece a medida que llegan los tokens
+                        st.markdown("#### 📝 Resumen de temporada")
+                        st.write_stream(helper.generate_season_report(season_data, stream=True))
+                    
                     else:
-                        st.info("Este tipo de análisis estará disponible próximamente")
+                        opponent_data = {
+                            'nombre': analysis_data['oponente'],
+                            'goles_marcados': analysis_data['total_goles_oponente'],
+                            'tarjetas': analysis_data['total_tarjetas_oponente'],
+                            'goles': [g.get('play') for g in analysis_data.get('goles_oponente', [])]
+                        }
+                        team_data = {
+                            'nombre': 'Irvine Valley',
+                            'goles_marcados': analysis_data['total_goles_irvine'],
+                            'tarjetas': analysis_data['total_tarjetas_irvine']
+                        }
+                        
+                        st.markdown("#### 🎯 Recomendaciones tácticas")
+                        st.write_stream(helper.generate_tactical_recommendations(opponent_data, team_data, stream=True))
                     
                 except Exception as e:
                     st.error(f"❌ Error al generar análisis: {str(e)}")
@@ -10,8 +10,29 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from pathlib import Path
-import os
-import json
+from utils.figure_cache import figure_cache
+from utils.match_store import data_version, unique_matches
+from utils.trends import compute_rolling_form, ROLLING_METRICS
+from utils.ratings import EloRatingEngine, add_rating_features, compute_srs
+from utils.bootstrap import bootstrap_metrics, ci_error_bars
+from utils.permutation_tests import academic_periodization_tests
+from utils.outcome_model import get_outcome_model
+from utils.season_simulator import project_season
+from utils.head_to_head import HeadToHeadIndex, H2H_VALUES
+from utils.streaming_stats import StreamingMoments
+from utils.analytics import (
+    SOCCER_MONTHS, RATING_COLUMNS, win_rate_by_season, home_away_split, goals_per_game, monthly_performance,
+    november_decline, academic_performance, home_advantage_table,
+    opponent_quality_thresholds, opponent_quality_impact, read_artifact, read_selection_artifact
+)
+from utils.summary_grid import team_summary_table, sort_summary, paginate, render_summary_grid, SUMMARY_SORT_OPTIONS
+from utils.visualizations import AdvancedVisualizations, add_performance_bands
+from utils.openai_helper import OpenAIHelper, get_llm_client
+from utils.ai_digests import (
+    DigestStore, build_ai_context, build_section_request, start_background_digests, background_running,
+    PERIODIZATION_N_PERM, PERIODIZATION_SEED
+)
+from utils.config import OPENAI_API_KEY, OPENAI_MODEL, LLM_MAX_CONCURRENCY
 
 # ============================================
 # CONFIGURACIÓN DE PÁGINA
@@ -42,6 +63,82 @@ def load_multi_team_data():
     df = pd.read_csv(csv_path)
     return df
 
+@st.cache_data(show_spinner=False)
+def load_rolling_form(version, window, reset_each_season, _df):
+    """Forma reciente de todos los equipos (cacheada por versión de datos)"""
+    return compute_rolling_form(_df, window=window, reset_each_season=reset_each_season)
+
+@st.cache_data(show_spinner=False)
+def load_elo_ratings(version, _df):
+    """Ratings Elo pre-partido y ratings actuales (artefactos de utils.analytics si existen)"""
+    match_ratings = read_artifact('match_ratings', 'dataset', version=version)
+    current_ratings = read_artifact('elo_ratings', 'dataset', version=version)
+    if match_ratings is not None and current_ratings is not None and len(match_ratings) == len(_df):
+        return _df.assign(**{col: match_ratings[col].to_numpy() for col in RATING_COLUMNS}), current_ratings
+
+    engine = EloRatingEngine().fit(_df)
+    return add_rating_features(_df, engine), engine.current_ratings()
+
+@st.cache_data(show_spinner=False)
+def load_srs(version, by_season, _df):
+    """Simple Rating System por temporada o global (artefacto de utils.analytics si existe)"""
+    precomputed = read_artifact('srs_by_season' if by_season else 'srs_all', 'dataset', version=version)
+    if precomputed is not None:
+        return precomputed
+    return compute_srs(_df, by_season=by_season)
+
+@st.cache_data(show_spinner=False)
+def load_bootstrap_ci(version, teams, seasons, group_cols, n_boot, seed, _df):
+    """Intervalos bootstrap de la selección actual (cacheados por filtros y B/seed)"""
+    return bootstrap_metrics(_df, group_cols=group_cols, n_boot=n_boot, seed=seed)
+
+@st.cache_data(show_spinner=False)
+def load_periodization_tests(version, teams, seasons, n_perm, seed, _df):
+    """Tests de permutación de Academic Periodization (cacheados por filtros)"""
+    return academic_periodization_tests(_df, n_perm=n_perm, seed=seed)
+
+@st.cache_resource(show_spinner=False)
+def load_h2h_index(version, _df):
+    """Índice head-to-head (solo lectura, compartido entre sesiones por versión de datos)"""
+    return HeadToHeadIndex(_df)
+
+@st.cache_resource(show_spinner=False)
+def load_consistency_moments(version, _df):
+    """Estados de momentos por equipo-temporada-mes (se agregan por selección)"""
+    return StreamingMoments.from_frame(_df)
+
+@st.cache_data(show_spinner=False)
+def load_outcome_model(version, _df):
+    """Modelo multi-variable + validación cruzada (cacheado por versión de datos)"""
+    return get_outcome_model(_df)
+
+@st.cache_data(show_spinner=False)
+def load_season_projection(version, season, cutoff, n_sims, _df):
+    """Proyección Monte Carlo de la temporada (cacheada por versión, corte y simulaciones)"""
+    projection = project_season(_df, season=season, cutoff=cutoff, n_sims=n_sims)
+    return projection['standings'], projection['model'].parameters(), len(projection['remaining']), projection['model'].rho
+
+# ============================================
+# BANDAS DE RENDIMIENTO (ZONAS DE COLOR)
+# ============================================
+WIN_RATE_BANDS_LABELED = [
+    {'y0': 0, 'y1': 45, 'color': 'red', 'label': 'Necesita Mejorar', 'label_color': 'darkred'},
+    {'y0': 45, 'y1': 55, 'color': 'yellow', 'label': 'Regular', 'label_color': 'orange'},
+    {'y0': 55, 'y1': 100, 'color': 'green', 'label': 'Exitoso', 'label_color': 'darkgreen'},
+]
+
+WIN_RATE_BANDS = [
+    {'y0': 0, 'y1': 40, 'color': 'red'},
+    {'y0': 40, 'y1': 60, 'color': 'yellow'},
+    {'y0': 60, 'y1': 100, 'color': 'green'},
+]
+
+GOALS_BANDS = [
+    {'y0': 0, 'y1': 1.0, 'color': 'red'},
+    {'y0': 1.0, 'y1': 2.0, 'color': 'yellow'},
+    {'y0': 2.0, 'y1': 5.0, 'color': 'green'},
+]
+
 # ============================================
 # TÍTULO
 # ============================================
@@ -57,6 +154,8 @@ if df is None:
     st.info("📁 El archivo debe estar en: `data/multi_team_data_complete.csv`")
     st.stop()
 
+data_ver = data_version(df)
+
 # ============================================
 # INFORMACIÓN DEL DATASET
 # ============================================
@@ -131,6 +230,14 @@ with col_right:
     show_home_away = st.checkbox("Separar Local/Visitante", value=False)
     show_monthly = st.checkbox("Análisis Mensual", value=True)
     show_academic = st.checkbox("Correlación Académica", value=True)
+    show_ci = st.checkbox("Intervalos de confianza (bootstrap)", value=False)
+    
+    if show_ci:
+        col1, col2 = st.columns(2)
+        with col1:
+            n_boot = st.select_slider("Remuestreos (B):", options=[1000, 2000, 5000, 10000], value=2000)
+        with col2:
+            boot_seed = st.number_input("Semilla:", min_value=0, value=42, step=1)
 
 # Botón de actualizar
 st.markdown("---")
@@ -154,8 +261,24 @@ df_filtered = df[
     (df['temporada'].isin(selected_seasons))
 ].copy()
 
+def selection_metric(metric, compute):
+    """Tabla precalculada (python -m utils.analytics) para la selección; si no existe, se calcula aquí"""
+    table = read_selection_artifact(metric, data_ver, selected_teams, selected_seasons, all_seasons)
+    return table if table is not None else compute()
+
 st.success(f"✅ Analizando {len(df_filtered)} partidos de {len(selected_teams)} equipo(s) en {len(selected_seasons)} temporada(s)")
 
+# Intervalos de confianza bootstrap (por equipo y por equipo-temporada)
+if show_ci:
+    team_ci = load_bootstrap_ci(
+        data_ver, tuple(selected_teams), tuple(selected_seasons),
+        ('equipo',), n_boot, int(boot_seed), df_filtered
+    )
+    season_ci = load_bootstrap_ci(
+        data_ver, tuple(selected_teams), tuple(selected_seasons),
+        ('equipo', 'temporada'), n_boot, int(boot_seed), df_filtered
+    )
+
 # ============================================
 # GUARDAR EN SESSION STATE
 # ============================================
@@ -173,6 +296,10 @@ st.markdown("---")
 # ============================================
 st.markdown("## 📈 Resumen Rápido")
 
+# Tarjetas por fila y por página de la cuadrícula
+SUMMARY_GRID_COLUMNS = 4
+SUMMARY_PAGE_SIZE = 12
+
 # Función para determinar color según academic rank
 def get_academic_rank_color(rank):
     if rank == 1:
@@ -182,61 +309,38 @@ def get_academic_rank_color(rank):
     else:
         return "#f8d7da", "#721c24"  # Rojo claro, texto rojo oscuro
 
-cols = st.columns(len(selected_teams))
-
-for i, team in enumerate(selected_teams):
-    team_data = df_filtered[df_filtered['equipo'] == team]
-    
-    wins = len(team_data[team_data['resultado_code'] == 'W'])
-    losses = len(team_data[team_data['resultado_code'] == 'L'])
-    ties = len(team_data[team_data['resultado_code'] == 'T'])
-    total = len(team_data)
-    
-    win_pct = (wins / total * 100) if total > 0 else 0
-    
-    # Academic rank y color
-    academic_rank = team_data['team_academic_rank'].iloc[0]
-    bg_color, text_color = get_academic_rank_color(academic_rank)
-    
-    with cols[i]:
-        # Crear container con borde para cada equipo
-        with st.container():
-            st.markdown(f"""
-                <div style='
-                    padding: 20px;
-                    border-radius: 10px;
-                    border: 2px solid #e0e0e0;
-                    background-color: #f8f9fa;
-                    margin-bottom: 10px;
-                '>
-                    <h3 style='margin-top: 0; color: #1f77b4;'>{team}</h3>
-                </div>
-            """, unsafe_allow_html=True)
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.metric("Partidos", total)
-                st.metric("Victorias", wins, delta=f"{win_pct:.1f}%")
-            
-            with col2:
-                st.metric("Derrotas", losses)
-                st.metric("Empates", ties)
-            
-            # Academic rank con color según posición
-            st.markdown(f"""
-                <div style='
-                    padding: 10px;
-                    border-radius: 5px;
-                    background-color: {bg_color};
-                    color: {text_color};
-                    text-align: center;
-                    font-weight: bold;
-                    margin-top: 10px;
-                '>
-                    🎓 Academic Rank: #{academic_rank}
-                </div>
-            """, unsafe_allow_html=True)
+# Una sola tabla vectorizada y una sola cuadrícula HTML (no crece en elementos por equipo)
+df_summary = team_summary_table(df_filtered)
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    summary_sort = st.selectbox("Ordenar por:", options=list(SUMMARY_SORT_OPTIONS.keys()), key="summary_sort")
+with col2:
+    summary_top_k = st.number_input(
+        "Top K equipos:", min_value=1, max_value=max(1, len(df_summary)),
+        value=max(1, len(df_summary)), step=1, key="summary_top_k"
+    )
+
+df_summary = sort_summary(df_summary, summary_sort, top_k=int(summary_top_k))
+n_summary_pages = max(1, -(-len(df_summary) // SUMMARY_PAGE_SIZE))
+
+summary_page = 1
+if n_summary_pages > 1:
+    with col3:
+        summary_page = st.number_input(
+            f"Página (de {n_summary_pages}):", min_value=1, max_value=n_summary_pages,
+            value=1, step=1, key="summary_page"
+        )
+
+df_summary_page, _ = paginate(df_summary, int(summary_page), SUMMARY_PAGE_SIZE)
+
+st.markdown(
+    render_summary_grid(
+        df_summary_page, get_academic_rank_color,
+        columns=min(SUMMARY_GRID_COLUMNS, max(1, len(df_summary_page)))
+    ),
+    unsafe_allow_html=True
+)
 
 st.markdown("---")
 
@@ -246,11 +350,13 @@ st.markdown("---")
 st.markdown("## 📊 Visualizaciones Dinámicas")
 
 # Tabs para diferentes análisis
-tab1, tab2, tab3, tab4 = st.tabs([
+tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
     "📈 Win Rate Timeline",
     "🏠 Home vs Away",
     "⚽ Goals Analysis",
-    "📅 Monthly Performance"
+    "📅 Monthly Performance",
+    "📉 Forma Reciente",
+    "🤝 Head-to-Head"
 ])
 
 # ============================================
@@ -261,79 +367,55 @@ with tab1:
     st.markdown("Evolución del porcentaje de victorias a lo largo de las temporadas")
     
     # Calcular win rate por equipo y temporada
-    win_rate_data = []
+    df_win_rate = selection_metric('win_rate', lambda: win_rate_by_season(df_filtered))
     
-    for team in selected_teams:
-        team_data = df_filtered[df_filtered['equipo'] == team]
+    if len(df_win_rate) > 0:
         
-        for season in selected_seasons:
-            season_data = team_data[team_data['temporada'] == season]
-            
-            if len(season_data) > 0:
-                wins = len(season_data[season_data['resultado_code'] == 'W'])
-                total = len(season_data)
-                win_pct = (wins / total * 100) if total > 0 else 0
-                
-                win_rate_data.append({
-                    'Equipo': team,
-                    'Temporada': season,
-                    'Win %': win_pct,
-                    'Victorias': wins,
-                    'Total': total
-                })
-    
-    if win_rate_data:
-        df_win_rate = pd.DataFrame(win_rate_data)
-        
-        # Crear gráfico de líneas
-        fig_winrate = px.line(
-            df_win_rate,
-            x='Temporada',
-            y='Win %',
-            color='Equipo',
-            markers=True,
-            title='Evolución de Win Rate por Temporada',
-            labels={'Win %': 'Win Rate (%)', 'Temporada': 'Temporada'},
-            hover_data=['Victorias', 'Total']
-        )
-        
-        # Agregar bandas de color de fondo para zonas de rendimiento
-        # Zona ROJA (Necesita mejorar): 0-45%
-        fig_winrate.add_hrect(
-            y0=0, y1=45,
-            fillcolor="red", opacity=0.15,
-            layer="below", line_width=0,
-            annotation_text="Necesita Mejorar", 
-            annotation_position="left",
-            annotation=dict(font_size=10, font_color="darkred")
-        )
-        
-        # Zona AMARILLA (Regular): 45-55%
-        fig_winrate.add_hrect(
-            y0=45, y1=55,
-            fillcolor="yellow", opacity=0.15,
-            layer="below", line_width=0,
-            annotation_text="Regular", 
-            annotation_position="left",
-            annotation=dict(font_size=10, font_color="orange")
-        )
-        
-        # Zona VERDE (Exitoso): 55-100%
-        fig_winrate.add_hrect(
-            y0=55, y1=100,
-            fillcolor="green", opacity=0.15,
-            layer="below", line_width=0,
-            annotation_text="Exitoso", 
-            annotation_position="left",
-            annotation=dict(font_size=10, font_color="darkgreen")
-        )
+        if show_ci:
+            win_ci = ci_error_bars(season_ci, 'win_pct').rename(
+                columns={'equipo': 'Equipo', 'temporada': 'Temporada'}
+            )
+            df_win_rate = df_win_rate.merge(
+                win_ci[['Equipo', 'Temporada', 'ci_plus', 'ci_minus']],
+                on=['Equipo', 'Temporada'], how='left'
+            )
         
-        fig_winrate.update_traces(mode='lines+markers', line=dict(width=3), marker=dict(size=10))
-        fig_winrate.update_layout(
-            hovermode='x unified',
-            plot_bgcolor='rgba(0,0,0,0)',
-            height=500,
-            yaxis=dict(range=[0, 85])  # Ajustado para que quepa Fullerton (~77%)
+        def build_winrate_figure(data, options):
+            """Gráfico de líneas de win rate por temporada"""
+            error_bars = dict(error_y='ci_plus', error_y_minus='ci_minus') if options['show_ci'] else {}
+            fig = px.line(
+                data,
+                x='Temporada',
+                y='Win %',
+                color='Equipo',
+                markers=True,
+                title='Evolución de Win Rate por Temporada',
+                labels={'Win %': 'Win Rate (%)', 'Temporada': 'Temporada'},
+                hover_data=['Victorias', 'Total'],
+                **error_bars
+            )
+            
+            # Zonas: ROJA (Necesita mejorar), AMARILLA (Regular), VERDE (Exitoso)
+            add_performance_bands(fig, options['bands'])
+            
+            fig.update_traces(mode='lines+markers', line=dict(width=3), marker=dict(size=10))
+            fig.update_layout(
+                hovermode='x unified',
+                plot_bgcolor='rgba(0,0,0,0)',
+                height=options['height'],
+                yaxis=dict(range=options['yaxis_range'])
+            )
+            return fig
+        
+        fig_winrate = figure_cache.get_or_build(
+            'winrate', df_win_rate, build_winrate_figure,
+            options={
+                'bands': WIN_RATE_BANDS_LABELED,
+                'show_ci': show_ci,
+                'height': 500,
+                # Ajustado para que quepa Fullerton (~77%); con IC se muestra 0-100
+                'yaxis_range': [0, 100] if show_ci else [0, 85]
+            }
         )
         
         st.plotly_chart(fig_winrate, use_container_width=True)
@@ -344,6 +426,13 @@ with tab1:
                 df_win_rate.pivot(index='Temporada', columns='Equipo', values='Win %').round(1),
                 use_container_width=True
             )
+            
+            if show_ci:
+                st.markdown(f"**Intervalos de confianza 95% (bootstrap, B={n_boot}):**")
+                st.dataframe(
+                    ci_error_bars(season_ci, 'win_pct')[['equipo', 'temporada', 'estimate', 'ci_low', 'ci_high', 'n']].round(1),
+                    use_container_width=True
+                )
     else:
         st.warning("No hay suficientes datos para generar el gráfico")
 
@@ -355,82 +444,41 @@ with tab2:
     st.markdown("Comparación de win rate cuando juegan en casa vs fuera")
     
     # Calcular win rate por equipo y venue
-    home_away_data = []
+    df_home_away = selection_metric('home_away', lambda: home_away_split(df_filtered))
     
-    for team in selected_teams:
-        team_data = df_filtered[df_filtered['equipo'] == team]
-        
-        # Local (home_advantage = 1)
-        home_data = team_data[team_data['home_advantage'] == 1]
-        home_wins = len(home_data[home_data['resultado_code'] == 'W'])
-        home_total = len(home_data)
-        home_win_pct = (home_wins / home_total * 100) if home_total > 0 else 0
-        
-        # Visitante (home_advantage = 0)
-        away_data = team_data[team_data['home_advantage'] == 0]
-        away_wins = len(away_data[away_data['resultado_code'] == 'W'])
-        away_total = len(away_data)
-        away_win_pct = (away_wins / away_total * 100) if away_total > 0 else 0
-        
-        home_away_data.append({
-            'Equipo': team,
-            'Tipo': 'Local',
-            'Win %': home_win_pct,
-            'Victorias': home_wins,
-            'Total': home_total
-        })
-        
-        home_away_data.append({
-            'Equipo': team,
-            'Tipo': 'Visitante',
-            'Win %': away_win_pct,
-            'Victorias': away_wins,
-            'Total': away_total
-        })
-    
-    if home_away_data:
-        df_home_away = pd.DataFrame(home_away_data)
-        
-        # Crear gráfico de barras agrupadas
-        fig_home_away = px.bar(
-            df_home_away,
-            x='Equipo',
-            y='Win %',
-            color='Tipo',
-            barmode='group',
-            title='Win Rate: Local vs Visitante',
-            labels={'Win %': 'Win Rate (%)', 'Equipo': 'Equipo'},
-            hover_data=['Victorias', 'Total'],
-            color_discrete_map={'Local': '#2ecc71', 'Visitante': '#e74c3c'},
-            text='Win %'  # Agregar valores en las barras
-        )
-        
-        # Formatear texto en las barras (sin decimales)
-        fig_home_away.update_traces(texttemplate='%{text:.0f}%', textposition='outside')
-        
-        # Agregar bandas de color de fondo (mismos rangos que Tab 1)
-        fig_home_away.add_hrect(
-            y0=0, y1=40,
-            fillcolor="red", opacity=0.15,
-            layer="below", line_width=0
-        )
-        
-        fig_home_away.add_hrect(
-            y0=40, y1=60,
-            fillcolor="yellow", opacity=0.15,
-            layer="below", line_width=0
-        )
-        
-        fig_home_away.add_hrect(
-            y0=60, y1=100,
-            fillcolor="green", opacity=0.15,
-            layer="below", line_width=0
-        )
+    if len(df_home_away) > 0:
+        
+        def build_home_away_figure(data, options):
+            """Gráfico de barras agrupadas Local vs Visitante"""
+            fig = px.bar(
+                data,
+                x='Equipo',
+                y='Win %',
+                color='Tipo',
+                barmode='group',
+                title='Win Rate: Local vs Visitante',
+                labels={'Win %': 'Win Rate (%)', 'Equipo': 'Equipo'},
+                hover_data=['Victorias', 'Total'],
+                color_discrete_map={'Local': '#2ecc71', 'Visitante': '#e74c3c'},
+                text='Win %'  # Agregar valores en las barras
+            )
+            
+            # Formatear texto en las barras (sin decimales)
+            fig.update_traces(texttemplate='%{text:.0f}%', textposition='outside')
+            
+            # Agregar bandas de color de fondo
+            add_performance_bands(fig, options['bands'])
+            
+            fig.update_layout(
+                plot_bgcolor='rgba(0,0,0,0)',
+                height=options['height'],
+                yaxis=dict(range=options['yaxis_range'])
+            )
+            return fig
         
-        fig_home_away.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            height=500,
-            yaxis=dict(range=[0, 75])
+        fig_home_away = figure_cache.get_or_build(
+            'home_away', df_home_away, build_home_away_figure,
+            options={'bands': WIN_RATE_BANDS, 'height': 500, 'yaxis_range': [0, 75]}
         )
         
         st.plotly_chart(fig_home_away, use_container_width=True)
@@ -440,14 +488,21 @@ with tab2:
         
         with col1:
             st.markdown("#### 🏠 Home Advantage Index")
+            if show_ci:
+                ha_ci = ci_error_bars(team_ci, 'home_advantage_index').set_index('equipo')
+            
             for team in selected_teams:
                 team_df = df_home_away[df_home_away['Equipo'] == team]
                 home_pct = team_df[team_df['Tipo'] == 'Local']['Win %'].values[0]
                 away_pct = team_df[team_df['Tipo'] == 'Visitante']['Win %'].values[0]
                 advantage = home_pct - away_pct
                 
+                ci_text = ""
+                if show_ci and team in ha_ci.index:
+                    ci_text = f" (IC 95%: {ha_ci.loc[team, 'ci_low']:+.1f}, {ha_ci.loc[team, 'ci_high']:+.1f})"
+                
                 color = "green" if advantage > 0 else "red"
-                st.markdown(f"**{team}:** :{'green' if advantage > 0 else 'red'}[{advantage:+.1f}%]")
+                st.markdown(f"**{team}:** :{'green' if advantage > 0 else 'red'}[{advantage:+.1f}%]{ci_text}")
         
         with col2:
             with st.expander("📋 Ver datos detallados"):
@@ -462,75 +517,42 @@ with tab3:
     st.markdown("### ⚽ Análisis de Goles")
     st.markdown("Goles a favor y en contra por equipo")
     
-    # Calcular goles totales por equipo
-    goals_data = []
+    # Calcular goles totales por equipo (orientados según el resultado)
+    df_goals = selection_metric('goals', lambda: goals_per_game(df_filtered))
     
-    for team in selected_teams:
-        team_data = df_filtered[df_filtered['equipo'] == team]
-        
-        total_goals_for = team_data['goals_for'].sum()
-        total_goals_against = team_data['goals_against'].sum()
-        games = len(team_data)
-        avg_goals_for = total_goals_for / games if games > 0 else 0
-        avg_goals_against = total_goals_against / games if games > 0 else 0
-        
-        goals_data.append({
-            'Equipo': team,
-            'Tipo': 'Goles a Favor',
-            'Promedio': avg_goals_for,
-            'Total': total_goals_for
-        })
-        
-        goals_data.append({
-            'Equipo': team,
-            'Tipo': 'Goles en Contra',
-            'Promedio': avg_goals_against,
-            'Total': total_goals_against
-        })
-    
-    if goals_data:
-        df_goals = pd.DataFrame(goals_data)
-        
-        # Gráfico de barras agrupadas
-        fig_goals = px.bar(
-            df_goals,
-            x='Equipo',
-            y='Promedio',
-            color='Tipo',
-            barmode='group',
-            title='Promedio de Goles por Partido',
-            labels={'Promedio': 'Goles por Partido', 'Equipo': 'Equipo'},
-            hover_data=['Total'],
-            color_discrete_map={'Goles a Favor': '#3498db', 'Goles en Contra': '#e74c3c'},
-            text='Promedio'  # Agregar valores en las barras
-        )
-        
-        # Formatear texto en las barras (1 decimal para goles)
-        fig_goals.update_traces(texttemplate='%{text:.1f}', textposition='outside')
-        
-        # Agregar bandas de color de fondo (basadas en goles por partido)
-        fig_goals.add_hrect(
-            y0=0, y1=1.0,
-            fillcolor="red", opacity=0.15,
-            layer="below", line_width=0
-        )
-        
-        fig_goals.add_hrect(
-            y0=1.0, y1=2.0,
-            fillcolor="yellow", opacity=0.15,
-            layer="below", line_width=0
-        )
-        
-        fig_goals.add_hrect(
-            y0=2.0, y1=5.0,
-            fillcolor="green", opacity=0.15,
-            layer="below", line_width=0
-        )
+    if len(df_goals) > 0:
+        
+        def build_goals_figure(data, options):
+            """Gráfico de barras agrupadas de goles por partido"""
+            fig = px.bar(
+                data,
+                x='Equipo',
+                y='Promedio',
+                color='Tipo',
+                barmode='group',
+                title='Promedio de Goles por Partido',
+                labels={'Promedio': 'Goles por Partido', 'Equipo': 'Equipo'},
+                hover_data=['Total'],
+                color_discrete_map={'Goles a Favor': '#3498db', 'Goles en Contra': '#e74c3c'},
+                text='Promedio'  # Agregar valores en las barras
+            )
+            
+            # Formatear texto en las barras (1 decimal para goles)
+            fig.update_traces(texttemplate='%{text:.1f}', textposition='outside')
+            
+            # Agregar bandas de color de fondo (basadas en goles por partido)
+            add_performance_bands(fig, options['bands'])
+            
+            fig.update_layout(
+                plot_bgcolor='rgba(0,0,0,0)',
+                height=options['height'],
+                yaxis=dict(range=options['yaxis_range'])
+            )
+            return fig
         
-        fig_goals.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            height=500,
-            yaxis=dict(range=[0, 4])
+        fig_goals = figure_cache.get_or_build(
+            'goals', df_goals, build_goals_figure,
+            options={'bands': GOALS_BANDS, 'height': 500, 'yaxis_range': [0, 4]}
         )
         
         st.plotly_chart(fig_goals, use_container_width=True)
@@ -562,82 +584,59 @@ with tab4:
     st.markdown("### 📅 Rendimiento Mensual - Academic Periodization")
     st.markdown("Análisis de rendimiento por mes para detectar efectos de periodos académicos")
     
-    # Calcular win rate por mes
-    monthly_data = []
-    
     # Orden de meses (SOLO temporada de soccer: Ago-Dic)
-    month_order = ['August', 'September', 'October', 'November', 'December']
+    month_order = SOCCER_MONTHS
     
-    for team in selected_teams:
-        team_data = df_filtered[df_filtered['equipo'] == team]
-        
-        for month in month_order:
-            month_data = team_data[team_data['mes'] == month]
+    # Calcular win rate por mes
+    df_monthly = selection_metric('monthly', lambda: monthly_performance(df_filtered, month_order))
+    
+    if len(df_monthly) > 0:
+        
+        def build_monthly_figure(data, options):
+            """Gráfico de líneas de rendimiento mensual con periodo de exámenes"""
+            fig = px.line(
+                data,
+                x='Mes',
+                y='Win %',
+                color='Equipo',
+                markers=True,
+                title='Rendimiento Mensual - Detección de Academic Periodization',
+                labels={'Win %': 'Win Rate (%)', 'Mes': 'Mes'},
+                hover_data=['Partidos'],
+                category_orders={'Mes': options['month_order']}
+            )
             
-            if len(month_data) > 0:
-                wins = len(month_data[month_data['resultado_code'] == 'W'])
-                total = len(month_data)
-                win_pct = (wins / total * 100) if total > 0 else 0
-                
-                monthly_data.append({
-                    'Equipo': team,
-                    'Mes': month,
-                    'Win %': win_pct,
-                    'Partidos': total
-                })
-    
-    if monthly_data:
-        df_monthly = pd.DataFrame(monthly_data)
-        
-        # Crear gráfico de líneas
-        fig_monthly = px.line(
-            df_monthly,
-            x='Mes',
-            y='Win %',
-            color='Equipo',
-            markers=True,
-            title='Rendimiento Mensual - Detección de Academic Periodization',
-            labels={'Win %': 'Win Rate (%)', 'Mes': 'Mes'},
-            hover_data=['Partidos'],
-            category_orders={'Mes': month_order}
-        )
-        
-        # Agregar bandas de color de fondo (mismos rangos que Tab 1)
-        fig_monthly.add_hrect(
-            y0=0, y1=40,
-            fillcolor="red", opacity=0.15,
-            layer="below", line_width=0
-        )
-        
-        fig_monthly.add_hrect(
-            y0=40, y1=60,
-            fillcolor="yellow", opacity=0.15,
-            layer="below", line_width=0
-        )
-        
-        fig_monthly.add_hrect(
-            y0=60, y1=100,
-            fillcolor="green", opacity=0.15,
-            layer="below", line_width=0
-        )
-        
-        # Agregar zona sombreada para periodos de exámenes (Oct final - Nov)
-        fig_monthly.add_vrect(
-            x0=2.5, x1=3.5,  # Final de October - November
-            fillcolor="orange", opacity=0.2,
-            layer="above", line_width=2,
-            line_dash="dash", line_color="red",
-            annotation_text="📚 Periodo de Exámenes", 
-            annotation_position="top left",
-            annotation=dict(font_size=12, font_color="darkred")
-        )
-        
-        fig_monthly.update_traces(mode='lines+markers', line=dict(width=3), marker=dict(size=10))
-        fig_monthly.update_layout(
-            hovermode='x unified',
-            plot_bgcolor='rgba(0,0,0,0)',
-            height=500,
-            yaxis=dict(range=[0, 75])
+            # Agregar bandas de color de fondo (mismos rangos que Tab 2)
+            add_performance_bands(fig, options['bands'])
+            
+            # Agregar zona sombreada para periodos de exámenes (Oct final - Nov)
+            fig.add_vrect(
+                x0=2.5, x1=3.5,  # Final de October - November
+                fillcolor="orange", opacity=0.2,
+                layer="above", line_width=2,
+                line_dash="dash", line_color="red",
+                annotation_text="📚 Periodo de Exámenes", 
+                annotation_position="top left",
+                annotation=dict(font_size=12, font_color="darkred")
+            )
+            
+            fig.update_traces(mode='lines+markers', line=dict(width=3), marker=dict(size=10))
+            fig.update_layout(
+                hovermode='x unified',
+                plot_bgcolor='rgba(0,0,0,0)',
+                height=options['height'],
+                yaxis=dict(range=options['yaxis_range'])
+            )
+            return fig
+        
+        fig_monthly = figure_cache.get_or_build(
+            'monthly', df_monthly, build_monthly_figure,
+            options={
+                'bands': WIN_RATE_BANDS,
+                'month_order': month_order,
+                'height': 500,
+                'yaxis_range': [0, 75]
+            }
         )
         
         st.plotly_chart(fig_monthly, use_container_width=True)
@@ -651,34 +650,15 @@ with tab4:
         """)
         
         # Calcular decline por equipo
-        decline_data = []
+        df_decline = selection_metric('november_decline', lambda: november_decline(df_filtered, df_monthly))
         
-        for team in selected_teams:
-            team_monthly = df_monthly[df_monthly['Equipo'] == team]
-            
-            # Octubre (antes)
-            oct_data = team_monthly[team_monthly['Mes'] == 'October']
-            oct_win = oct_data['Win %'].values[0] if len(oct_data) > 0 else 0
-            
-            # Noviembre (durante)
-            nov_data = team_monthly[team_monthly['Mes'] == 'November']
-            nov_win = nov_data['Win %'].values[0] if len(nov_data) > 0 else 0
-            
-            # Calcular decline
-            decline = oct_win - nov_win
-            
-            # Academic rank
-            academic_rank = df_filtered[df_filtered['equipo'] == team]['team_academic_rank'].iloc[0]
-            
-            decline_data.append({
-                'Equipo': team,
-                'Academic Rank': academic_rank,
-                'Octubre Win%': oct_win,
-                'Noviembre Win%': nov_win,
-                'Decline': decline
-            })
-        
-        df_decline = pd.DataFrame(decline_data)
+        if show_ci:
+            decline_ci = ci_error_bars(team_ci, 'november_decline').rename(
+                columns={'equipo': 'Equipo', 'ci_low': 'IC Inferior', 'ci_high': 'IC Superior'}
+            )
+            df_decline = df_decline.merge(
+                decline_ci[['Equipo', 'IC Inferior', 'IC Superior']], on='Equipo', how='left'
+            )
         
         col1, col2 = st.columns(2)
         
@@ -686,17 +666,234 @@ with tab4:
             st.markdown("**Decline en Noviembre:**")
             for _, row in df_decline.iterrows():
                 color = "red" if row['Decline'] > 0 else "green"
+                ci_text = ""
+                if show_ci and pd.notna(row['IC Inferior']):
+                    ci_text = f" (IC 95%: {row['IC Inferior']:+.1f}, {row['IC Superior']:+.1f})"
                 st.markdown(
                     f"**{row['Equipo']}** (Rank #{row['Academic Rank']}): "
-                    f":{color}[{row['Decline']:+.1f}%]"
+                    f":{color}[{row['Decline']:+.1f}%]{ci_text}"
                 )
         
         with col2:
             with st.expander("📋 Ver datos detallados"):
                 st.dataframe(df_decline, use_container_width=True)
+        
+        # Test de permutación: etiquetas de mes barajadas dentro de cada equipo-temporada
+        st.markdown("#### 🧪 Test de Permutación")
+        n_perm = st.select_slider(
+            "Permutaciones:", options=[1000, 5000, 10000, 20000, 50000], value=10000
+        )
+        df_tests = load_periodization_tests(
+            data_ver, tuple(selected_teams), tuple(selected_seasons), n_perm, 42, df_filtered
+        )
+        
+        if len(df_tests) > 0:
+            pooled_test = df_tests.iloc[0]
+            interaction_test = df_tests.iloc[-1]
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Decline Oct → Nov (global)", f"{pooled_test['estadistico']:+.1f}%")
+            with col2:
+                st.metric("p-valor (decline > 0)", f"{pooled_test['p_value']:.3f}")
+            with col3:
+                st.metric("Corr. Rank × Decline", f"{interaction_test['estadistico']:+.2f}",
+                          delta=f"p = {interaction_test['p_value']:.3f}", delta_color="off")
+            
+            if pooled_test['p_value'] < 0.05:
+                st.success("✅ El decline Octubre → Noviembre es estadísticamente significativo (p < 0.05)")
+            else:
+                st.warning("➡️ El decline Octubre → Noviembre no es significativo (p ≥ 0.05)")
+            
+            with st.expander("📋 Ver resultados de los tests"):
+                st.dataframe(df_tests.rename(columns={
+                    'prueba': 'Prueba',
+                    'equipo': 'Equipo',
+                    'estadistico': 'Estadístico',
+                    'efecto': 'Efecto (h / r)',
+                    'p_value': 'p-valor',
+                    'null_mean': 'Media nula',
+                    'null_std': 'Desv. nula',
+                    'n': 'Partidos / Unidades',
+                    'alternativa': 'Alternativa'
+                }).round(3), use_container_width=True)
+                st.caption(
+                    "Efecto: Cohen's h para el decline y correlación de Pearson (equipo-temporada) "
+                    "para la interacción con el ranking académico."
+                )
+        else:
+            st.info("No hay partidos de Octubre/Noviembre en la selección")
     else:
         st.warning("No hay suficientes datos para generar el gráfico")
 
+# ============================================
+# TAB 5: FORMA RECIENTE (ROLLING)
+# ============================================
+with tab5:
+    st.markdown("### 📉 Forma Reciente - Ventana Móvil")
+    st.markdown("Win rate, diferencia de goles y puntos por partido en los últimos N partidos")
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        rolling_window = st.slider("Partidos en la ventana (N):", min_value=3, max_value=10, value=5)
+    
+    with col2:
+        rolling_label = st.selectbox("Métrica:", options=list(ROLLING_METRICS.values()))
+        rolling_metric = {label: key for key, label in ROLLING_METRICS.items()}[rolling_label]
+    
+    with col3:
+        reset_each_season = st.checkbox("Reiniciar en cada temporada", value=True)
+    
+    # Se calcula para todos los equipos y luego se filtra
+    df_rolling = load_rolling_form(data_ver, rolling_window, reset_each_season, df)
+    df_rolling = df_rolling[
+        (df_rolling['equipo'].isin(selected_teams)) &
+        (df_rolling['temporada'].isin(selected_seasons))
+    ].reset_index(drop=True)
+    
+    if len(df_rolling) > 0:
+        # Número de partido dentro de la selección (eje X continuo por equipo)
+        df_rolling['Partido #'] = df_rolling.groupby('equipo').cumcount() + 1
+        
+        def build_rolling_figure(data, options):
+            """Gráfico de líneas de forma reciente"""
+            fig = px.line(
+                data,
+                x='Partido #',
+                y=options['metric'],
+                color='equipo',
+                title=f"Forma Reciente ({options['window']} partidos)",
+                labels={options['metric']: options['label'], 'equipo': 'Equipo'},
+                hover_data=['temporada', 'mes', 'oponente']
+            )
+            
+            if options['metric'] == 'rolling_win_pct':
+                add_performance_bands(fig, options['bands'])
+            else:
+                fig.add_hline(y=options['reference'], line_dash="dash", line_color="gray")
+            
+            fig.update_traces(line=dict(width=2))
+            fig.update_layout(
+                hovermode='x unified',
+                plot_bgcolor='rgba(0,0,0,0)',
+                height=options['height']
+            )
+            return fig
+        
+        fig_rolling = figure_cache.get_or_build(
+            'rolling', df_rolling, build_rolling_figure,
+            options={
+                'metric': rolling_metric,
+                'label': ROLLING_METRICS[rolling_metric],
+                'window': rolling_window,
+                'bands': WIN_RATE_BANDS,
+                'reference': 0 if rolling_metric == 'rolling_goal_diff' else 1.5,
+                'height': 500
+            }
+        )
+        
+        st.plotly_chart(fig_rolling, use_container_width=True)
+        
+        # Forma actual (último partido de cada equipo en la selección)
+        st.markdown("#### 🔥 Forma Actual")
+        df_current = df_rolling.groupby('equipo', sort=True).tail(1)
+        
+        with st.expander("📋 Ver datos detallados"):
+            st.dataframe(
+                df_current[['equipo', 'temporada', 'mes', 'oponente'] + list(ROLLING_METRICS.keys())]
+                .rename(columns={'equipo': 'Equipo', **ROLLING_METRICS})
+                .round(2),
+                use_container_width=True
+            )
+    else:
+        st.warning("No hay suficientes datos para generar el gráfico")
+
+# ============================================
+# TAB 6: HEAD-TO-HEAD
+# ============================================
+with tab6:
+    st.markdown("### 🤝 Head-to-Head vs Oponentes")
+    st.markdown("Rendimiento de cada equipo contra sus oponentes más frecuentes")
+    
+    h2h_index = load_h2h_index(data_ver, df)
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        h2h_label = st.selectbox("Valor:", options=list(H2H_VALUES.values()), key="h2h_value")
+        h2h_value = {label: key for key, label in H2H_VALUES.items()}[h2h_label]
+    
+    with col2:
+        h2h_top = st.slider("Oponentes (más frecuentes):", min_value=5, max_value=30, value=15, key="h2h_top")
+    
+    with col3:
+        h2h_min_games = st.slider("Partidos mínimos por par:", min_value=1, max_value=5, value=1, key="h2h_min")
+    
+    h2h_matrix = h2h_index.matrix(
+        selected_teams, selected_seasons, value=h2h_value,
+        min_games=h2h_min_games, top_opponents=h2h_top
+    )
+    
+    if h2h_matrix.size > 0:
+        def build_h2h_figure(data, options):
+            """Heatmap head-to-head (equipos x oponentes)"""
+            values = data.set_index('equipo')
+            text = values.round(options['decimals'])
+            fig = AdvancedVisualizations().create_heatmap(
+                text.astype(object).where(values.notna(), None).values.tolist(),
+                list(values.columns),
+                list(values.index),
+                title=f"Head-to-Head: {options['label']}"
+            )
+            fig.update_layout(height=options['height'], xaxis_tickangle=-45)
+            return fig
+        
+        fig_h2h = figure_cache.get_or_build(
+            'head_to_head', h2h_matrix.reset_index(), build_h2h_figure,
+            options={
+                'label': h2h_label,
+                'decimals': 0 if h2h_value in ('win_pct', 'partidos') else 2,
+                'height': 200 + 60 * len(h2h_matrix)
+            }
+        )
+        st.plotly_chart(fig_h2h, use_container_width=True)
+        
+        # Drill-down de un par (equipo, oponente)
+        st.markdown("#### 🔎 Detalle por Oponente")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            h2h_team = st.selectbox("Equipo:", options=selected_teams, key="h2h_team")
+        with col2:
+            h2h_opponent = st.selectbox(
+                "Oponente:", options=h2h_index.opponents(h2h_team, selected_seasons), key="h2h_opponent"
+            )
+        
+        if h2h_opponent:
+            pair_summary = h2h_index.summary([h2h_team], selected_seasons)
+            pair_summary = pair_summary[pair_summary['oponente'] == h2h_opponent].iloc[0]
+            
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Partidos", int(pair_summary['partidos']))
+            with col2:
+                st.metric("Récord (W-L-T)", f"{pair_summary['victorias']}-{pair_summary['derrotas']}-{pair_summary['empates']}")
+            with col3:
+                st.metric("Goles (GF-GC)", f"{pair_summary['goles_favor']}-{pair_summary['goles_contra']}")
+            with col4:
+                st.metric(f"Últimos {h2h_index.last_n}", pair_summary['ultimos'])
+            
+            st.dataframe(
+                h2h_index.matches(h2h_team, h2h_opponent, selected_seasons).rename(columns={
+                    'fecha': 'Fecha', 'temporada': 'Temporada', 'local_visitante': 'Condición',
+                    'resultado_code': 'Resultado', 'goles_favor': 'GF', 'goles_contra': 'GC'
+                }),
+                use_container_width=True
+            )
+    else:
+        st.warning("No hay enfrentamientos que cumplan los filtros")
+
 st.markdown("---")
 
 # ============================================
@@ -710,54 +907,55 @@ st.markdown("Análisis profundo de patrones y correlaciones")
 # ============================================
 with st.expander("📊 Opponent Quality Impact", expanded=False):
     st.markdown("### Impacto de la Calidad del Rival")
+    st.caption("Calidad del rival = rating Elo del oponente antes del partido (sin data leakage)")
     
-    # Calcular win rate por rangos de opponent quality
-    df_filtered['opp_quality_range'] = pd.cut(
-        df_filtered['opponent_quality'], 
-        bins=[0, 0.4, 0.5, 1.0], 
-        labels=['Débil (<0.4)', 'Medio (0.4-0.5)', 'Fuerte (>0.5)']
+    df_rated, df_current_ratings = load_elo_ratings(data_ver, df)
+    df_filtered['opponent_rating'] = df_rated.loc[df_filtered.index, 'opponent_rating']
+    
+    # Terciles de rating sobre todo el histórico (estables al cambiar filtros)
+    quality_bounds, quality_labels = opponent_quality_thresholds(df_rated)
+    
+    # Calcular win rate por rangos de calidad del rival
+    df_quality = selection_metric(
+        'opponent_quality', lambda: opponent_quality_impact(df_filtered, quality_bounds, quality_labels)
     )
     
-    quality_impact = []
-    for team in selected_teams:
-        team_data = df_filtered[df_filtered['equipo'] == team]
-        
-        for quality_range in ['Débil (<0.4)', 'Medio (0.4-0.5)', 'Fuerte (>0.5)']:
-            range_data = team_data[team_data['opp_quality_range'] == quality_range]
+    if len(df_quality) > 0:
+        
+        def build_quality_figure(data, options):
+            """Gráfico de barras de win rate según calidad del rival"""
+            fig = px.bar(
+                data,
+                x='Rival',
+                y='Win %',
+                color='Equipo',
+                barmode='group',
+                title='Win Rate según Calidad del Rival',
+                hover_data=['Partidos'],
+                text='Win %'  # Agregar valores en las barras
+            )
             
-            if len(range_data) > 0:
-                wins = len(range_data[range_data['resultado_code'] == 'W'])
-                total = len(range_data)
-                win_pct = (wins / total * 100) if total > 0 else 0
-                
-                quality_impact.append({
-                    'Equipo': team,
-                    'Rival': quality_range,
-                    'Win %': win_pct,
-                    'Partidos': total
-                })
-    
-    if quality_impact:
-        df_quality = pd.DataFrame(quality_impact)
+            # Formatear texto en las barras (sin decimales)
+            fig.update_traces(texttemplate='%{text:.0f}%', textposition='outside')
+            
+            fig.update_layout(height=options['height'])
+            return fig
         
-        fig_quality = px.bar(
-            df_quality,
-            x='Rival',
-            y='Win %',
-            color='Equipo',
-            barmode='group',
-            title='Win Rate según Calidad del Rival',
-            hover_data=['Partidos'],
-            text='Win %'  # Agregar valores en las barras
+        fig_quality = figure_cache.get_or_build(
+            'quality', df_quality, build_quality_figure, options={'height': 400}
         )
-        
-        # Formatear texto en las barras (sin decimales)
-        fig_quality.update_traces(texttemplate='%{text:.0f}%', textposition='outside')
-        
-        fig_quality.update_layout(height=400)
         st.plotly_chart(fig_quality, use_container_width=True)
         
         st.markdown("**Interpretación:** Equipos con mejor performance contra rivales fuertes son más competitivos.")
+    
+    st.markdown("**Ratings Elo actuales:**")
+    st.dataframe(
+        df_current_ratings[df_current_ratings['equipo'].isin(selected_teams)].style.format({
+            'rating': '{:.0f}',
+            'rd': '{:.0f}'
+        }),
+        use_container_width=True
+    )
 
 # ============================================
 # MÉTRICA 2: ACADEMIC RANK CORRELATION
@@ -766,61 +964,39 @@ with st.expander("🎓 Academic Rank vs Performance", expanded=False):
     st.markdown("### Correlación entre Ranking Académico y Rendimiento Deportivo")
     
     # Calcular win% promedio por equipo
-    academic_perf = []
-    for team in selected_teams:
-        team_data = df_filtered[df_filtered['equipo'] == team]
-        
-        wins = len(team_data[team_data['resultado_code'] == 'W'])
-        total = len(team_data)
-        win_pct = (wins / total * 100) if total > 0 else 0
+    df_academic = selection_metric('academic', lambda: academic_performance(df_filtered))
+    
+    def build_academic_figure(data, options):
+        """Scatter de ranking académico vs win rate"""
+        fig = px.scatter(
+            data,
+            x='Academic Rank',
+            y='Win %',
+            text='Equipo',
+            size='Partidos',
+            title='Ranking Académico vs Rendimiento Deportivo',
+            hover_data=['Partidos']
+        )
         
-        academic_rank = team_data['team_academic_rank'].iloc[0]
+        # Agregar bandas de color de fondo (horizontal - Win%)
+        add_performance_bands(fig, options['bands'], opacity=0.1)
         
-        academic_perf.append({
-            'Equipo': team,
-            'Academic Rank': academic_rank,
-            'Win %': win_pct,
-            'Partidos': total
-        })
-    
-    df_academic = pd.DataFrame(academic_perf)
-    
-    # Scatter plot
-    fig_academic = px.scatter(
-        df_academic,
-        x='Academic Rank',
-        y='Win %',
-        text='Equipo',
-        size='Partidos',
-        title='Ranking Académico vs Rendimiento Deportivo',
-        hover_data=['Partidos']
-    )
-    
-    # Agregar bandas de color de fondo (horizontal - Win%)
-    fig_academic.add_hrect(
-        y0=0, y1=40,
-        fillcolor="red", opacity=0.1,
-        layer="below", line_width=0
-    )
-    
-    fig_academic.add_hrect(
-        y0=40, y1=60,
-        fillcolor="yellow", opacity=0.1,
-        layer="below", line_width=0
-    )
-    
-    fig_academic.add_hrect(
-        y0=60, y1=100,
-        fillcolor="green", opacity=0.1,
-        layer="below", line_width=0
-    )
+        # Ajustar posición del texto y layout
+        fig.update_traces(textposition='top center', textfont=dict(size=10))
+        fig.update_layout(
+            height=options['height'],
+            yaxis=dict(range=options['yaxis_range']),
+            plot_bgcolor='rgba(0,0,0,0)'
+        )
+        return fig
     
-    # Ajustar posición del texto y layout
-    fig_academic.update_traces(textposition='top center', textfont=dict(size=10))
-    fig_academic.update_layout(
-        height=450,
-        yaxis=dict(range=[35, 60]),  # Rango ajustado para que Fullerton quepa
-        plot_bgcolor='rgba(0,0,0,0)'
+    fig_academic = figure_cache.get_or_build(
+        'academic', df_academic, build_academic_figure,
+        options={
+            'bands': WIN_RATE_BANDS,
+            'height': 450,
+            'yaxis_range': [35, 60]  # Rango ajustado para que Fullerton quepa
+        }
     )
     st.plotly_chart(fig_academic, use_container_width=True)
     
@@ -840,6 +1016,19 @@ with st.expander("🎓 Academic Rank vs Performance", expanded=False):
     with col2:
         st.markdown("**Hipótesis TFM:**")
         st.markdown("Los equipos con mejor ranking académico (IVC #1) experimentan más presión académica, afectando rendimiento deportivo.")
+    
+    # Test de permutación de la interacción (unidades equipo-temporada en vez de 4 puntos)
+    df_rank_tests = load_periodization_tests(
+        data_ver, tuple(selected_teams), tuple(selected_seasons), 10000, 42, df_filtered
+    )
+    if len(df_rank_tests) > 0:
+        interaction_test = df_rank_tests.iloc[-1]
+        st.markdown(
+            f"**Test de permutación (Academic Rank × Decline Oct → Nov):** "
+            f"r = {interaction_test['estadistico']:+.2f} sobre {interaction_test['n']} equipo-temporadas, "
+            f"p = {interaction_test['p_value']:.3f} (H1: mejor ranking → más decline)"
+        )
+        st.caption("La correlación de arriba usa un punto por equipo y es solo descriptiva.")
 
 # ============================================
 # MÉTRICA 3: CONSISTENCY SCORE
@@ -847,43 +1036,46 @@ with st.expander("🎓 Academic Rank vs Performance", expanded=False):
 with st.expander("📉 Consistency Score", expanded=False):
     st.markdown("### Consistencia de Rendimiento por Equipo")
     
-    consistency_data = []
-    for team in selected_teams:
-        team_data = df_filtered[df_filtered['equipo'] == team]
-        
-        # Calcular desviación estándar de goles
-        goals_std = team_data['goals_for'].std()
-        goals_mean = team_data['goals_for'].mean()
+    # Estados (count, mean, M2) por equipo-temporada-mes agregados a la selección
+    consistency_state = load_consistency_moments(data_ver, df).rollup(
+        ['equipo'], filters={'equipo': selected_teams, 'temporada': selected_seasons}
+    ).summary()
+    
+    df_consistency = pd.DataFrame({
+        'Equipo': consistency_state['equipo'],
+        'Goles Promedio': consistency_state['goals_for_mean'],
+        'Desviación Estándar': consistency_state['goals_for_std'],
+        'Coef. Variación (%)': consistency_state['goals_for_cv'],
+        'Volatilidad Resultados (pts)': consistency_state['points_std']
+    })
+    
+    def build_consistency_figure(data, options):
+        """Gráfico de barras del coeficiente de variación de goles"""
+        fig = px.bar(
+            data,
+            x='Equipo',
+            y='Coef. Variación (%)',
+            title='Consistencia de Goles (menor = más consistente)',
+            color='Coef. Variación (%)',
+            color_continuous_scale='RdYlGn_r',
+            text='Coef. Variación (%)'  # Agregar valores en las barras
+        )
         
-        # Coefficient of variation (CV)
-        cv = (goals_std / goals_mean * 100) if goals_mean > 0 else 0
+        # Formatear texto en las barras (sin decimales)
+        fig.update_traces(texttemplate='%{text:.0f}%', textposition='outside')
         
-        consistency_data.append({
-            'Equipo': team,
-            'Goles Promedio': goals_mean,
-            'Desviación Estándar': goals_std,
-            'Coef. Variación (%)': cv
-        })
-    
-    df_consistency = pd.DataFrame(consistency_data)
-    
-    # Gráfico de barras
-    fig_consistency = px.bar(
-        df_consistency,
-        x='Equipo',
-        y='Coef. Variación (%)',
-        title='Consistencia de Goles (menor = más consistente)',
-        color='Coef. Variación (%)',
-        color_continuous_scale='RdYlGn_r',
-        text='Coef. Variación (%)'  # Agregar valores en las barras
-    )
-    
-    # Formatear texto en las barras (sin decimales)
-    fig_consistency.update_traces(texttemplate='%{text:.0f}%', textposition='outside')
+        fig.update_layout(
+            height=options['height'],
+            yaxis=dict(range=options['yaxis_range'])
+        )
+        return fig
     
-    fig_consistency.update_layout(
-        height=400,
-        yaxis=dict(range=[0, 75])  # Ajustado para que los valores quepan arriba
+    fig_consistency = figure_cache.get_or_build(
+        'consistency', df_consistency, build_consistency_figure,
+        options={
+            'height': 400,
+            'yaxis_range': [0, max(75, df_consistency['Coef. Variación (%)'].max() * 1.2)]  # Ajustado para que los valores quepan arriba
+        }
     )
     st.plotly_chart(fig_consistency, use_container_width=True)
     
@@ -891,10 +1083,11 @@ with st.expander("📉 Consistency Score", expanded=False):
     st.dataframe(df_consistency.style.format({
         'Goles Promedio': '{:.2f}',
         'Desviación Estándar': '{:.2f}',
-        'Coef. Variación (%)': '{:.1f}'
+        'Coef. Variación (%)': '{:.1f}',
+        'Volatilidad Resultados (pts)': '{:.2f}'
     }), use_container_width=True)
     
-    st.markdown("**Interpretación:** Coeficiente de variación bajo indica equipo predecible y consistente.")
+    st.markdown("**Interpretación:** Coeficiente de variación bajo indica equipo predecible y consistente. La volatilidad de resultados es la desviación estándar de los puntos por partido.")
 
 # ============================================
 # MÉTRICA 4: HOME ADVANTAGE INDEX DETALLADO
@@ -902,62 +1095,52 @@ with st.expander("📉 Consistency Score", expanded=False):
 with st.expander("🏠 Home Advantage Index Detallado", expanded=False):
     st.markdown("### Ventaja de Jugar en Casa por Equipo")
     
-    home_adv_data = []
-    for team in selected_teams:
-        team_data = df_filtered[df_filtered['equipo'] == team]
-        
-        # Local
-        home_games = team_data[team_data['home_advantage'] == 1]
-        home_wins = len(home_games[home_games['resultado_code'] == 'W'])
-        home_total = len(home_games)
-        home_win_pct = (home_wins / home_total * 100) if home_total > 0 else 0
-        
-        # Visitante
-        away_games = team_data[team_data['home_advantage'] == 0]
-        away_wins = len(away_games[away_games['resultado_code'] == 'W'])
-        away_total = len(away_games)
-        away_win_pct = (away_wins / away_total * 100) if away_total > 0 else 0
-        
-        # Index
-        ha_index = home_win_pct - away_win_pct
-        
-        home_adv_data.append({
-            'Equipo': team,
-            'Local Win%': home_win_pct,
-            'Visitante Win%': away_win_pct,
-            'Home Advantage Index': ha_index,
-            'Partidos Local': home_total,
-            'Partidos Visitante': away_total
-        })
-    
-    df_home_adv = pd.DataFrame(home_adv_data)
+    df_home_adv = selection_metric('home_advantage', lambda: home_advantage_table(df_filtered))
     
     # Redondear Home Advantage Index para visualización limpia
     df_home_adv['Home Advantage Index'] = df_home_adv['Home Advantage Index'].round(0)
     
-    # Gráfico de índice
-    fig_ha_index = px.bar(
-        df_home_adv,
-        x='Equipo',
-        y='Home Advantage Index',
-        title='Home Advantage Index (diferencia Local - Visitante)',
-        color='Home Advantage Index',
-        color_continuous_scale='RdYlGn',
-        text='Home Advantage Index'  # Agregar valores en las barras
-    )
+    if show_ci:
+        ha_ci = ci_error_bars(team_ci, 'home_advantage_index').rename(columns={'equipo': 'Equipo'})
+        df_home_adv = df_home_adv.merge(ha_ci[['Equipo', 'ci_plus', 'ci_minus']], on='Equipo', how='left')
     
-    # Formatear texto en las barras (con signo +/-)
-    fig_ha_index.update_traces(texttemplate='%{text:+.0f}%', textposition='outside')
+    def build_ha_index_figure(data, options):
+        """Gráfico de barras del Home Advantage Index"""
+        error_bars = dict(error_y='ci_plus', error_y_minus='ci_minus') if options['show_ci'] else {}
+        fig = px.bar(
+            data,
+            x='Equipo',
+            y='Home Advantage Index',
+            title='Home Advantage Index (diferencia Local - Visitante)',
+            color='Home Advantage Index',
+            color_continuous_scale='RdYlGn',
+            text='Home Advantage Index',  # Agregar valores en las barras
+            **error_bars
+        )
+        
+        # Formatear texto en las barras (con signo +/-)
+        fig.update_traces(texttemplate='%{text:+.0f}%', textposition='outside')
+        
+        fig.add_hline(y=0, line_dash="dash", line_color="gray")
+        fig.update_layout(
+            height=options['height'],
+            yaxis=dict(range=options['yaxis_range'])
+        )
+        return fig
     
-    fig_ha_index.add_hline(y=0, line_dash="dash", line_color="gray")
-    fig_ha_index.update_layout(
-        height=400,
-        yaxis=dict(range=[-10, 20])  # Ajustado para que valores negativos y positivos quepan
+    fig_ha_index = figure_cache.get_or_build(
+        'ha_index', df_home_adv, build_ha_index_figure,
+        options={
+            'show_ci': show_ci,
+            'height': 400,
+            # Ajustado para que valores negativos y positivos quepan; con IC rango automático
+            'yaxis_range': None if show_ci else [-10, 20]
+        }
     )
     st.plotly_chart(fig_ha_index, use_container_width=True)
     
     # Tabla detallada
-    st.dataframe(df_home_adv.style.format({
+    st.dataframe(df_home_adv.drop(columns=['ci_plus', 'ci_minus'], errors='ignore').style.format({
         'Local Win%': '{:.1f}%',
         'Visitante Win%': '{:.1f}%',
         'Home Advantage Index': '{:+.1f}%'
@@ -966,6 +1149,194 @@ with st.expander("🏠 Home Advantage Index Detallado", expanded=False):
     
     st.markdown("**Interpretación:** Índice positivo indica fuerte ventaja local. Índice negativo sugiere problemas en casa.")
 
+# ============================================
+# MÉTRICA 5: SIMPLE RATING SYSTEM (SRS)
+# ============================================
+with st.expander("⚖️ Fuerza Ajustada por Calendario (SRS)", expanded=False):
+    st.markdown("### Simple Rating System")
+    st.markdown(
+        "Rating en goles por partido ajustado por la dificultad del calendario: "
+        "**SRS = MOV (margen medio) + SOS (fuerza media de los rivales)**, "
+        "estimado por mínimos cuadrados con término de ventaja local."
+    )
+    
+    srs_all_seasons = st.checkbox("Combinar todas las temporadas", value=False, key="srs_all_seasons")
+    
+    df_srs = load_srs(data_ver, not srs_all_seasons, df)
+    df_srs = df_srs[df_srs['equipo'].isin(selected_teams)]
+    if not srs_all_seasons:
+        df_srs = df_srs[df_srs['temporada'].isin(selected_seasons)]
+    df_srs = df_srs.reset_index(drop=True)
+    
+    if len(df_srs) > 0:
+        def build_srs_figure(data, options):
+            """Gráfico de barras del SRS por equipo y temporada"""
+            fig = px.bar(
+                data,
+                x='temporada',
+                y='srs',
+                color='equipo',
+                barmode='group',
+                title='Simple Rating System (goles por partido vs rival medio)',
+                labels={'srs': 'SRS', 'temporada': 'Temporada', 'equipo': 'Equipo'},
+                hover_data=['mov', 'sos', 'partidos'],
+                text='srs'
+            )
+            
+            fig.update_traces(texttemplate='%{text:+.2f}', textposition='outside')
+            fig.add_hline(y=0, line_dash="dash", line_color="gray")
+            fig.update_layout(height=options['height'], plot_bgcolor='rgba(0,0,0,0)')
+            return fig
+        
+        fig_srs = figure_cache.get_or_build(
+            'srs', df_srs, build_srs_figure, options={'height': 400}
+        )
+        st.plotly_chart(fig_srs, use_container_width=True)
+        
+        st.dataframe(df_srs.style.format({
+            'srs': '{:+.2f}',
+            'mov': '{:+.2f}',
+            'sos': '{:+.2f}',
+            'home_advantage': '{:+.2f}'
+        }), use_container_width=True)
+        
+        st.markdown("**Interpretación:** SOS positivo indica un calendario más exigente que la media.")
+    else:
+        st.warning("No hay suficientes datos para calcular el SRS")
+
+# ============================================
+# MÉTRICA 6: MODELO MULTI-VARIABLE
+# ============================================
+with st.expander("🧮 Modelo Multi-variable", expanded=False):
+    st.markdown("### Modelo de Regresión Multi-variable")
+    st.markdown(
+        "Regresión logística (victoria) y regresiones de Poisson (goles a favor / en contra) "
+        "sobre rating del oponente, academic rank, mes de la temporada, localía y temporada. "
+        "Ajustado sobre todo el dataset; las métricas son **fuera de muestra** "
+        "(validación cruzada dejando una temporada fuera)."
+    )
+    
+    with st.spinner("Ajustando modelo..."):
+        outcome_model = load_outcome_model(data_ver, df)
+    
+    cv_pooled = outcome_model['cv_pooled']
+    if cv_pooled:
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("R² Diferencia de Goles", f"{cv_pooled['r2_goal_diff']:.2f}")
+        with col2:
+            st.metric("AUC (Victoria)", f"{cv_pooled['auc']:.2f}")
+        with col3:
+            st.metric("Brier Score", f"{cv_pooled['brier']:.3f}")
+        with col4:
+            st.metric("RPS (W/T/L)", f"{cv_pooled['rps']:.3f}")
+    
+    st.markdown("**Coeficientes** (efecto de +1 desviación estándar de cada variable)")
+    st.dataframe(outcome_model['coefficients'].style.format({
+        'coef_win': '{:+.3f}',
+        'odds_ratio_win': '{:.2f}',
+        'coef_goals_for': '{:+.3f}',
+        'rate_ratio_goals_for': '{:.2f}',
+        'coef_goals_against': '{:+.3f}',
+        'rate_ratio_goals_against': '{:.2f}'
+    }), use_container_width=True)
+    
+    if len(outcome_model['cv_folds']) > 0:
+        st.markdown("**Validación cruzada por temporada**")
+        st.dataframe(outcome_model['cv_folds'].style.format({
+            'log_loss': '{:.3f}',
+            'brier': '{:.3f}',
+            'accuracy': '{:.1%}',
+            'auc': '{:.3f}',
+            'r2_goal_diff': '{:+.3f}',
+            'deviance_explained_for': '{:+.3f}',
+            'deviance_explained_against': '{:+.3f}',
+            'rps': '{:.3f}'
+        }), use_container_width=True)
+    
+    st.markdown("**Interpretación:** Odds ratio < 1 indica que la variable reduce la probabilidad de ganar. Las variables sin varianza (ej: opponent_quality constante) se excluyen automáticamente.")
+
+# ============================================
+# MÉTRICA 7: PROYECCIÓN DE TEMPORADA (MONTE CARLO)
+# ============================================
+with st.expander("🎲 Proyección de Temporada (Monte Carlo)", expanded=False):
+    st.markdown("### Simulación del Resto de la Temporada")
+    st.markdown(
+        "Modelo de goles de Poisson (ataque, defensa y ventaja local por equipo, con corrección "
+        "Dixon-Coles) ajustado con los partidos anteriores a la fecha de corte. El calendario "
+        "posterior se simula miles de veces para estimar la probabilidad de cada posición final."
+    )
+    
+    all_games = unique_matches(df)
+    sim_seasons = sorted(all_games['temporada'].unique(), reverse=True)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        sim_season = st.selectbox("Temporada", sim_seasons, key="sim_season")
+    season_dates = sorted(all_games.loc[all_games['temporada'] == sim_season, 'fecha'].dt.strftime('%Y-%m-%d').unique())
+    with col2:
+        sim_cutoff = st.select_slider(
+            "Fecha de corte (partidos jugados)",
+            options=season_dates,
+            value=season_dates[len(season_dates) // 2],
+            key="sim_cutoff"
+        )
+    with col3:
+        sim_n = st.select_slider(
+            "Simulaciones",
+            options=[10_000, 50_000, 100_000],
+            value=100_000,
+            key="sim_n"
+        )
+    
+    with st.spinner("Simulando temporada..."):
+        df_standings, df_goal_params, n_remaining, sim_rho = load_season_projection(
+            data_ver, sim_season, sim_cutoff, sim_n, df
+        )
+    
+    st.caption(f"Partidos pendientes simulados: {n_remaining} | rho Dixon-Coles: {sim_rho:+.3f}")
+    
+    if n_remaining == 0:
+        st.info("No quedan partidos después de la fecha de corte: la tabla es la final.")
+    
+    prob_cols = [c for c in df_standings.columns if c.startswith('prob_')]
+    
+    def build_projection_figure(data, options):
+        """Heatmap de probabilidad de posición final por equipo"""
+        fig = px.imshow(
+            data[options['prob_cols']].to_numpy() * 100,
+            x=[f"{c.split('_')[1]}º" for c in options['prob_cols']],
+            y=data['equipo'],
+            color_continuous_scale='Blues',
+            text_auto='.1f',
+            aspect='auto',
+            labels={'x': 'Posición final', 'y': 'Equipo', 'color': 'Probabilidad (%)'},
+            title='Probabilidad de Posición Final (%)'
+        )
+        fig.update_layout(height=options['height'])
+        return fig
+    
+    fig_projection = figure_cache.get_or_build(
+        'season_projection', df_standings, build_projection_figure,
+        options={'height': 120 + 60 * len(df_standings), 'prob_cols': prob_cols}
+    )
+    st.plotly_chart(fig_projection, use_container_width=True)
+    
+    st.dataframe(df_standings.style.format(
+        {**{c: '{:.1%}' for c in prob_cols},
+         'puntos_actuales': '{:.0f}',
+         'puntos_esperados': '{:.1f}',
+         'dif_goles_esperada': '{:+.1f}'}
+    ), use_container_width=True)
+    
+    st.markdown("**Parámetros del modelo de goles** (equipos seguidos)")
+    st.dataframe(df_goal_params[df_goal_params['equipo'].isin(df['equipo'].unique())].style.format({
+        'attack': '{:+.3f}',
+        'defense': '{:+.3f}',
+        'goles_favor_esperados': '{:.2f}',
+        'goles_contra_esperados': '{:.2f}'
+    }), use_container_width=True)
+
 # ============================================
 # ANÁLISIS CON IA (OPENAI)
 # ============================================
@@ -974,42 +1345,71 @@ st.markdown("## 🤖 Análisis con Inteligencia Artificial")
 st.markdown("Insights generados automáticamente usando OpenAI")
 
 # Verificar API Key
-api_key = os.getenv("OPENAI_API_KEY")
-
-if not api_key:
+if not OPENAI_API_KEY:
     st.warning("⚠️ No se encontró OPENAI_API_KEY. Configúrala en el archivo .env para habilitar análisis con IA.")
 else:
     # ============================================
     # PREPARAR CONTEXTO PARA IA
     # ============================================
     
-    # Resumen de datos para IA
-    ai_context = {
-        'equipos': selected_teams,
-        'temporadas': selected_seasons,
-        'total_partidos': len(df_filtered),
-        'resumen_equipos': []
+    # Resumen de datos para IA (mismo constructor que el job de digests)
+    ai_context = build_ai_context(df_filtered, selected_teams, selected_seasons)
+    
+    # Todas las peticiones pasan por el cliente compartido (modelo OPENAI_MODEL,
+    # timeouts, reintentos, concurrencia, caché y métricas)
+    llm_client = get_llm_client()
+    
+    # ============================================
+    # PROMPTS DE LOS ANÁLISIS
+    # ============================================
+    
+    def build_comparative_request():
+        """Petición del análisis comparativo"""
+        return build_section_request('comparative', df_filtered, selected_teams, selected_seasons)
+    
+    def build_academic_request():
+        """Petición de validación de academic periodization"""
+        # Tests de permutación cacheados por filtros (p-valores y efectos)
+        tests = load_periodization_tests(
+            data_ver, tuple(selected_teams), tuple(selected_seasons),
+            PERIODIZATION_N_PERM, PERIODIZATION_SEED, df_filtered
+        )
+        return build_section_request('academic', df_filtered, selected_teams, selected_seasons, tests=tests)
+    
+    def build_recommendations_request():
+        """Petición de recomendaciones estratégicas"""
+        return build_section_request('recommendations', df_filtered, selected_teams, selected_seasons)
+    
+    # Secciones: clave -> (constructor de la petición, mensaje de error)
+    AI_SECTIONS = {
+        'comparative': (build_comparative_request, "Error al generar análisis"),
+        'academic': (build_academic_request, "Error al validar hipótesis"),
+        'recommendations': (build_recommendations_request, "Error al generar recomendaciones"),
     }
     
-    for team in selected_teams:
-        team_data = df_filtered[df_filtered['equipo'] == team]
-        wins = len(team_data[team_data['resultado_code'] == 'W'])
-        losses = len(team_data[team_data['resultado_code'] == 'L'])
-        ties = len(team_data[team_data['resultado_code'] == 'T'])
-        total = len(team_data)
-        win_pct = (wins / total * 100) if total > 0 else 0
-        
-        academic_rank = int(team_data['team_academic_rank'].iloc[0])  # Convertir a int nativo
-        
-        ai_context['resumen_equipos'].append({
-            'nombre': team,
-            'academic_rank': academic_rank,
-            'partidos': int(total),  # Convertir a int nativo
-            'victorias': int(wins),  # Convertir a int nativo
-            'derrotas': int(losses),  # Convertir a int nativo
-            'empates': int(ties),  # Convertir a int nativo
-            'win_percentage': float(win_pct)  # Convertir a float nativo
-        })
+    # Análisis precalculados de esta selección; el job de fondo se lanza una vez
+    # por versión de datos y proceso (solo genera lo que falta)
+    digest_store = DigestStore()
+    ai_digest = (digest_store.load(data_ver, selected_teams, selected_seasons) or {}).get('sections', {})
+    start_background_digests(df)
+    if not ai_digest and background_running(data_ver):
+        st.info("⏳ Generando los análisis precalculados en segundo plano: aparecerán al recargar la página")
+    
+    col_ai_all, col_ai_cache = st.columns([1, 2])
+    with col_ai_all:
+        generate_all_ai = st.button(
+            "⚡ Generar los 3 análisis", key="btn_ai_all", type="primary",
+            help=f"Lanza las tres peticiones en paralelo (máximo {LLM_MAX_CONCURRENCY} simultáneas)"
+        )
+    with col_ai_cache:
+        bypass_ai_cache = st.checkbox(
+            "🔁 Ignorar caché de IA (forzar nueva respuesta)",
+            value=False,
+            help="Las respuestas se guardan por prompt: la misma selección se sirve sin llamar a la API"
+        )
+    
+    ai_placeholders = {}
+    ai_clicked = set()
     
     # ============================================
     # ANÁLISIS 1: COMPARATIVE ANALYSIS
@@ -1018,149 +1418,107 @@ else:
         st.markdown("### Análisis Generado por IA")
         
         if st.button("🔄 Generar Análisis Comparativo", key="btn_comparative"):
-            with st.spinner("Analizando datos..."):
-                try:
-                    import openai
-                    
-                    openai.api_key = api_key
-                    
-                    prompt = f"""Eres un analista deportivo experto en fútbol universitario. Analiza los siguientes equipos de la Orange Empire Conference:
-
-Datos:
-{json.dumps(ai_context, indent=2)}
-
-Proporciona un análisis comparativo breve (máximo 200 palabras) que incluya:
-1. Identificar el equipo con mejor rendimiento general
-2. Comparar rendimiento académico vs deportivo
-3. Identificar tendencias o patrones destacables
-4. Dar 2 insights clave
-
-Responde en español de forma profesional y concisa."""
-
-                    response = openai.ChatCompletion.create(
-                        model="gpt-4",
-                        messages=[
-                            {"role": "system", "content": "Eres un analista deportivo experto en soccer universitario."},
-                            {"role": "user", "content": prompt}
-                        ],
-                        max_tokens=400,
-                        temperature=0.7
-                    )
-                    
-                    analysis = response.choices[0].message['content']
-                    st.markdown(analysis)
-                    
-                except Exception as e:
-                    st.error(f"Error al generar análisis: {str(e)}")
+            ai_clicked.add('comparative')
+        ai_placeholders['comparative'] = st.empty()
     
     # ============================================
     # ANÁLISIS 2: ACADEMIC PERIODIZATION INSIGHTS
     # ============================================
-    with st.expander("🎓 Validación de Academic Periodization", expanded=False):
+    with st.expander("🎓 Validación de Academic Periodization", expanded=generate_all_ai or 'academic' in ai_digest):
         st.markdown("### Análisis de Hipótesis TFM")
         
         if st.button("🔄 Validar Hipótesis con IA", key="btn_academic"):
-            with st.spinner("Analizando academic periodization..."):
-                try:
-                    # Calcular datos mensuales para IA
-                    monthly_data = []
-                    for team in selected_teams:
-                        team_data = df_filtered[df_filtered['equipo'] == team]
-                        academic_rank = int(team_data['team_academic_rank'].iloc[0])  # Convertir a int nativo
-                        
-                        for month in ['October', 'November', 'December']:
-                            month_games = team_data[team_data['mes'] == month]
-                            if len(month_games) > 0:
-                                wins = len(month_games[month_games['resultado_code'] == 'W'])
-                                total = len(month_games)
-                                win_pct = (wins / total * 100) if total > 0 else 0
-                                
-                                monthly_data.append({
-                                    'equipo': team,
-                                    'academic_rank': academic_rank,
-                                    'mes': month,
-                                    'win_percentage': float(win_pct)  # Convertir a float nativo
-                                })
-                    
-                    import openai
-                    
-                    openai.api_key = api_key
-                    
-                    prompt = f"""Eres un investigador académico experto en rendimiento deportivo estudiantil. 
-
-Hipótesis: "Los equipos con mejor ranking académico experimentan decline en rendimiento durante periodos de exámenes (Noviembre-Diciembre)"
-
-Datos mensuales:
-{json.dumps(monthly_data, indent=2)}
-
-Analiza:
-1. ¿Hay evidencia de decline en Octubre→Noviembre→Diciembre?
-2. ¿Los equipos con mejor ranking académico (menor número) muestran más decline?
-3. ¿La hipótesis es válida o refutada?
-4. ¿Qué factores adicionales podrían influir?
-
-Responde en español de forma académica pero clara (máximo 250 palabras)."""
-
-                    response = openai.ChatCompletion.create(
-                        model="gpt-4",
-                        messages=[
-                            {"role": "system", "content": "Eres un investigador académico en ciencias del deporte."},
-                            {"role": "user", "content": prompt}
-                        ],
-                        max_tokens=450,
-                        temperature=0.7
-                    )
-                    
-                    analysis = response.choices[0].message['content']
-                    st.markdown(analysis)
-                    
-                except Exception as e:
-                    st.error(f"Error al validar hipótesis: {str(e)}")
+            ai_clicked.add('academic')
+        ai_placeholders['academic'] = st.empty()
     
     # ============================================
     # ANÁLISIS 3: STRATEGIC RECOMMENDATIONS
     # ============================================
-    with st.expander("💡 Recomendaciones Estratégicas", expanded=False):
+    with st.expander("💡 Recomendaciones Estratégicas", expanded=generate_all_ai or 'recommendations' in ai_digest):
         st.markdown("### Consejos para Coaches")
         
         if st.button("🔄 Generar Recomendaciones", key="btn_recommendations"):
-            with st.spinner("Generando recomendaciones estratégicas..."):
+            ai_clicked.add('recommendations')
+        ai_placeholders['recommendations'] = st.empty()
+    
+    # ============================================
+    # EJECUCIÓN EN STREAMING (PARALELA CON "GENERAR LOS 3")
+    # ============================================
+    pending_ai = list(AI_SECTIONS) if generate_all_ai else [key for key in AI_SECTIONS if key in ai_clicked]
+    
+    # Lo precalculado se muestra al cargar, sin llamar a la API
+    for key, section in ai_digest.items():
+        if key in ai_placeholders and key not in pending_ai:
+            with ai_placeholders[key].container():
+                st.markdown(section['text'])
+                st.caption(f"⚡ Precalculado ({section['model']}, {section['created_at']}) · pulsa el botón para regenerar")
+    
+    if pending_ai:
+        ai_requests = {}
+        for key in pending_ai:
+            build_request, error_message = AI_SECTIONS[key]
+            # Regenerar algo ya precalculado o pulsado a propósito pide una respuesta nueva (sin caché)
+            regenerate = bypass_ai_cache or key in ai_digest or key in ai_clicked
+            try:
+                ai_requests[key] = {**build_request(), 'use_cache': not regenerate}
+                ai_placeholders[key].info("⏳ Generando...")
+            except Exception as e:
+                ai_placeholders[key].error(f"{error_message}: {str(e)}")
+        
+        # Cada sección se va pintando a medida que llegan sus tokens
+        ai_texts = {key: "" for key in ai_requests}
+        for key, delta, error in llm_client.stream_many(ai_requests):
+            if error is not None:
+                ai_placeholders[key].error(f"{AI_SECTIONS[key][1]}: {str(error)}")
+            elif delta is None:
+                ai_placeholders[key].markdown(ai_texts[key])
+                digest_store.save_section(data_ver, selected_teams, selected_seasons, key, ai_texts[key], OPENAI_MODEL)
+            else:
+                ai_texts[key] += delta
+                ai_placeholders[key].markdown(ai_texts[key] + " ▌")
+    
+    # ============================================
+    # ANÁLISIS 4: FORTALEZAS Y DEBILIDADES POR EQUIPO (PETICIÓN AGRUPADA)
+    # ============================================
+    with st.expander("🧩 Fortalezas y Debilidades por Equipo", expanded=False):
+        st.markdown("### Diagnóstico de cada equipo seleccionado")
+        st.caption("Todos los equipos van en una sola petición con respuesta JSON; solo se repiten los que no llegan completos")
+        
+        if st.button("🔄 Analizar equipos", key="btn_team_strengths"):
+            teams_stats = {
+                summary['nombre']: {k: v for k, v in summary.items() if k != 'nombre'}
+                for summary in ai_context['resumen_equipos']
+            }
+            
+            with st.spinner(f"Analizando {len(teams_stats)} equipos..."):
                 try:
-                    import openai
-                    
-                    openai.api_key = api_key
-                    
-                    prompt = f"""Eres un coach experimentado de fútbol universitario. Basándote en estos datos:
-
-{json.dumps(ai_context, indent=2)}
-
-Proporciona 3-4 recomendaciones estratégicas específicas para cada equipo, considerando:
-- Su rendimiento actual
-- Su ranking académico
-- Fortalezas y debilidades observadas
-
-Formato:
-**[Nombre del Equipo]**
-- Recomendación 1
-- Recomendación 2
-
-Máximo 250 palabras. Responde en español."""
-
-                    response = openai.ChatCompletion.create(
-                        model="gpt-4",
-                        messages=[
-                            {"role": "system", "content": "Eres un coach experimentado de soccer universitario."},
-                            {"role": "user", "content": prompt}
-                        ],
-                        max_tokens=450,
-                        temperature=0.8
-                    )
-                    
-                    recommendations = response.choices[0].message['content']
-                    st.markdown(recommendations)
-                    
+                    helper = OpenAIHelper(use_cache=not bypass_ai_cache)
+                    team_analyses = helper.analyze_teams_batch(teams_stats)
                 except Exception as e:
-                    st.error(f"Error al generar recomendaciones: {str(e)}")
+                    team_analyses = {}
+                    st.error(f"Error al analizar equipos: {str(e)}")
+            
+            for team, analysis in team_analyses.items():
+                st.markdown(f"#### {team}")
+                col_str, col_weak, col_rec = st.columns(3)
+                for col, title, key in [
+                    (col_str, "💪 Fortalezas", 'fortalezas'),
+                    (col_weak, "⚠️ Debilidades", 'debilidades'),
+                    (col_rec, "💡 Recomendaciones", 'recomendaciones'),
+                ]:
+                    with col:
+                        st.markdown(f"**{title}**")
+                        st.markdown("\n".join(f"- {item}" for item in analysis[key]))
+    
+    llm_metrics = llm_client.metrics()
+    if llm_metrics['requests']:
+        st.caption(
+            f"🤖 {OPENAI_MODEL} · {llm_metrics['requests']} peticiones · "
+            f"{llm_metrics['cache_hit_rate']:.0%} desde caché · {llm_metrics['coalesced']} compartidas en curso · "
+            f"{llm_metrics['retries']} reintentos · "
+            f"latencia media {llm_metrics.get('latency_mean', 0):.1f}s · "
+            f"{llm_metrics['prompt_tokens'] + llm_metrics['completion_tokens']:,} tokens"
+        )
 
 st.markdown("---")
 
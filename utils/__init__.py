@@ -4,15 +4,38 @@ Utils package para Soccer Analytics Streamlit
 
 from .config import *
 from .scraper_3c2a import Scraper3C2A, get_irvine_matches, get_conference_standings
-from .openai_helper import OpenAIHelper, generate_summary, analyze_team, get_tactical_advice
-from .visualizations import AdvancedVisualizations, create_radar, create_heatmap, create_comparison
+from .openai_helper import (
+    OpenAIHelper, LLMClient, get_llm_client, generate_summary, analyze_team, get_tactical_advice,
+    cached_chat_completion, run_chat_completions, stream_chat_completion, stream_chat_completions
+)
+from .visualizations import AdvancedVisualizations, create_radar, create_heatmap, create_comparison, add_performance_bands
+from .figure_cache import FigureCache, figure_cache, hash_frame
 from .pdf_generator import PDFReportGenerator
+from .match_store import load_match_store, data_version, chronological_sort, oriented_goals, match_dates, unique_matches
+from .trends import compute_rolling_form, latest_form, ROLLING_METRICS
+from .ratings import EloRatingEngine, add_rating_features, compute_srs
+from .bootstrap import bootstrap_metrics, ci_error_bars, BOOTSTRAP_METRICS
+from .permutation_tests import academic_periodization_tests
+from .outcome_model import MatchOutcomeModel, build_model_frame, cross_validate_by_season, get_outcome_model, MODEL_FEATURES
+from .season_simulator import PoissonGoalModel, simulate_season, project_season
+from .head_to_head import HeadToHeadIndex, H2H_VALUES
+from .streaming_stats import StreamingMoments, partitioned_moments, MOMENT_VARIABLES
+from .summary_grid import team_summary_table, sort_summary, paginate, render_summary_grid, SUMMARY_SORT_OPTIONS
+from .analytics import compute_scope_metrics, compute_dataset_metrics, run_batch, read_artifact
+from .metrics_api import MetricsStore, create_server
+from .synthetic_data import generate_matches, render_box_score_html, write_dataset
+from .llm_cache import LLMResponseCache, get_response_cache, make_cache_key
+from .mock_llm_server import MockBehavior, create_mock_server, start_mock_server
+from .ai_digests import DigestStore, generate_digests, start_background_digests
+from .structured_output import StructuredOutputError, structured_completion, parse_structured, repair_json, validate
+from .prompt_context import estimate_tokens, estimate_message_tokens, encode_context, encode_table, fit_context
 
 __all__ = [
     # Config
     'APP_TITLE',
     'APP_VERSION',
     'OPENAI_API_KEY',
+    'OPENAI_API_BASE',
     'COLORS',
     'PLOTLY_CONFIG',
     'validate_config',
@@ -24,16 +47,126 @@ __all__ = [
     
     # OpenAI
     'OpenAIHelper',
+    'LLMClient',
+    'get_llm_client',
     'generate_summary',
     'analyze_team',
     'get_tactical_advice',
+    'cached_chat_completion',
+    'run_chat_completions',
+    'stream_chat_completion',
+    'stream_chat_completions',
     
     # Visualizations
     'AdvancedVisualizations',
     'create_radar',
     'create_heatmap',
     'create_comparison',
+    'add_performance_bands',
+    
+    # Figure cache
+    'FigureCache',
+    'figure_cache',
+    'hash_frame',
     
     # PDF
     'PDFReportGenerator',
+    
+    # Match store
+    'load_match_store',
+    'data_version',
+    'chronological_sort',
+    'oriented_goals',
+    'match_dates',
+    'unique_matches',
+    
+    # Trends
+    'compute_rolling_form',
+    'latest_form',
+    'ROLLING_METRICS',
+    
+    # Ratings
+    'EloRatingEngine',
+    'add_rating_features',
+    'compute_srs',
+    
+    # Bootstrap
+    'bootstrap_metrics',
+    'ci_error_bars',
+    'BOOTSTRAP_METRICS',
+    
+    # Permutation tests
+    'academic_periodization_tests',
+    
+    # Outcome model
+    'MatchOutcomeModel',
+    'build_model_frame',
+    'cross_validate_by_season',
+    'get_outcome_model',
+    'MODEL_FEATURES',
+    
+    # Season simulator
+    'PoissonGoalModel',
+    'simulate_season',
+    'project_season',
+    
+    # Head-to-head
+    'HeadToHeadIndex',
+    'H2H_VALUES',
+    
+    # Streaming stats
+    'StreamingMoments',
+    'partitioned_moments',
+    'MOMENT_VARIABLES',
+    
+    # Summary grid
+    'team_summary_table',
+    'sort_summary',
+    'paginate',
+    'render_summary_grid',
+    'SUMMARY_SORT_OPTIONS',
+    
+    # Analytics (batch)
+    'compute_scope_metrics',
+    'compute_dataset_metrics',
+    'run_batch',
+    'read_artifact',
+    
+    # Metrics API
+    'MetricsStore',
+    'create_server',
+    
+    # Synthetic data
+    'generate_matches',
+    'render_box_score_html',
+    'write_dataset',
+    
+    # LLM cache
+    'LLMResponseCache',
+    'get_response_cache',
+    'make_cache_key',
+    
+    # Mock LLM server
+    'MockBehavior',
+    'create_mock_server',
+    'start_mock_server',
+    
+    # AI digests
+    'DigestStore',
+    'generate_digests',
+    'start_background_digests',
+    
+    # Prompt context
+    'estimate_tokens',
+    'estimate_message_tokens',
+    'encode_context',
+    'encode_table',
+    'fit_context',
+    
+    # Structured output
+    'StructuredOutputError',
+    'structured_completion',
+    'parse_structured',
+    'repair_json',
+    'validate',
 ]
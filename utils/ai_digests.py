@@ -0,0 +1,494 @@
+"""
+============================================
+AI DIGESTS - ANÁLISIS IA PRECALCULADOS
+============================================
+
+Genera en batch los tres análisis con IA de la página Multi-Team
+(comparativo, validación de Academic Periodization y recomendaciones)
+para un conjunto de selecciones frecuentes de equipos/temporadas y los
+guarda junto con la versión de datos de la que salen:
+
+    python -m utils.ai_digests --selections selecciones.json
+
+    outputs/ai_digests/<version>/<selección>.json
+
+Por defecto las selecciones son todos los equipos con todas las temporadas
+y todos los equipos con cada temporada. La página sirve el digest de la
+selección actual al cargar (sin esperar a la API) y lanza el job en un
+hilo de fondo la primera vez que ve una versión de datos nueva.
+
+Las peticiones se construyen con las mismas funciones que usa la página,
+así que los digests, la caché de respuestas y la regeneración manual
+comparten prompts.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from .config import AI_DIGEST_SELECTIONS, OPENAI_MODEL
+from .match_store import data_version, load_match_store
+from .openai_helper import get_llm_client
+from .permutation_tests import academic_periodization_tests
+from .prompt_context import fit_context
+
+# Carpeta por defecto de los digests
+AI_DIGEST_DIR = Path(__file__).parent.parent / "outputs" / "ai_digests"
+
+# Secciones de cada digest (mismas claves que la página)
+DIGEST_SECTIONS = ('comparative', 'academic', 'recommendations')
+
+# Selección de todos los equipos o todas las temporadas en los archivos de selecciones
+ALL = 'all'
+
+# Parámetros de los tests de permutación incluidos en el prompt académico
+PERIODIZATION_N_PERM = 10000
+PERIODIZATION_SEED = 42
+
+
+# ============================================
+# CONTEXTO Y PETICIONES (COMPARTIDOS CON LA PÁGINA)
+# ============================================
+
+def build_ai_context(df_filtered, teams, seasons):
+    """
+    Resumen de la selección para los prompts
+
+    Args:
+        df_filtered (pd.DataFrame): Partidos de la selección
+        teams (list): Equipos seleccionados
+        seasons (list): Temporadas seleccionadas
+
+    Returns:
+        dict: equipos, temporadas, total_partidos y resumen_equipos
+    """
+    ai_context = {
+        'equipos': list(teams),
+        'temporadas': list(seasons),
+        'total_partidos': len(df_filtered),
+        'resumen_equipos': []
+    }
+
+    for team in teams:
+        team_data = df_filtered[df_filtered['equipo'] == team]
+        if team_data.empty:
+            continue
+        wins = len(team_data[team_data['resultado_code'] == 'W'])
+        losses = len(team_data[team_data['resultado_code'] == 'L'])
+        ties = len(team_data[team_data['resultado_code'] == 'T'])
+        total = len(team_data)
+        win_pct = (wins / total * 100) if total > 0 else 0
+
+        ai_context['resumen_equipos'].append({
+            'nombre': team,
+            'academic_rank': int(team_data['team_academic_rank'].iloc[0]),  # Convertir a int nativo
+            'partidos': int(total),
+            'victorias': int(wins),
+            'derrotas': int(losses),
+            'empates': int(ties),
+            'win_percentage': float(win_pct)  # Convertir a float nativo
+        })
+
+    return ai_context
+
+
+def monthly_win_rates(df_filtered, teams):
+    """
+    Win % por equipo en Octubre, Noviembre y Diciembre (datos del prompt académico)
+
+    Args:
+        df_filtered (pd.DataFrame): Partidos de la selección
+        teams (list): Equipos seleccionados
+
+    Returns:
+        list: Registros equipo, academic_rank, mes, win_percentage
+    """
+    monthly_data = []
+    for team in teams:
+        team_data = df_filtered[df_filtered['equipo'] == team]
+        if team_data.empty:
+            continue
+        academic_rank = int(team_data['team_academic_rank'].iloc[0])
+
+        for month in ['October', 'November', 'December']:
+            month_games = team_data[team_data['mes'] == month]
+            if len(month_games) > 0:
+                wins = len(month_games[month_games['resultado_code'] == 'W'])
+                total = len(month_games)
+                monthly_data.append({
+                    'equipo': team,
+                    'academic_rank': academic_rank,
+                    'mes': month,
+                    'win_percentage': float(wins / total * 100)
+                })
+    return monthly_data
+
+
+def build_comparative_request(ai_context):
+    """Petición del análisis comparativo"""
+    prompt = f"""Eres un analista deportivo experto en fútbol universitario. Analiza los siguientes equipos de la Orange Empire Conference:
+
+Datos:
+{fit_context(ai_context)}
+
+Proporciona un análisis comparativo breve (máximo 200 palabras) que incluya:
+1. Identificar el equipo con mejor rendimiento general
+2. Comparar rendimiento académico vs deportivo
+3. Identificar tendencias o patrones destacables
+4. Dar 2 insights clave
+
+Responde en español de forma profesional y concisa."""
+
+    return {
+        'messages': [
+            {"role": "system", "content": "Eres un analista deportivo experto en soccer universitario."},
+            {"role": "user", "content": prompt}
+        ],
+        'temperature': 0.7,
+        'max_tokens': 400
+    }
+
+
+def build_academic_request(monthly_data, tests_data):
+    """
+    Petición de validación de academic periodization
+
+    Args:
+        monthly_data (list): Resultado de monthly_win_rates
+        tests_data (list): Registros prueba, equipo, estadistico, efecto, p_value
+    """
+    prompt = f"""Eres un investigador académico experto en rendimiento deportivo estudiantil.
+
+Hipótesis: "Los equipos con mejor ranking académico experimentan decline en rendimiento durante periodos de exámenes (Noviembre-Diciembre)"
+
+{fit_context({
+    'datos_mensuales': monthly_data,
+    'tests_permutacion (etiquetas de mes barajadas dentro de cada equipo-temporada, 10.000 permutaciones)': tests_data
+})}
+
+Analiza:
+1. ¿Hay evidencia de decline en Octubre→Noviembre→Diciembre?
+2. ¿Los equipos con mejor ranking académico (menor número) muestran más decline?
+3. ¿La hipótesis es válida o refutada según los p-valores de los tests?
+4. ¿Qué factores adicionales podrían influir?
+
+Responde en español de forma académica pero clara (máximo 250 palabras)."""
+
+    return {
+        'messages': [
+            {"role": "system", "content": "Eres un investigador académico en ciencias del deporte."},
+            {"role": "user", "content": prompt}
+        ],
+        'temperature': 0.7,
+        'max_tokens': 450
+    }
+
+
+def build_recommendations_request(ai_context):
+    """Petición de recomendaciones estratégicas"""
+    prompt = f"""Eres un coach experimentado de fútbol universitario. Basándote en estos datos:
+
+{fit_context(ai_context)}
+
+Proporciona 3-4 recomendaciones estratégicas específicas para cada equipo, considerando:
+- Su rendimiento actual
+- Su ranking académico
+- Fortalezas y debilidades observadas
+
+Formato:
+**[Nombre del Equipo]**
+- Recomendación 1
+- Recomendación 2
+
+Máximo 250 palabras. Responde en español."""
+
+    return {
+        'messages': [
+            {"role": "system", "content": "Eres un coach experimentado de soccer universitario."},
+            {"role": "user", "content": prompt}
+        ],
+        'temperature': 0.8,
+        'max_tokens': 450
+    }
+
+
+def periodization_test_records(tests):
+    """Columnas de los tests de permutación que van en el prompt"""
+    return tests[['prueba', 'equipo', 'estadistico', 'efecto', 'p_value']].round(3).to_dict('records')
+
+
+def build_section_request(section, df_filtered, teams, seasons, tests=None):
+    """
+    Petición de una sección para una selección
+
+    Args:
+        section (str): 'comparative', 'academic' o 'recommendations'
+        df_filtered (pd.DataFrame): Partidos de la selección
+        teams (list): Equipos seleccionados
+        seasons (list): Temporadas seleccionadas
+        tests (pd.DataFrame): Tests de permutación ya calculados (solo 'academic')
+
+    Returns:
+        dict: kwargs de LLMClient.complete/stream (messages, temperature, max_tokens)
+    """
+    if section == 'academic':
+        if tests is None:
+            tests = academic_periodization_tests(df_filtered, n_perm=PERIODIZATION_N_PERM, seed=PERIODIZATION_SEED)
+        return build_academic_request(monthly_win_rates(df_filtered, teams), periodization_test_records(tests))
+
+    ai_context = build_ai_context(df_filtered, teams, seasons)
+    if section == 'comparative':
+        return build_comparative_request(ai_context)
+    if section == 'recommendations':
+        return build_recommendations_request(ai_context)
+    raise ValueError(f"Sección desconocida: {section}")
+
+
+# ============================================
+# SELECCIONES
+# ============================================
+
+def normalize_selection(df, teams=ALL, seasons=ALL):
+    """
+    Selección como (equipos, temporadas) ordenados, expandiendo 'all'
+
+    Returns:
+        tuple: (tuple de equipos, tuple de temporadas)
+    """
+    teams = sorted(df['equipo'].unique()) if teams == ALL else sorted(teams)
+    seasons = sorted(df['temporada'].unique()) if seasons == ALL else sorted(seasons)
+    return tuple(teams), tuple(seasons)
+
+
+def default_selections(df):
+    """Todos los equipos con todas las temporadas y con cada temporada"""
+    selections = [normalize_selection(df)]
+    selections += [normalize_selection(df, ALL, [season]) for season in sorted(df['temporada'].unique())]
+    return selections
+
+
+def load_selections(df, path=AI_DIGEST_SELECTIONS):
+    """
+    Selecciones de un archivo JSON [{"teams": [...]|"all", "seasons": [...]|"all"}]
+
+    Args:
+        df (pd.DataFrame): Match store (para expandir 'all')
+        path (str): Archivo de selecciones (None = default_selections)
+
+    Returns:
+        list: [(equipos, temporadas)]
+    """
+    if not path:
+        return default_selections(df)
+    entries = json.loads(Path(path).read_text(encoding='utf-8'))
+    return [normalize_selection(df, e.get('teams', ALL), e.get('seasons', ALL)) for e in entries]
+
+
+def selection_key(teams, seasons):
+    """Nombre de archivo estable de una selección"""
+    payload = json.dumps([sorted(teams), sorted(seasons)], ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+# ============================================
+# ALMACÉN DE DIGESTS
+# ============================================
+
+class DigestStore:
+    """
+    Digests en JSON por versión de datos y selección
+    """
+
+    # Compartido por todas las instancias: la página y el job de fondo escriben el mismo archivo
+    _lock = threading.Lock()
+
+    def __init__(self, output_dir=AI_DIGEST_DIR):
+        """
+        Args:
+            output_dir (str or Path): Carpeta raíz de los digests
+        """
+        self.output_dir = Path(output_dir)
+
+    def path(self, version, teams, seasons):
+        """Archivo del digest de una selección"""
+        return self.output_dir / version / f"{selection_key(teams, seasons)}.json"
+
+    def load(self, version, teams, seasons):
+        """
+        Digest guardado de una selección
+
+        Returns:
+            dict: version, teams, seasons, sections {sección: {text, model, created_at}}
+                  o None si no existe
+        """
+        path = self.path(version, teams, seasons)
+        if not path.exists():
+            return None
+        try:
+            return json.loads(path.read_text(encoding='utf-8'))
+        except ValueError:
+            return None
+
+    def save_section(self, version, teams, seasons, section, text, model=OPENAI_MODEL):
+        """
+        Guarda (o reemplaza) el texto de una sección
+
+        Args:
+            version (str): Versión de datos
+            teams (list): Equipos de la selección
+            seasons (list): Temporadas de la selección
+            section (str): Clave de la sección
+            text (str): Texto generado
+            model (str): Modelo que lo generó
+        """
+        path = self.path(version, teams, seasons)
+        with self._lock:
+            digest = self.load(version, teams, seasons) or {
+                'version': version,
+                'teams': sorted(teams),
+                'seasons': sorted(seasons),
+                'sections': {}
+            }
+            digest['sections'][section] = {
+                'text': text,
+                'model': model,
+                'created_at': datetime.now().isoformat(timespec='seconds')
+            }
+
+            # Escritura atómica: la página nunca lee un JSON a medias
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+            tmp_path.write_text(json.dumps(digest, indent=2, ensure_ascii=False), encoding='utf-8')
+            tmp_path.replace(path)
+
+
+# ============================================
+# JOB BATCH
+# ============================================
+
+def generate_digests(df, selections=None, client=None, store=None, force=False):
+    """
+    Genera los digests que faltan para la versión de datos actual
+
+    Todas las peticiones (selecciones x secciones) se lanzan juntas por el
+    cliente compartido, que limita la concurrencia y reintenta.
+
+    Args:
+        df (pd.DataFrame): Match store completo
+        selections (list): [(equipos, temporadas)] (por defecto load_selections)
+        client (LLMClient): Cliente IA (por defecto el compartido)
+        store (DigestStore): Almacén (por defecto outputs/ai_digests)
+        force (bool): Regenerar también las secciones existentes (sin caché)
+
+    Returns:
+        dict: version, generated, skipped, failed y seconds
+    """
+    client = client or get_llm_client()
+    store = store or DigestStore()
+    selections = selections if selections is not None else load_selections(df)
+    version = data_version(df)
+    start_time = time.perf_counter()
+
+    requests = {}
+    skipped = 0
+    for teams, seasons in selections:
+        existing = (store.load(version, teams, seasons) or {}).get('sections', {})
+        pending = [s for s in DIGEST_SECTIONS if force or s not in existing]
+        skipped += len(DIGEST_SECTIONS) - len(pending)
+        if not pending:
+            continue
+
+        df_selection = df[df['equipo'].isin(teams) & df['temporada'].isin(seasons)]
+        for section in pending:
+            requests[(teams, seasons, section)] = build_section_request(section, df_selection, teams, seasons)
+
+    generated = failed = 0
+    for (teams, seasons, section), content, error in client.complete_many(requests, use_cache=not force):
+        if error is not None:
+            failed += 1
+            print(f"⚠️ Digest {section} ({len(teams)} equipos, {len(seasons)} temporadas): {error}")
+            continue
+        store.save_section(version, teams, seasons, section, content, client.model)
+        generated += 1
+
+    return {
+        'version': version,
+        'generated': generated,
+        'skipped': skipped,
+        'failed': failed,
+        'seconds': round(time.perf_counter() - start_time, 2),
+    }
+
+
+# Jobs de fondo lanzados en este proceso: versión -> hilo
+_background_jobs = {}
+_background_lock = threading.Lock()
+
+
+def start_background_digests(df, selections=None, store=None):
+    """
+    Lanza generate_digests en un hilo de fondo (una vez por versión de datos y proceso)
+
+    Args:
+        df (pd.DataFrame): Match store completo
+        selections (list): [(equipos, temporadas)] (por defecto load_selections)
+        store (DigestStore): Almacén
+
+    Returns:
+        threading.Thread: Hilo del job de esta versión (nuevo o ya lanzado)
+    """
+    version = data_version(df)
+    with _background_lock:
+        thread = _background_jobs.get(version)
+        if thread is None:
+            def run():
+                summary = generate_digests(df, selections, store=store)
+                print(f"✅ Digests IA {version}: {summary['generated']} generados, "
+                      f"{summary['failed']} fallidos ({summary['seconds']}s)")
+
+            thread = threading.Thread(target=run, name=f"ai-digests-{version}", daemon=True)
+            _background_jobs[version] = thread
+            thread.start()
+    return thread
+
+
+def background_running(version):
+    """True si el job de fondo de esta versión sigue en marcha en este proceso"""
+    with _background_lock:
+        thread = _background_jobs.get(version)
+    return thread is not None and thread.is_alive()
+
+
+# ============================================
+# LÍNEA DE COMANDOS
+# ============================================
+
+def main(argv=None):
+    """Punto de entrada: python -m utils.ai_digests"""
+    parser = argparse.ArgumentParser(description="Genera los análisis IA precalculados de las selecciones frecuentes")
+    parser.add_argument('--csv', default=None, help="CSV de partidos (por defecto data/multi_team_data_complete.csv)")
+    parser.add_argument('--selections', default=AI_DIGEST_SELECTIONS, help="JSON de selecciones (por defecto todas + cada temporada)")
+    parser.add_argument('--output-dir', default=str(AI_DIGEST_DIR), help="Carpeta raíz de los digests")
+    parser.add_argument('--force', action='store_true', help="Regenerar también los digests existentes")
+    args = parser.parse_args(argv)
+
+    df = load_match_store(args.csv)
+    if df is None:
+        print("❌ No se encontró el CSV de partidos")
+        return 1
+
+    selections = load_selections(df, args.selections)
+    print(f"🤖 {len(selections)} selecciones x {len(DIGEST_SECTIONS)} análisis")
+    summary = generate_digests(df, selections, store=DigestStore(args.output_dir), force=args.force)
+    print(f"✅ Versión {summary['version']}: {summary['generated']} generados, {summary['skipped']} ya existían, "
+          f"{summary['failed']} fallidos ({summary['seconds']}s)")
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
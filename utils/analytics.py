@@ -0,0 +1,586 @@
+"""
+============================================
+ANALYTICS - MÉTRICAS MULTI-TEAM EN BATCH
+============================================
+
+Bloques de métricas del dashboard Multi-Team como funciones vectorizadas
+(un groupby por bloque) y un punto de entrada de línea de comandos que
+calcula todas las métricas sin Streamlit y las escribe como artefactos
+Parquet/JSON:
+
+    python -m utils.analytics --format parquet --workers 4
+
+Cada "scope" es una selección de temporadas (cada temporada por separado
+y todas juntas) con todos los equipos; las métricas por equipo de cada
+combinación equipo/temporada quedan como filas de los artefactos. Los
+scopes se calculan en paralelo en un pool de procesos y el resultado se
+organiza en outputs/analytics/<version>/ con un manifest.json.
+"""
+
+import argparse
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .bootstrap import bootstrap_metrics
+from .head_to_head import HeadToHeadIndex
+from .match_store import data_version, load_match_store, oriented_goals
+from .outcome_model import get_outcome_model
+from .permutation_tests import academic_periodization_tests
+from .ratings import EloRatingEngine, add_rating_features, compute_srs
+from .streaming_stats import StreamingMoments
+from .summary_grid import team_summary_table
+from .trends import compute_rolling_form, latest_form
+
+# Meses de la temporada de soccer (Ago-Dic)
+SOCCER_MONTHS = ['August', 'September', 'October', 'November', 'December']
+
+# Carpeta por defecto de los artefactos
+ANALYTICS_OUTPUT_DIR = Path(__file__).parent.parent / "outputs" / "analytics"
+
+# Scope que agrupa todas las temporadas
+ALL_SEASONS = 'all'
+
+# Columnas de ratings pre-partido (artefacto match_ratings, una fila por partido)
+RATING_COLUMNS = ['team_rating', 'opponent_rating', 'rating_diff']
+
+
+# ============================================
+# BLOQUES DE MÉTRICAS (MISMAS TABLAS QUE EL DASHBOARD)
+# ============================================
+
+def _win_pct(wins, total):
+    """Porcentaje de victorias (0 cuando no hay partidos)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(total > 0, wins / total * 100, 0.0)
+
+
+def _wins_by(df, keys):
+    """Victorias y partidos por grupo (un único groupby)"""
+    grouped = (df['resultado_code'] == 'W').groupby([df[k] for k in keys], sort=True)
+    table = grouped.agg(['sum', 'size']).reset_index()
+    return table.rename(columns={'sum': 'Victorias', 'size': 'Total'})
+
+
+def win_rate_by_season(df):
+    """
+    Win rate por equipo y temporada (Tab 1)
+
+    Args:
+        df (pd.DataFrame): DataFrame de partidos (ya filtrado)
+
+    Returns:
+        pd.DataFrame: Equipo, Temporada, Win %, Victorias, Total
+    """
+    table = _wins_by(df, ['equipo', 'temporada'])
+    table['Win %'] = _win_pct(table['Victorias'], table['Total'])
+    table = table.rename(columns={'equipo': 'Equipo', 'temporada': 'Temporada'})
+    return table[['Equipo', 'Temporada', 'Win %', 'Victorias', 'Total']]
+
+
+def home_away_split(df):
+    """
+    Win rate Local vs Visitante por equipo (Tab 2)
+
+    Args:
+        df (pd.DataFrame): DataFrame de partidos (ya filtrado)
+
+    Returns:
+        pd.DataFrame: Equipo, Tipo (Local/Visitante), Win %, Victorias, Total
+    """
+    teams = sorted(df['equipo'].unique())
+    index = pd.MultiIndex.from_product([teams, [1, 0]], names=['equipo', 'home_advantage'])
+
+    table = _wins_by(df, ['equipo', 'home_advantage']).set_index(['equipo', 'home_advantage'])
+    table = table.reindex(index, fill_value=0).reset_index()
+
+    table['Win %'] = _win_pct(table['Victorias'], table['Total'])
+    table['Tipo'] = np.where(table['home_advantage'] == 1, 'Local', 'Visitante')
+    table = table.rename(columns={'equipo': 'Equipo'})
+    return table[['Equipo', 'Tipo', 'Win %', 'Victorias', 'Total']]
+
+
+def goals_per_game(df):
+    """
+    Goles a favor y en contra por partido (Tab 3)
+
+    Args:
+        df (pd.DataFrame): DataFrame de partidos (ya filtrado)
+
+    Returns:
+        pd.DataFrame: Equipo, Tipo (Goles a Favor/Goles en Contra), Promedio, Total
+    """
+    goals_for, goals_against = oriented_goals(df)
+    grouped = pd.DataFrame({
+        'equipo': df['equipo'].to_numpy(),
+        'Goles a Favor': goals_for,
+        'Goles en Contra': goals_against,
+    }).groupby('equipo', sort=True)
+
+    totals = grouped.sum()
+    games = grouped.size()
+
+    table = totals.stack().rename('Total').reset_index()
+    table.columns = ['Equipo', 'Tipo', 'Total']
+    table['Promedio'] = table['Total'] / games.loc[table['Equipo']].to_numpy()
+    return table[['Equipo', 'Tipo', 'Promedio', 'Total']]
+
+
+def monthly_performance(df, month_order=None):
+    """
+    Win rate por equipo y mes (Tab 4)
+
+    Args:
+        df (pd.DataFrame): DataFrame de partidos (ya filtrado)
+        month_order (list): Meses a incluir, en orden (por defecto SOCCER_MONTHS)
+
+    Returns:
+        pd.DataFrame: Equipo, Mes, Win %, Partidos (meses en orden de temporada)
+    """
+    month_order = month_order or SOCCER_MONTHS
+    subset = df[df['mes'].isin(month_order)]
+
+    table = _wins_by(subset, ['equipo', 'mes'])
+    table['Win %'] = _win_pct(table['Victorias'], table['Total'])
+    table['_order'] = table['mes'].map({m: i for i, m in enumerate(month_order)})
+    table = table.sort_values(['equipo', '_order']).reset_index(drop=True)
+
+    table = table.rename(columns={'equipo': 'Equipo', 'mes': 'Mes', 'Total': 'Partidos'})
+    return table[['Equipo', 'Mes', 'Win %', 'Partidos']]
+
+
+def november_decline(df, monthly=None):
+    """
+    Decline Octubre -> Noviembre por equipo (Tab 4)
+
+    Args:
+        df (pd.DataFrame): DataFrame de partidos (ya filtrado)
+        monthly (pd.DataFrame): Resultado de monthly_performance (se calcula si es None)
+
+    Returns:
+        pd.DataFrame: Equipo, Academic Rank, Octubre Win%, Noviembre Win%, Decline
+    """
+    monthly = monthly if monthly is not None else monthly_performance(df)
+    by_month = monthly.pivot(index='Equipo', columns='Mes', values='Win %')
+    ranks = df.groupby('equipo', sort=True)['team_academic_rank'].first()
+
+    table = pd.DataFrame({
+        'Equipo': ranks.index,
+        'Academic Rank': ranks.to_numpy(),
+        'Octubre Win%': by_month.get('October', pd.Series(dtype=float)).reindex(ranks.index).fillna(0).to_numpy(),
+        'Noviembre Win%': by_month.get('November', pd.Series(dtype=float)).reindex(ranks.index).fillna(0).to_numpy(),
+    })
+    table['Decline'] = table['Octubre Win%'] - table['Noviembre Win%']
+    return table
+
+
+def academic_performance(df):
+    """
+    Academic rank vs win rate por equipo (Métrica 2)
+
+    Args:
+        df (pd.DataFrame): DataFrame de partidos (ya filtrado)
+
+    Returns:
+        pd.DataFrame: Equipo, Academic Rank, Win %, Partidos
+    """
+    table = _wins_by(df, ['equipo'])
+    ranks = df.groupby('equipo', sort=True)['team_academic_rank'].first()
+
+    return pd.DataFrame({
+        'Equipo': table['equipo'],
+        'Academic Rank': ranks.loc[table['equipo']].to_numpy(),
+        'Win %': _win_pct(table['Victorias'], table['Total']),
+        'Partidos': table['Total'],
+    })
+
+
+def home_advantage_table(df, home_away=None):
+    """
+    Home Advantage Index detallado (Métrica 4)
+
+    Args:
+        df (pd.DataFrame): DataFrame de partidos (ya filtrado)
+        home_away (pd.DataFrame): Resultado de home_away_split (se calcula si es None)
+
+    Returns:
+        pd.DataFrame: Equipo, Local Win%, Visitante Win%, Home Advantage Index,
+                      Partidos Local, Partidos Visitante
+    """
+    home_away = home_away if home_away is not None else home_away_split(df)
+    wide = home_away.pivot(index='Equipo', columns='Tipo', values=['Win %', 'Total'])
+
+    table = pd.DataFrame({
+        'Equipo': wide.index,
+        'Local Win%': wide[('Win %', 'Local')].to_numpy(dtype=float),
+        'Visitante Win%': wide[('Win %', 'Visitante')].to_numpy(dtype=float),
+    })
+    table['Home Advantage Index'] = table['Local Win%'] - table['Visitante Win%']
+    table['Partidos Local'] = wide[('Total', 'Local')].to_numpy(dtype=np.int64)
+    table['Partidos Visitante'] = wide[('Total', 'Visitante')].to_numpy(dtype=np.int64)
+    return table
+
+
+def opponent_quality_thresholds(df_rated):
+    """
+    Terciles del rating pre-partido del rival sobre todo el histórico
+
+    Args:
+        df_rated (pd.DataFrame): Resultado de add_rating_features
+
+    Returns:
+        tuple: (límites [q1, q2], etiquetas de los tres rangos)
+    """
+    q1, q2 = df_rated['opponent_rating'].quantile([1 / 3, 2 / 3]).tolist()
+    labels = [f'Débil (<{q1:.0f})', f'Medio ({q1:.0f}-{q2:.0f})', f'Fuerte (>{q2:.0f})']
+    return [q1, q2], labels
+
+
+def opponent_quality_impact(df_rated, thresholds, labels):
+    """
+    Win rate por rango de calidad del rival (Métrica 1)
+
+    Args:
+        df_rated (pd.DataFrame): Partidos filtrados con opponent_rating
+        thresholds (list): Límites [q1, q2] de opponent_quality_thresholds
+        labels (list): Etiquetas de los rangos
+
+    Returns:
+        pd.DataFrame: Equipo, Rival, Win %, Partidos
+    """
+    ranges = pd.cut(
+        df_rated['opponent_rating'],
+        bins=[-float('inf'), thresholds[0], thresholds[1], float('inf')],
+        labels=labels
+    )
+    table = _wins_by(df_rated.assign(_rango=ranges.astype(str)), ['equipo', '_rango'])
+    table = table[table['_rango'].isin(labels)]
+    table['_order'] = table['_rango'].map({label: i for i, label in enumerate(labels)})
+    table = table.sort_values(['equipo', '_order']).reset_index(drop=True)
+
+    return pd.DataFrame({
+        'Equipo': table['equipo'],
+        'Rival': table['_rango'],
+        'Win %': _win_pct(table['Victorias'], table['Total']),
+        'Partidos': table['Total'],
+    })
+
+
+# ============================================
+# CÁLCULO POR SCOPE
+# ============================================
+
+def compute_scope_metrics(df_scope, df_rated_scope, quality_bins, n_boot=2000, n_perm=10000, seed=42):
+    """
+    Todas las métricas del dashboard para una selección
+
+    Args:
+        df_scope (pd.DataFrame): Partidos de la selección
+        df_rated_scope (pd.DataFrame): Los mismos partidos con opponent_rating
+        quality_bins (tuple): (límites, etiquetas) de opponent_quality_thresholds
+        n_boot (int): Remuestreos bootstrap
+        n_perm (int): Permutaciones
+        seed (int): Semilla
+
+    Returns:
+        dict: nombre de métrica -> pd.DataFrame
+    """
+    monthly = monthly_performance(df_scope)
+    home_away = home_away_split(df_scope)
+    consistency = StreamingMoments.from_frame(df_scope).rollup(['equipo']).summary()
+
+    return {
+        'summary': team_summary_table(df_scope),
+        'win_rate': win_rate_by_season(df_scope),
+        'home_away': home_away,
+        'goals': goals_per_game(df_scope),
+        'monthly': monthly,
+        'november_decline': november_decline(df_scope, monthly),
+        'opponent_quality': opponent_quality_impact(df_rated_scope, *quality_bins),
+        'academic': academic_performance(df_scope),
+        'consistency': consistency,
+        'home_advantage': home_advantage_table(df_scope, home_away),
+        'bootstrap_team': bootstrap_metrics(df_scope, ('equipo',), n_boot=n_boot, seed=seed),
+        'bootstrap_team_season': bootstrap_metrics(df_scope, ('equipo', 'temporada'), n_boot=n_boot, seed=seed),
+        'permutation_tests': academic_periodization_tests(df_scope, n_perm=n_perm, seed=seed),
+        'head_to_head': HeadToHeadIndex(df_scope).summary(),
+    }
+
+
+def compute_dataset_metrics(df, df_rated, engine):
+    """
+    Métricas que no dependen de la selección (una vez por versión de datos)
+
+    Args:
+        df (pd.DataFrame): Match store completo
+        df_rated (pd.DataFrame): Match store con ratings pre-partido
+        engine (EloRatingEngine): Motor Elo entrenado
+
+    Returns:
+        dict: nombre de métrica -> pd.DataFrame
+    """
+    outcome_model = get_outcome_model(df)
+    return {
+        'elo_ratings': engine.current_ratings(),
+        'match_ratings': df_rated[RATING_COLUMNS].reset_index(drop=True),
+        'srs_by_season': compute_srs(df, by_season=True),
+        'srs_all': compute_srs(df, by_season=False),
+        'rolling_form': latest_form(compute_rolling_form(df, window=5, reset_each_season=True)),
+        'outcome_coefficients': outcome_model['coefficients'],
+        'outcome_cv': outcome_model['cv_folds'],
+    }
+
+
+# ============================================
+# ESCRITURA DE ARTEFACTOS
+# ============================================
+
+def _parquet_available():
+    """True si hay un motor de Parquet instalado (pyarrow o fastparquet)"""
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        try:
+            import fastparquet  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+
+def write_artifact(table, path_without_ext, fmt):
+    """
+    Escribe una tabla como Parquet o JSON (records)
+
+    Args:
+        table (pd.DataFrame): Tabla a escribir
+        path_without_ext (Path): Ruta sin extensión
+        fmt (str): 'parquet' o 'json'
+
+    Returns:
+        str: Nombre del archivo escrito
+    """
+    table = table.reset_index(drop=True)
+    if fmt == 'parquet':
+        path = path_without_ext.with_suffix('.parquet')
+        # Parquet exige nombres de columna str y columnas object homogéneas
+        table.columns = [str(c) for c in table.columns]
+        table.to_parquet(path, index=False)
+    else:
+        path = path_without_ext.with_suffix('.json')
+        table.to_json(path, orient='records', date_format='iso', force_ascii=False, indent=2)
+    return path.name
+
+
+def scope_slug(seasons):
+    """Nombre de carpeta de un scope"""
+    return ALL_SEASONS if seasons == ALL_SEASONS else f"season_{seasons}"
+
+
+def _run_scope(task):
+    """
+    Calcula y escribe un scope (función de nivel de módulo para el pool)
+
+    Returns:
+        tuple: (slug, info del manifest)
+    """
+    df_scope, df_rated_scope, quality_bins, seasons, out_dir, fmt, n_boot, n_perm, seed = task
+
+    start_time = time.perf_counter()
+    metrics = compute_scope_metrics(df_scope, df_rated_scope, quality_bins, n_boot, n_perm, seed)
+
+    slug = scope_slug(seasons)
+    scope_dir = Path(out_dir) / slug
+    scope_dir.mkdir(parents=True, exist_ok=True)
+    files = {name: write_artifact(table, scope_dir / name, fmt) for name, table in metrics.items()}
+
+    return slug, {
+        'seasons': seasons,
+        'teams': sorted(df_scope['equipo'].unique().tolist()),
+        'matches': int(len(df_scope)),
+        'metrics': files,
+        'seconds': round(time.perf_counter() - start_time, 3),
+    }
+
+
+def run_batch(df, output_dir=ANALYTICS_OUTPUT_DIR, fmt='parquet', workers=4,
+              n_boot=2000, n_perm=10000, seed=42):
+    """
+    Calcula todas las métricas para todos los scopes y escribe los artefactos
+
+    Args:
+        df (pd.DataFrame): Match store completo
+        output_dir (Path): Carpeta raíz de artefactos
+        fmt (str): 'parquet' o 'json'
+        workers (int): Procesos en paralelo (1 = mismo proceso)
+        n_boot (int): Remuestreos bootstrap
+        n_perm (int): Permutaciones
+        seed (int): Semilla
+
+    Returns:
+        dict: Manifest escrito en <output_dir>/<version>/manifest.json
+    """
+    if fmt == 'parquet' and not _parquet_available():
+        print("⚠️ pyarrow/fastparquet no instalado: se escriben artefactos JSON")
+        fmt = 'json'
+
+    version = data_version(df)
+    out_dir = Path(output_dir) / version
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    # Ratings pre-partido una sola vez (compartidos por todos los scopes)
+    engine = EloRatingEngine().fit(df)
+    df_rated = add_rating_features(df, engine)
+    quality_bins = opponent_quality_thresholds(df_rated)
+
+    dataset_dir = out_dir / 'dataset'
+    dataset_dir.mkdir(parents=True, exist_ok=True)
+    dataset_files = {
+        name: write_artifact(table, dataset_dir / name, fmt)
+        for name, table in compute_dataset_metrics(df, df_rated, engine).items()
+    }
+
+    scopes = [ALL_SEASONS] + sorted(df['temporada'].unique().tolist())
+    tasks = []
+    for seasons in scopes:
+        mask = np.ones(len(df), dtype=bool) if seasons == ALL_SEASONS else (df['temporada'] == seasons).to_numpy()
+        tasks.append((df[mask], df_rated[mask], quality_bins, seasons, out_dir, fmt, n_boot, n_perm, seed))
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = dict(executor.map(_run_scope, tasks))
+    else:
+        results = dict(_run_scope(task) for task in tasks)
+
+    manifest = {
+        'version': version,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'format': fmt,
+        'matches': int(len(df)),
+        'parameters': {'n_boot': n_boot, 'n_perm': n_perm, 'seed': seed},
+        'dataset': dataset_files,
+        'scopes': results,
+    }
+    (out_dir / 'manifest.json').write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding='utf-8')
+    (Path(output_dir) / 'LATEST').write_text(version, encoding='utf-8')
+
+    return manifest
+
+
+def read_artifact(metric, seasons=ALL_SEASONS, version=None, output_dir=ANALYTICS_OUTPUT_DIR):
+    """
+    Lee un artefacto escrito por run_batch
+
+    Args:
+        metric (str): Nombre de la métrica (ej: 'win_rate', 'elo_ratings')
+        seasons (str): Temporada, ALL_SEASONS o 'dataset' para métricas globales
+        version (str): Versión de datos (por defecto la última escrita)
+        output_dir (Path): Carpeta raíz de artefactos
+
+    Returns:
+        pd.DataFrame: Tabla o None si no existe
+    """
+    output_dir = Path(output_dir)
+    if version is None:
+        latest = output_dir / 'LATEST'
+        if not latest.exists():
+            return None
+        version = latest.read_text(encoding='utf-8').strip()
+
+    folder = output_dir / version / ('dataset' if seasons == 'dataset' else scope_slug(seasons))
+    if (folder / f"{metric}.parquet").exists():
+        return pd.read_parquet(folder / f"{metric}.parquet")
+    if (folder / f"{metric}.json").exists():
+        return pd.read_json(folder / f"{metric}.json", orient='records')
+    return None
+
+
+def selection_scope(seasons, all_seasons):
+    """
+    Scope de artefacto que corresponde a una selección de temporadas
+
+    Args:
+        seasons (list): Temporadas seleccionadas
+        all_seasons (list): Temporadas disponibles
+
+    Returns:
+        ALL_SEASONS, la temporada o None si no hay artefacto para esa combinación
+    """
+    if set(seasons) == set(all_seasons):
+        return ALL_SEASONS
+    if len(seasons) == 1:
+        return seasons[0]
+    return None
+
+
+def read_selection_artifact(metric, version, teams, seasons, all_seasons, output_dir=ANALYTICS_OUTPUT_DIR):
+    """
+    Tabla precalculada de una métrica para la selección de equipos y temporadas
+
+    Las tablas de scope tienen una fila por equipo (columna 'Equipo'), así que
+    filtrar el artefacto de todos los equipos equivale a calcular sobre la selección.
+
+    Args:
+        metric (str): Nombre de la métrica de scope (ej: 'win_rate')
+        version (str): Versión de datos (data_version del DataFrame de la página)
+        teams (list): Equipos seleccionados
+        seasons (list): Temporadas seleccionadas
+        all_seasons (list): Temporadas disponibles
+        output_dir (Path): Carpeta raíz de artefactos
+
+    Returns:
+        pd.DataFrame: Tabla filtrada o None si no hay artefacto (calcular en la página)
+    """
+    scope = selection_scope(seasons, all_seasons)
+    if scope is None:
+        return None
+    table = read_artifact(metric, scope, version=version, output_dir=output_dir)
+    if table is None or 'Equipo' not in table.columns:
+        return None
+    return table[table['Equipo'].isin(teams)].reset_index(drop=True)
+
+
+# ============================================
+# LÍNEA DE COMANDOS
+# ============================================
+
+def main(argv=None):
+    """Punto de entrada: python -m utils.analytics"""
+    parser = argparse.ArgumentParser(
+        description="Calcula las métricas Multi-Team en batch y escribe artefactos Parquet/JSON"
+    )
+    parser.add_argument('--csv', default=None, help="CSV de partidos (por defecto data/multi_team_data_complete.csv)")
+    parser.add_argument('--output-dir', default=str(ANALYTICS_OUTPUT_DIR), help="Carpeta raíz de artefactos")
+    parser.add_argument('--format', choices=['parquet', 'json'], default='parquet', help="Formato de salida")
+    parser.add_argument('--workers', type=int, default=4, help="Procesos en paralelo")
+    parser.add_argument('--n-boot', type=int, default=2000, help="Remuestreos bootstrap")
+    parser.add_argument('--n-perm', type=int, default=10000, help="Permutaciones")
+    parser.add_argument('--seed', type=int, default=42, help="Semilla")
+    args = parser.parse_args(argv)
+
+    df = load_match_store(args.csv)
+    if df is None:
+        print("❌ No se encontró el CSV de partidos")
+        return 1
+
+    print(f"📊 {len(df)} partidos | {df['equipo'].nunique()} equipos | {df['temporada'].nunique()} temporadas")
+    start_time = time.perf_counter()
+    manifest = run_batch(
+        df, output_dir=args.output_dir, fmt=args.format, workers=args.workers,
+        n_boot=args.n_boot, n_perm=args.n_perm, seed=args.seed
+    )
+    elapsed = time.perf_counter() - start_time
+
+    for slug, info in manifest['scopes'].items():
+        print(f"  ✅ {slug}: {len(info['metrics'])} métricas ({info['seconds']:.2f}s)")
+    print(f"\n✅ Artefactos en {Path(args.output_dir) / manifest['version']} ({elapsed:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
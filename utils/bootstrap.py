@@ -0,0 +1,194 @@
+"""
+============================================
+BOOTSTRAP - INTERVALOS DE CONFIANZA
+============================================
+
+Intervalos de confianza bootstrap para las métricas del dashboard
+(Win %, Home Advantage Index y decline Octubre -> Noviembre).
+
+Los partidos se remuestrean dentro de cada grupo (equipo, o equipo y
+temporada) con una única matriz de índices B x n: cada columna pertenece a
+un grupo y solo toma índices de ese grupo, de modo que todas las métricas
+de todos los grupos se calculan en una sola pasada vectorizada.
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# Métricas disponibles y su etiqueta para la UI
+BOOTSTRAP_METRICS = {
+    'win_pct': 'Win %',
+    'home_advantage_index': 'Home Advantage Index',
+    'november_decline': 'Decline Octubre → Noviembre',
+}
+
+# Máximo de elementos de la matriz de índices por bloque (controla memoria)
+MAX_BLOCK_ELEMENTS = 5_000_000
+
+
+def _safe_pct(numerator, denominator):
+    """Porcentaje con NaN cuando el denominador es 0"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, numerator / denominator * 100, np.nan)
+
+
+def _metric_values(sums):
+    """
+    Calcula las métricas a partir de las sumas por grupo
+
+    Args:
+        sums (dict): Sumas por grupo (arrays de igual forma)
+
+    Returns:
+        dict: Valores de cada métrica de BOOTSTRAP_METRICS
+    """
+    return {
+        'win_pct': _safe_pct(sums['wins'], sums['games']),
+        'home_advantage_index': (
+            _safe_pct(sums['home_wins'], sums['home_games'])
+            - _safe_pct(sums['away_wins'], sums['away_games'])
+        ),
+        'november_decline': (
+            _safe_pct(sums['oct_wins'], sums['oct_games'])
+            - _safe_pct(sums['nov_wins'], sums['nov_games'])
+        ),
+    }
+
+
+def _indicator_columns(df):
+    """Indicadores por partido que alimentan las sumas de _metric_values"""
+    win = (df['resultado_code'] == 'W').to_numpy(dtype=np.float32)
+    home = (df['home_advantage'] == 1).to_numpy(dtype=np.float32)
+    away = (df['home_advantage'] == 0).to_numpy(dtype=np.float32)
+    october = (df['mes'] == 'October').to_numpy(dtype=np.float32)
+    november = (df['mes'] == 'November').to_numpy(dtype=np.float32)
+
+    return {
+        'wins': win,
+        'games': np.ones(len(df), dtype=np.float32),
+        'home_wins': win * home,
+        'home_games': home,
+        'away_wins': win * away,
+        'away_games': away,
+        'oct_wins': win * october,
+        'oct_games': october,
+        'nov_wins': win * november,
+        'nov_games': november,
+    }
+
+
+def bootstrap_metrics(df, group_cols=('equipo',), n_boot=2000, seed=42, confidence=0.95):
+    """
+    Intervalos de confianza bootstrap para todas las métricas y grupos
+
+    Args:
+        df (pd.DataFrame): DataFrame de partidos (ya filtrado)
+        group_cols (tuple): Columnas que definen cada grupo
+        n_boot (int): Número de remuestreos (B)
+        seed (int): Semilla del generador aleatorio
+        confidence (float): Nivel de confianza (ej: 0.95)
+
+    Returns:
+        pd.DataFrame: Columnas de grupo + metric, estimate, ci_low, ci_high, n
+    """
+    group_cols = list(group_cols)
+    columns = group_cols + ['metric', 'estimate', 'ci_low', 'ci_high', 'n']
+
+    if len(df) == 0:
+        return pd.DataFrame(columns=columns)
+
+    # Ordenar por grupo: cada grupo ocupa un bloque contiguo de columnas
+    ordered = df.sort_values(group_cols, kind='mergesort')
+    group_keys = ordered[group_cols].drop_duplicates().reset_index(drop=True)
+    group_codes = ordered.groupby(group_cols, sort=True).ngroup().to_numpy()
+    sizes = np.bincount(group_codes)
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+    indicators = _indicator_columns(ordered)
+    n_rows = len(ordered)
+
+    # Índices de columna: grupo de cada columna, su offset y su tamaño
+    col_offsets = offsets[group_codes]
+    col_sizes = sizes[group_codes]
+
+    rng = np.random.default_rng(seed)
+    block = max(1, MAX_BLOCK_ELEMENTS // n_rows)
+    boot_values = {metric: [] for metric in BOOTSTRAP_METRICS}
+
+    for start in range(0, n_boot, block):
+        rows = min(block, n_boot - start)
+
+        # Matriz de índices (rows x n): cada columna remuestrea dentro de su grupo
+        index_matrix = col_offsets + rng.integers(0, col_sizes, size=(rows, n_rows))
+
+        sums = {
+            name: np.add.reduceat(values[index_matrix], offsets, axis=1)
+            for name, values in indicators.items()
+        }
+
+        for metric, values in _metric_values(sums).items():
+            boot_values[metric].append(values)
+
+    point_sums = {
+        name: np.add.reduceat(values.astype(np.float64), offsets)
+        for name, values in indicators.items()
+    }
+    estimates = _metric_values(point_sums)
+
+    alpha = (1 - confidence) / 2
+    results = []
+    for metric in BOOTSTRAP_METRICS:
+        samples = np.concatenate(boot_values[metric], axis=0)
+        with warnings.catch_warnings():
+            # Grupos sin partidos en casa/fuera u Oct/Nov -> columnas todo NaN
+            warnings.simplefilter('ignore', RuntimeWarning)
+            low, high = np.nanquantile(samples, [alpha, 1 - alpha], axis=0)
+
+        metric_frame = group_keys.copy()
+        metric_frame['metric'] = metric
+        metric_frame['estimate'] = estimates[metric]
+        metric_frame['ci_low'] = low
+        metric_frame['ci_high'] = high
+        metric_frame['n'] = sizes
+        results.append(metric_frame)
+
+    return pd.concat(results, ignore_index=True)[columns]
+
+
+def ci_error_bars(ci_df, metric):
+    """
+    Convierte intervalos en columnas de error para Plotly (error_y / error_y_minus)
+
+    Args:
+        ci_df (pd.DataFrame): Resultado de bootstrap_metrics
+        metric (str): Métrica de BOOTSTRAP_METRICS
+
+    Returns:
+        pd.DataFrame: Columnas de grupo + estimate, ci_low, ci_high, ci_plus, ci_minus
+    """
+    subset = ci_df[ci_df['metric'] == metric].drop(columns='metric').copy()
+    subset['ci_plus'] = (subset['ci_high'] - subset['estimate']).clip(lower=0)
+    subset['ci_minus'] = (subset['estimate'] - subset['ci_low']).clip(lower=0)
+    return subset.reset_index(drop=True)
+
+
+# ============================================
+# TESTING
+# ============================================
+if __name__ == "__main__":
+    import time
+    from .match_store import load_match_store
+
+    print("Testing Bootstrap...")
+
+    matches = load_match_store()
+    if matches is None:
+        print("⚠️ No se encontró el CSV de partidos")
+    else:
+        start_time = time.perf_counter()
+        ci = bootstrap_metrics(matches, n_boot=10_000)
+        elapsed = time.perf_counter() - start_time
+        print(ci.round(1))
+        print(f"\n✅ B=10,000 en {elapsed:.3f}s")
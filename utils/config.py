@@ -21,9 +21,14 @@ DEBUG = os.getenv("DEBUG", "False") == "True"
 # ============================================
 # OPENAI API
 # ============================================
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 
+# URL base de la API (ej: http://127.0.0.1:8787/v1 para utils.mock_llm_server)
+OPENAI_API_BASE = os.getenv("OPENAI_API_BASE") or None
+
+# Un servidor local no valida la clave: con OPENAI_API_BASE basta una de relleno
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY") or ("sk-local" if OPENAI_API_BASE else None)
+
 # ============================================
 # WEB SCRAPING - 3C2A SPORTS
 # ============================================
@@ -51,6 +56,27 @@ OUTPUTS_FOLDER = "outputs"
 os.makedirs(DATA_FOLDER, exist_ok=True)
 os.makedirs(OUTPUTS_FOLDER, exist_ok=True)
 
+# ============================================
+# CACHÉ Y CONCURRENCIA DE PETICIONES IA
+# ============================================
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(OUTPUTS_FOLDER, "llm_cache.sqlite"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", 7 * 24 * 3600))  # 7 días
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 2000))
+
+# Peticiones simultáneas máximas a la API (por proceso, compartido entre sesiones)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 4))
+
+# Timeout por llamada (segundos) y reintentos con backoff exponencial
+LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", 60))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 3))
+LLM_BACKOFF_SECONDS = float(os.getenv("LLM_BACKOFF_SECONDS", 1.0))
+
+# Presupuesto de tokens del contexto de datos de cada prompt (se resume si se supera)
+LLM_CONTEXT_TOKEN_BUDGET = int(os.getenv("LLM_CONTEXT_TOKEN_BUDGET", 2000))
+
+# Selecciones de los análisis IA precalculados (JSON; vacío = todas + cada temporada)
+AI_DIGEST_SELECTIONS = os.getenv("AI_DIGEST_SELECTIONS") or None
+
 # ============================================
 # CONFIGURACIÓN DE VISUALIZACIONES
 # ============================================
@@ -82,8 +108,9 @@ def validate_config():
     """Valida que la configuración esté completa"""
     errors = []
     
+    # Sin API key solo se desactivan los análisis con IA (cada página lo indica)
     if not OPENAI_API_KEY:
-        errors.append("⚠️ OPENAI_API_KEY no está configurada en .env")
+        print("⚠️ OPENAI_API_KEY no está configurada en .env: análisis con IA desactivados")
     
     if errors:
         print("\n" + "="*50)
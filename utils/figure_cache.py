@@ -0,0 +1,145 @@
+"""
+============================================
+CACHÉ DE FIGURAS PLOTLY
+============================================
+
+Módulo para reutilizar figuras ya construidas entre reruns de Streamlit.
+Cada figura se guarda serializada (JSON) con una clave que combina el hash
+del DataFrame agregado de entrada y las opciones de layout.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import plotly.io as pio
+
+
+def hash_frame(df):
+    """
+    Calcula un hash estable del contenido de un DataFrame
+
+    Args:
+        df (pd.DataFrame): DataFrame a hashear
+
+    Returns:
+        str: Hash hexadecimal (16 caracteres)
+    """
+    hasher = hashlib.sha256()
+    hasher.update(json.dumps([str(c) for c in df.columns]).encode('utf-8'))
+    hasher.update(json.dumps([str(t) for t in df.dtypes]).encode('utf-8'))
+    hasher.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return hasher.hexdigest()[:16]
+
+
+class FigureCache:
+    """
+    Caché LRU de figuras Plotly serializadas en JSON
+    """
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self._store = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, name, df, options=None):
+        """
+        Construye la clave de caché de una figura
+
+        Args:
+            name (str): Identificador de la figura (ej: 'winrate')
+            df (pd.DataFrame): DataFrame agregado que alimenta la figura
+            options (dict): Opciones de layout que afectan a la figura
+
+        Returns:
+            str: Clave de caché
+        """
+        options_json = json.dumps(options or {}, sort_keys=True, default=str)
+        options_hash = hashlib.sha256(options_json.encode('utf-8')).hexdigest()[:16]
+        return f"{name}:{hash_frame(df)}:{options_hash}"
+
+    def get_or_build(self, name, df, builder, options=None):
+        """
+        Devuelve la figura cacheada o la construye con `builder`
+
+        Args:
+            name (str): Identificador de la figura
+            df (pd.DataFrame): DataFrame agregado de entrada
+            builder (callable): Función builder(df, options) -> go.Figure
+            options (dict): Opciones de layout (forman parte de la clave)
+
+        Returns:
+            go.Figure: Figura de Plotly
+        """
+        options = options or {}
+        key = self.make_key(name, df, options)
+
+        with self._lock:
+            cached = self._store.get(key)
+            if cached is not None:
+                self._store.move_to_end(key)
+                self.hits += 1
+
+        if cached is not None:
+            return pio.from_json(cached)
+
+        fig = builder(df, options)
+
+        with self._lock:
+            self.misses += 1
+            self._store[key] = fig.to_json()
+            self._store.move_to_end(key)
+            while len(self._store) > self.max_entries:
+                self._store.popitem(last=False)
+
+        return fig
+
+    def clear(self):
+        """Vacía la caché"""
+        with self._lock:
+            self._store.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Estadísticas de uso de la caché
+
+        Returns:
+            dict: Entradas, hits y misses
+        """
+        with self._lock:
+            return {
+                'entries': len(self._store),
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+# Instancia compartida entre reruns y sesiones (el módulo se importa una vez)
+figure_cache = FigureCache()
+
+
+# ============================================
+# TESTING
+# ============================================
+if __name__ == "__main__":
+    import plotly.express as px
+
+    print("Testing Figure Cache...")
+
+    df = pd.DataFrame({'Equipo': ['A', 'B'], 'Win %': [55.0, 40.0]})
+
+    def build(data, options):
+        fig = px.bar(data, x='Equipo', y='Win %')
+        fig.update_layout(height=options.get('height', 400))
+        return fig
+
+    cache = FigureCache()
+    cache.get_or_build('demo', df, build, {'height': 500})
+    cache.get_or_build('demo', df, build, {'height': 500})
+    print(f"✅ {cache.stats()}")
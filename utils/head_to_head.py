@@ -0,0 +1,198 @@
+"""
+============================================
+HEAD-TO-HEAD - ÍNDICE DE PARES (EQUIPO, OPONENTE)
+============================================
+
+Índice precomputado de enfrentamientos por (equipo, oponente, temporada):
+victorias, derrotas, empates, goles y secuencia de resultados. Se construye
+una vez por versión de datos con un único groupby; las vistas por selección
+(matriz head-to-head, drill-down de un oponente) se obtienen agregando o
+cortando el índice, sin volver a filtrar el DataFrame de partidos.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .match_store import chronological_sort, match_dates, oriented_goals
+
+# Valores disponibles para la matriz head-to-head y su etiqueta
+H2H_VALUES = {
+    'win_pct': 'Win %',
+    'ppg': 'Puntos por Partido',
+    'dif_goles_pp': 'Diferencia de Goles por Partido',
+    'partidos': 'Partidos Jugados',
+}
+
+
+class HeadToHeadIndex:
+    """
+    Índice de enfrentamientos por par (equipo, oponente)
+
+    Attributes:
+        pairs (pd.DataFrame): Una fila por (equipo, oponente, temporada)
+        last_n (int): Resultados recientes que se muestran por par
+    """
+
+    def __init__(self, df, last_n=5):
+        """
+        Args:
+            df (pd.DataFrame): DataFrame de partidos (match store)
+            last_n (int): Número de resultados recientes por par
+        """
+        self.last_n = last_n
+
+        ordered = chronological_sort(df)
+        goals_for, goals_against = oriented_goals(ordered)
+        result = ordered['resultado_code'].to_numpy()
+
+        self._matches = pd.DataFrame({
+            'equipo': ordered['equipo'].to_numpy(),
+            'oponente': ordered['oponente'].to_numpy(),
+            'temporada': ordered['temporada'].to_numpy(),
+            'fecha': match_dates(ordered).to_numpy(),
+            'local_visitante': ordered['local_visitante'].to_numpy(),
+            'resultado_code': result,
+            'goles_favor': goals_for,
+            'goles_contra': goals_against,
+        })
+
+        frame = self._matches.assign(
+            victorias=(result == 'W').astype(np.int64),
+            derrotas=(result == 'L').astype(np.int64),
+            empates=(result == 'T').astype(np.int64),
+        )
+
+        grouped = frame.groupby(['equipo', 'oponente', 'temporada'], sort=True)
+        self.pairs = grouped.agg(
+            partidos=('resultado_code', 'size'),
+            victorias=('victorias', 'sum'),
+            derrotas=('derrotas', 'sum'),
+            empates=('empates', 'sum'),
+            goles_favor=('goles_favor', 'sum'),
+            goles_contra=('goles_contra', 'sum'),
+            secuencia=('resultado_code', ''.join),
+            ultimo_partido=('fecha', 'max'),
+        ).reset_index()
+
+        # Posiciones de los partidos de cada par (drill-down sin filtrar)
+        self._pair_rows = frame.groupby(['equipo', 'oponente'], sort=False).indices
+
+    def summary(self, teams=None, seasons=None):
+        """
+        Resumen head-to-head agregado sobre la selección
+
+        Args:
+            teams (list): Equipos a incluir (None = todos)
+            seasons (list): Temporadas a incluir (None = todas)
+
+        Returns:
+            pd.DataFrame: Una fila por (equipo, oponente) con partidos, W/L/T,
+                          goles, win_pct, ppg, dif_goles_pp y ultimos
+        """
+        pairs = self.pairs
+        if teams is not None:
+            pairs = pairs[pairs['equipo'].isin(teams)]
+        if seasons is not None:
+            pairs = pairs[pairs['temporada'].isin(seasons)]
+
+        # Las temporadas están ordenadas dentro de cada par: la secuencia
+        # concatenada conserva el orden cronológico
+        summary = pairs.groupby(['equipo', 'oponente'], sort=True).agg(
+            partidos=('partidos', 'sum'),
+            victorias=('victorias', 'sum'),
+            derrotas=('derrotas', 'sum'),
+            empates=('empates', 'sum'),
+            goles_favor=('goles_favor', 'sum'),
+            goles_contra=('goles_contra', 'sum'),
+            secuencia=('secuencia', ''.join),
+            ultimo_partido=('ultimo_partido', 'max'),
+        ).reset_index()
+
+        summary['win_pct'] = summary['victorias'] / summary['partidos'] * 100
+        summary['ppg'] = (3 * summary['victorias'] + summary['empates']) / summary['partidos']
+        summary['dif_goles_pp'] = (summary['goles_favor'] - summary['goles_contra']) / summary['partidos']
+        summary['ultimos'] = summary['secuencia'].str[-self.last_n:]
+
+        return summary.drop(columns='secuencia')
+
+    def matrix(self, teams=None, seasons=None, value='win_pct', min_games=1, top_opponents=None):
+        """
+        Matriz equipo x oponente para el heatmap
+
+        Args:
+            teams (list): Equipos (filas)
+            seasons (list): Temporadas a incluir
+            value (str): Columna de H2H_VALUES
+            min_games (int): Partidos mínimos por par (el resto queda en NaN)
+            top_opponents (int): Solo los N oponentes con más partidos
+
+        Returns:
+            pd.DataFrame: Matriz (equipos x oponentes)
+        """
+        summary = self.summary(teams, seasons)
+        summary = summary[summary['partidos'] >= min_games]
+
+        opponent_games = summary.groupby('oponente')['partidos'].sum().sort_values(ascending=False)
+        if top_opponents:
+            opponent_games = opponent_games.head(top_opponents)
+
+        matrix = summary.pivot(index='equipo', columns='oponente', values=value)
+        return matrix.reindex(columns=opponent_games.index)
+
+    def opponents(self, team, seasons=None):
+        """
+        Oponentes de un equipo ordenados por número de enfrentamientos
+
+        Args:
+            team (str): Equipo
+            seasons (list): Temporadas a incluir
+
+        Returns:
+            list: Nombres de oponentes
+        """
+        summary = self.summary([team], seasons)
+        return summary.sort_values(['partidos', 'oponente'], ascending=[False, True])['oponente'].tolist()
+
+    def matches(self, team, opponent, seasons=None):
+        """
+        Partidos de un par (drill-down), en orden cronológico
+
+        Args:
+            team (str): Equipo
+            opponent (str): Oponente
+            seasons (list): Temporadas a incluir
+
+        Returns:
+            pd.DataFrame: fecha, temporada, local_visitante, resultado_code,
+                          goles_favor, goles_contra
+        """
+        rows = self._pair_rows.get((team, opponent), np.array([], dtype=np.int64))
+        pair_matches = self._matches.iloc[rows]
+        if seasons is not None:
+            pair_matches = pair_matches[pair_matches['temporada'].isin(seasons)]
+
+        return pair_matches[['fecha', 'temporada', 'local_visitante', 'resultado_code',
+                             'goles_favor', 'goles_contra']].reset_index(drop=True)
+
+
+# ============================================
+# TESTING
+# ============================================
+if __name__ == "__main__":
+    from .match_store import load_match_store
+
+    print("Testing Head-to-Head Index...")
+
+    matches = load_match_store()
+    if matches is None:
+        print("⚠️ No se encontró el CSV de partidos")
+    else:
+        index = HeadToHeadIndex(matches)
+        print(f"✅ {len(index.pairs)} pares (equipo, oponente, temporada)")
+        print(index.matrix(value='win_pct', top_opponents=8).round(0))
+
+        team = matches['equipo'].iloc[0]
+        opponent = index.opponents(team)[0]
+        print(f"\n{team} vs {opponent}")
+        print(index.matches(team, opponent))
+        print("\n✅ Testing completo")
@@ -0,0 +1,194 @@
+"""
+============================================
+LLM CACHE - CACHÉ PERSISTENTE DE RESPUESTAS
+============================================
+
+Caché en SQLite de las respuestas de ChatCompletion, indexada por un hash
+de (modelo, mensajes, temperatura, max_tokens). Las entradas caducan tras
+un TTL y, al superar el máximo de entradas, se eliminan las menos usadas
+recientemente (LRU).
+
+La base de datos se comparte entre procesos y sesiones de Streamlit, así
+que la misma selección pedida por distintos analistas se sirve sin llamar
+a la API.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from .config import LLM_CACHE_MAX_ENTRIES, LLM_CACHE_PATH, LLM_CACHE_TTL_SECONDS
+
+
+def make_cache_key(model, messages, temperature, max_tokens, response_format=None):
+    """
+    Hash estable de una petición
+
+    Args:
+        model (str): Modelo
+        messages (list): Mensajes de la conversación
+        temperature (float): Temperatura
+        max_tokens (int): Máximo de tokens
+        response_format (dict): Formato pedido (ej: JSON mode); None no cambia la clave
+
+    Returns:
+        str: SHA-256 hexadecimal
+    """
+    request = {'model': model, 'messages': messages, 'temperature': temperature, 'max_tokens': max_tokens}
+    if response_format is not None:
+        request['response_format'] = response_format
+    payload = json.dumps(request, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Caché de respuestas en SQLite con TTL y expulsión LRU
+    """
+
+    def __init__(self, path=LLM_CACHE_PATH, ttl_seconds=LLM_CACHE_TTL_SECONDS, max_entries=LLM_CACHE_MAX_ENTRIES):
+        """
+        Args:
+            path (str or Path): Archivo SQLite
+            ttl_seconds (float): Vida de cada entrada (None = sin caducidad)
+            max_entries (int): Entradas máximas antes de expulsar por LRU
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+
+    def _connect(self):
+        """Conexión nueva (SQLite no comparte conexiones entre hilos)"""
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def get(self, key):
+        """
+        Respuesta guardada para una clave
+
+        Args:
+            key (str): Resultado de make_cache_key
+
+        Returns:
+            str: Respuesta o None si no existe o ha caducado
+        """
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+
+            response, created_at = row
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+
+            conn.execute("UPDATE responses SET last_access = ?, hits = hits + 1 WHERE key = ?", (now, key))
+            return response
+
+    def set(self, key, response, model=None):
+        """
+        Guarda (o reemplaza) una respuesta y aplica el límite de entradas
+
+        Args:
+            key (str): Resultado de make_cache_key
+            response (str): Texto de la respuesta
+            model (str): Modelo (informativo)
+        """
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, created_at, last_access, hits) "
+                "VALUES (?, ?, ?, ?, ?, 0)",
+                (key, model, response, now, now)
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn, now):
+        """Elimina entradas caducadas y las menos usadas por encima del límite"""
+        if self.ttl_seconds is not None:
+            conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+
+        count = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+                (overflow,)
+            )
+
+    def clear(self):
+        """Vacía la caché"""
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM responses")
+
+    def stats(self):
+        """
+        Estadísticas de la caché
+
+        Returns:
+            dict: entries, hits (acumulados) y path
+        """
+        with self._lock, self._connect() as conn:
+            entries, hits = conn.execute("SELECT COUNT(*), COALESCE(SUM(hits), 0) FROM responses").fetchone()
+        return {'entries': entries, 'hits': hits, 'path': str(self.path)}
+
+
+# Instancia compartida por OpenAIHelper y las páginas
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """
+    Caché por defecto (creada una vez por proceso)
+
+    Returns:
+        LLMResponseCache: Caché en LLM_CACHE_PATH
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = LLMResponseCache()
+    return _default_cache
+
+
+# ============================================
+# TESTING
+# ============================================
+if __name__ == "__main__":
+    import tempfile
+
+    print("Testing LLM Cache...")
+
+    cache = LLMResponseCache(Path(tempfile.mkdtemp()) / "cache.sqlite", ttl_seconds=60, max_entries=3)
+    messages = [{"role": "user", "content": "Hola"}]
+    key = make_cache_key("gpt-4o-mini", messages, 0.7, 100)
+
+    print(f"Miss inicial: {cache.get(key)}")
+    cache.set(key, "Respuesta", model="gpt-4o-mini")
+    print(f"Hit: {cache.get(key)}")
+
+    for i in range(5):
+        cache.set(make_cache_key("gpt-4o-mini", messages, 0.7, i), f"r{i}")
+    print(f"✅ {cache.stats()}")
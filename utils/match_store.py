@@ -0,0 +1,183 @@
+"""
+============================================
+MATCH STORE - DATOS MULTI-EQUIPO
+============================================
+
+Carga y utilidades comunes sobre el CSV de partidos multi-equipo
+(data/multi_team_data_complete.csv): versión de datos, orden cronológico
+y resultados orientados desde la perspectiva de cada equipo.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .figure_cache import hash_frame
+
+# Ruta por defecto del CSV procesado
+MATCH_STORE_PATH = Path(__file__).parent.parent / "data" / "multi_team_data_complete.csv"
+
+# Orden de los meses dentro de una temporada (Agosto -> Mayo)
+SEASON_MONTH_ORDER = [8, 9, 10, 11, 12, 1, 2, 3, 4, 5]
+
+# Puntos por resultado (formato liga: 3-1-0)
+POINTS_BY_RESULT = {'W': 3, 'T': 1, 'L': 0}
+
+
+def load_match_store(csv_path=None):
+    """
+    Carga el CSV de partidos multi-equipo
+
+    Args:
+        csv_path (str or Path): Ruta del CSV (por defecto data/multi_team_data_complete.csv)
+
+    Returns:
+        pd.DataFrame: DataFrame de partidos o None si no existe el archivo
+    """
+    csv_path = Path(csv_path) if csv_path else MATCH_STORE_PATH
+
+    if not csv_path.exists():
+        return None
+
+    return pd.read_csv(csv_path)
+
+
+def data_version(df):
+    """
+    Versión de los datos (hash del contenido del DataFrame)
+
+    Se usa como clave de caché para todo lo que se calcula sobre el match store.
+
+    Args:
+        df (pd.DataFrame): DataFrame de partidos
+
+    Returns:
+        str: Identificador de versión
+    """
+    return hash_frame(df)
+
+
+def season_month_index(mes_num):
+    """
+    Posición del mes dentro de la temporada (Agosto=0, Septiembre=1, ...)
+
+    Args:
+        mes_num (array-like): Número de mes (1-12)
+
+    Returns:
+        np.ndarray: Índice del mes dentro de la temporada
+    """
+    return (np.asarray(mes_num, dtype=np.int64) - 8) % 12
+
+
+def chronological_sort(df):
+    """
+    Ordena los partidos cronológicamente por (temporada, mes, día)
+
+    Args:
+        df (pd.DataFrame): DataFrame de partidos
+
+    Returns:
+        pd.DataFrame: Copia ordenada con índice reiniciado
+    """
+    ordered = df.assign(_month_idx=season_month_index(df['mes_num']))
+    ordered = ordered.sort_values(['temporada', '_month_idx', 'day'], kind='mergesort')
+    return ordered.drop(columns='_month_idx').reset_index(drop=True)
+
+
+def oriented_goals(df):
+    """
+    Goles a favor y en contra orientados según el resultado
+
+    El marcador del CSV se escribe con el ganador primero ("3-0" en una
+    derrota significa 0-3), por lo que `goals_for` / `goals_against` solo
+    son correctos en victorias y empates.
+
+    Args:
+        df (pd.DataFrame): DataFrame de partidos
+
+    Returns:
+        tuple: (goles_favor, goles_contra) como np.ndarray
+    """
+    first = df['goals_for'].to_numpy()
+    second = df['goals_against'].to_numpy()
+    high = np.maximum(first, second)
+    low = np.minimum(first, second)
+    lost = (df['resultado_code'] == 'L').to_numpy()
+
+    goals_for = np.where(lost, low, high)
+    goals_against = np.where(lost, high, low)
+    return goals_for, goals_against
+
+
+def result_points(df):
+    """
+    Puntos obtenidos en cada partido (W=3, T=1, L=0)
+
+    Args:
+        df (pd.DataFrame): DataFrame de partidos
+
+    Returns:
+        np.ndarray: Puntos por partido
+    """
+    return df['resultado_code'].map(POINTS_BY_RESULT).fillna(0).to_numpy(dtype=np.int64)
+
+
+def match_dates(df):
+    """
+    Fecha de cada partido a partir de (temporada, mes_num, day)
+
+    Los meses de Agosto a Diciembre pertenecen al primer año de la
+    temporada ("2025-2026" -> 2025) y los de Enero a Mayo al segundo.
+
+    Args:
+        df (pd.DataFrame): DataFrame de partidos
+
+    Returns:
+        pd.Series: Fechas (datetime64) alineadas con el índice de df
+    """
+    start_year = df['temporada'].str.slice(0, 4).astype(int)
+    year = np.where(df['mes_num'] >= SEASON_MONTH_ORDER[0], start_year, start_year + 1)
+    return pd.to_datetime(
+        pd.DataFrame({'year': year, 'month': df['mes_num'], 'day': df['day']}, index=df.index),
+        errors='coerce'
+    )
+
+
+def unique_matches(df):
+    """
+    Un registro por partido real (sin duplicados)
+
+    Cuando ambos equipos están en el CSV el mismo partido aparece dos veces,
+    una desde la perspectiva de cada equipo. Aquí se conserva solo la primera.
+
+    Args:
+        df (pd.DataFrame): DataFrame de partidos
+
+    Returns:
+        pd.DataFrame: Columnas fecha, temporada, team_a, team_b, a_home,
+                      goals_a, goals_b, result_a y match_key, ordenadas
+                      cronológicamente
+    """
+    goals_for, goals_against = oriented_goals(df)
+
+    games = pd.DataFrame({
+        'fecha': match_dates(df).to_numpy(),
+        'temporada': df['temporada'].to_numpy(),
+        'team_a': df['equipo'].to_numpy(),
+        'team_b': df['oponente'].to_numpy(),
+        'a_home': df['home_advantage'].to_numpy(dtype=np.int64),
+        'goals_a': goals_for,
+        'goals_b': goals_against,
+        'result_a': df['resultado_code'].to_numpy(),
+    })
+
+    first = np.where(games['team_a'] < games['team_b'], games['team_a'], games['team_b'])
+    second = np.where(games['team_a'] < games['team_b'], games['team_b'], games['team_a'])
+    games['match_key'] = (
+        games['fecha'].dt.strftime('%Y-%m-%d') + '|' + first + '|' + second
+    )
+
+    games = games.drop_duplicates('match_key', keep='first')
+    return games.sort_values(['fecha', 'match_key'], kind='mergesort').reset_index(drop=True)
@@ -0,0 +1,376 @@
+"""
+============================================
+METRICS API - JSON DE SOLO LECTURA
+============================================
+
+API HTTP local (solo librería estándar) con las métricas del dashboard
+Multi-Team: win rate por temporada, home advantage y rendimiento mensual,
+filtrables por equipo, temporada y mes.
+
+Los agregados se leen de los artefactos de `python -m utils.analytics`
+(o se calculan una sola vez al arrancar si no existen). Cada respuesta se
+serializa una vez y se guarda en memoria junto con su versión gzip y su
+ETag, así que las peticiones repetidas no tocan pandas:
+
+    python -m utils.metrics_api --port 8765
+
+    GET /api/win-rate?team=Fullerton&season=2023-2024,2024-2025
+    GET /api/home-advantage?season=all
+    GET /api/monthly?team=Cypress,Santa%20Ana&month=November
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from .analytics import (
+    ALL_SEASONS, ANALYTICS_OUTPUT_DIR, home_advantage_table, monthly_performance, read_artifact,
+    win_rate_by_season
+)
+from .match_store import data_version, load_match_store
+
+# Columnas de cada endpoint: artefacto -> nombres de la API
+API_TABLES = {
+    'win-rate': {
+        'metric': 'win_rate',
+        'compute': win_rate_by_season,
+        'columns': {'Equipo': 'team', 'Temporada': 'season', 'Win %': 'win_pct',
+                    'Victorias': 'wins', 'Total': 'games'},
+    },
+    'home-advantage': {
+        'metric': 'home_advantage',
+        'compute': home_advantage_table,
+        'columns': {'Equipo': 'team', 'Local Win%': 'home_win_pct', 'Visitante Win%': 'away_win_pct',
+                    'Home Advantage Index': 'home_advantage_index',
+                    'Partidos Local': 'home_games', 'Partidos Visitante': 'away_games'},
+    },
+    'monthly': {
+        'metric': 'monthly',
+        'compute': monthly_performance,
+        'columns': {'Equipo': 'team', 'Mes': 'month', 'Win %': 'win_pct', 'Partidos': 'games'},
+    },
+}
+
+# Respuestas serializadas que se mantienen en memoria
+RESPONSE_CACHE_SIZE = 1024
+
+# Respuestas más pequeñas no se comprimen
+GZIP_MIN_BYTES = 512
+
+
+class MetricsStore:
+    """
+    Agregados precalculados por scope (temporada o 'all') y caché de respuestas
+
+    Attributes:
+        version (str): Versión de datos de los agregados
+        tables (dict): {(endpoint, scope): lista de registros}
+    """
+
+    def __init__(self, tables, version, cache_size=RESPONSE_CACHE_SIZE):
+        """
+        Args:
+            tables (dict): {(endpoint, scope): pd.DataFrame con columnas de la API}
+            version (str): Versión de datos
+            cache_size (int): Respuestas serializadas en memoria
+        """
+        self.version = version
+        self.tables = {
+            key: table.astype(object).where(table.notna(), None).to_dict(orient='records')
+            for key, table in tables.items()
+        }
+        self.scopes = sorted({scope for _, scope in tables})
+        self.cache_size = cache_size
+        self._responses = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_artifacts(cls, output_dir=ANALYTICS_OUTPUT_DIR, version=None):
+        """
+        Carga los agregados desde los artefactos de utils.analytics
+
+        Returns:
+            MetricsStore: Store o None si no hay artefactos
+        """
+        output_dir = Path(output_dir)
+        manifest_version = version
+        if manifest_version is None:
+            latest = output_dir / 'LATEST'
+            if not latest.exists():
+                return None
+            manifest_version = latest.read_text(encoding='utf-8').strip()
+
+        manifest_path = output_dir / manifest_version / 'manifest.json'
+        if not manifest_path.exists():
+            return None
+        manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+
+        tables = {}
+        for slug, info in manifest['scopes'].items():
+            for endpoint, spec in API_TABLES.items():
+                table = read_artifact(spec['metric'], info['seasons'], manifest_version, output_dir)
+                if table is not None:
+                    tables[(endpoint, info['seasons'])] = table.rename(columns=spec['columns'])
+
+        return cls(tables, manifest_version)
+
+    @classmethod
+    def from_frame(cls, df):
+        """
+        Calcula los agregados una vez a partir del match store
+
+        Returns:
+            MetricsStore: Store con todos los scopes
+        """
+        tables = {}
+        for scope in [ALL_SEASONS] + sorted(df['temporada'].unique().tolist()):
+            df_scope = df if scope == ALL_SEASONS else df[df['temporada'] == scope]
+            for endpoint, spec in API_TABLES.items():
+                tables[(endpoint, scope)] = spec['compute'](df_scope).rename(columns=spec['columns'])
+
+        return cls(tables, data_version(df))
+
+    def query(self, endpoint, teams=None, seasons=None, months=None):
+        """
+        Registros de un endpoint filtrados
+
+        Args:
+            endpoint (str): Clave de API_TABLES
+            teams (list): Equipos (None = todos)
+            seasons (list): Temporadas o ['all'] (por defecto 'all'); varias solo en 'win-rate'
+            months (list): Meses (solo 'monthly')
+
+        Returns:
+            list: Registros o None si el endpoint/scope no existe
+
+        Raises:
+            ValueError: Si se piden varias temporadas en un endpoint agregado por scope
+        """
+        seasons = [] if not seasons or ALL_SEASONS in seasons else list(seasons)
+
+        # El timeline de win rate tiene la temporada como fila: se filtra el scope global
+        if endpoint == 'win-rate':
+            records = self.tables.get((endpoint, ALL_SEASONS))
+            if records is not None and seasons:
+                records = [r for r in records if r['season'] in seasons]
+        elif len(seasons) > 1:
+            raise ValueError(f"'{endpoint}' admite una sola temporada (o 'all')")
+        else:
+            records = self.tables.get((endpoint, seasons[0] if seasons else ALL_SEASONS))
+
+        if records is None:
+            return None
+        if teams:
+            records = [r for r in records if r['team'] in teams]
+        if months and endpoint == 'monthly':
+            records = [r for r in records if r['month'] in months]
+        return records
+
+    def response(self, cache_key, build):
+        """
+        Respuesta serializada (cuerpo, cuerpo gzip, ETag) con caché LRU
+
+        Args:
+            cache_key (tuple): Clave normalizada de la petición
+            build (callable): Devuelve el objeto JSON si no está en caché
+
+        Returns:
+            tuple: (status, body, gzip_body, etag)
+        """
+        with self._lock:
+            if cache_key in self._responses:
+                self._responses.move_to_end(cache_key)
+                self.hits += 1
+                return self._responses[cache_key]
+
+        status, payload = build()
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        gzip_body = gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_BYTES else None
+        etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        entry = (status, body, gzip_body, etag)
+
+        with self._lock:
+            self.misses += 1
+            self._responses[cache_key] = entry
+            while len(self._responses) > self.cache_size:
+                self._responses.popitem(last=False)
+
+        return entry
+
+
+def _etag_matches(if_none_match, etag):
+    """
+    True si la cabecera If-None-Match incluye el ETag
+
+    Args:
+        if_none_match (str): Valor de la cabecera (lista separada por comas o '*')
+        etag (str): ETag de la respuesta (entre comillas)
+
+    Returns:
+        bool: Coincidencia exacta (comparación débil: se ignora el prefijo W/)
+    """
+    for tag in (if_none_match or '').split(','):
+        tag = tag.strip()
+        if tag == '*' or (tag[2:] if tag.startswith('W/') else tag) == etag:
+            return True
+    return False
+
+
+def _split_param(params, name):
+    """Valores de un parámetro (repetido o separado por comas), ordenados"""
+    values = []
+    for raw in params.get(name, []):
+        values.extend(v.strip() for v in raw.split(',') if v.strip())
+    return tuple(sorted(set(values)))
+
+
+def make_handler(store):
+    """
+    Clase de handler HTTP ligada a un MetricsStore
+
+    Args:
+        store (MetricsStore): Agregados y caché de respuestas
+
+    Returns:
+        type: Subclase de BaseHTTPRequestHandler
+    """
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        server_version = 'SoccerMetricsAPI/1.0'
+
+        # Cabeceras y cuerpo van en escrituras separadas: sin Nagle no hay
+        # espera de ACK retardado en conexiones keep-alive
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            """Sin log por petición (el throughput importa más que el log)"""
+
+        def _build(self, path, params):
+            """Construye (status, payload) de una petición"""
+            if path in ('/api', '/api/'):
+                return 200, {
+                    'version': store.version,
+                    'endpoints': [f'/api/{name}' for name in API_TABLES] + ['/api/health'],
+                    'seasons': store.scopes,
+                    'params': ['team', 'season', 'month'],
+                }
+            if path == '/api/health':
+                return 200, {'status': 'ok', 'version': store.version}
+
+            endpoint = path[len('/api/'):] if path.startswith('/api/') else None
+            if endpoint not in API_TABLES:
+                return 404, {'error': f'Endpoint no encontrado: {path}'}
+
+            try:
+                records = store.query(endpoint, params['team'], params['season'], params['month'])
+            except ValueError as e:
+                return 400, {'error': str(e), 'seasons': store.scopes}
+            if records is None:
+                return 404, {'error': f"Temporada no disponible: {', '.join(params['season'])}", 'seasons': store.scopes}
+
+            return 200, {
+                'version': store.version,
+                'endpoint': endpoint,
+                'filters': {k: list(v) for k, v in params.items() if v},
+                'count': len(records),
+                'data': records,
+            }
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            raw_params = parse_qs(url.query)
+            params = {name: _split_param(raw_params, name) for name in ('team', 'season', 'month')}
+            path = url.path.rstrip('/') or '/'
+            if path == '/api':
+                path = '/api/'
+
+            status, body, gzip_body, etag = store.response(
+                (path, params['team'], params['season'], params['month']),
+                lambda: self._build(path, params)
+            )
+
+            if status == 200 and _etag_matches(self.headers.get('If-None-Match'), etag):
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            use_gzip = gzip_body is not None and 'gzip' in self.headers.get('Accept-Encoding', '')
+            payload = gzip_body if use_gzip else body
+
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(payload)))
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'public, max-age=60')
+            self.send_header('Vary', 'Accept-Encoding')
+            if use_gzip:
+                self.send_header('Content-Encoding', 'gzip')
+            self.end_headers()
+            self.wfile.write(payload)
+
+    return MetricsHandler
+
+
+def create_server(store, host='127.0.0.1', port=8765):
+    """
+    Servidor HTTP multi-hilo sobre un MetricsStore
+
+    Args:
+        store (MetricsStore): Agregados precalculados
+        host (str): Interfaz
+        port (int): Puerto (0 = cualquiera libre)
+
+    Returns:
+        ThreadingHTTPServer: Servidor sin arrancar (usar serve_forever)
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(store))
+    server.daemon_threads = True
+    return server
+
+
+# ============================================
+# LÍNEA DE COMANDOS
+# ============================================
+
+def main(argv=None):
+    """Punto de entrada: python -m utils.metrics_api"""
+    parser = argparse.ArgumentParser(description="API JSON de solo lectura con las métricas Multi-Team")
+    parser.add_argument('--host', default='127.0.0.1', help="Interfaz de escucha")
+    parser.add_argument('--port', type=int, default=8765, help="Puerto")
+    parser.add_argument('--artifacts-dir', default=str(ANALYTICS_OUTPUT_DIR), help="Artefactos de utils.analytics")
+    parser.add_argument('--csv', default=None, help="CSV de partidos (si no hay artefactos)")
+    args = parser.parse_args(argv)
+
+    store = MetricsStore.from_artifacts(args.artifacts_dir)
+    if store is None:
+        df = load_match_store(args.csv)
+        if df is None:
+            print("❌ No hay artefactos ni CSV de partidos")
+            return 1
+        print("⚠️ No hay artefactos: calculando agregados desde el CSV (una sola vez)")
+        store = MetricsStore.from_frame(df)
+
+    server = create_server(store, args.host, args.port)
+    print(f"✅ Metrics API (versión {store.version}) en http://{args.host}:{server.server_address[1]}/api/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,358 @@
+"""
+============================================
+MOCK LLM SERVER - CHATCOMPLETION LOCAL
+============================================
+
+Servidor HTTP local (solo librería estándar) con la forma del endpoint
+/v1/chat/completions que usa openai==0.28.1, normal y en streaming (SSE).
+Permite ejecutar OpenAIHelper, las páginas y los benchmarks sin red ni
+API key, con respuestas deterministas:
+
+    python -m utils.mock_llm_server --port 8787 --latency 0.5 --error-rate 0.1
+
+    # .env
+    OPENAI_API_BASE=http://127.0.0.1:8787/v1
+
+Respuestas con guion: un JSON con reglas {"match": texto, "response": texto}
+que se comparan con el último mensaje (la primera que coincide gana) y una
+respuesta por defecto. Sin guion, las peticiones que piden JSON reciben un
+análisis de fortalezas/debilidades válido y el resto un texto simulado. Si
+el prompt lista las claves esperadas como lista JSON entre paréntesis (el
+análisis agrupado de OpenAIHelper.analyze_teams_batch: "claves ... ([...])"),
+la respuesta es un objeto con ese análisis para cada clave.
+
+Inyección de latencia (base + jitter, y retardo por fragmento en streaming)
+y de errores (las N primeras peticiones o una fracción aleatoria con
+semilla), con el status y la cabecera Retry-After que usa el backoff.
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Mensaje y tipo de error de OpenAI por status inyectado
+ERROR_TYPES = {
+    429: ('Rate limit reached (mock)', 'rate_limit_exceeded'),
+    500: ('The server had an error while processing your request (mock)', 'server_error'),
+    503: ('The server is overloaded or not ready yet (mock)', 'server_error'),
+}
+
+# Respuesta por defecto cuando el prompt pide JSON
+DEFAULT_JSON_RESPONSE = {
+    "fortalezas": ["Solidez defensiva", "Eficacia en jugadas a balón parado", "Buen rendimiento como local"],
+    "debilidades": ["Baja conversión de ocasiones", "Irregularidad fuera de casa", "Acumulación de tarjetas"],
+    "recomendaciones": ["Trabajar la finalización", "Rotar el once en semanas de exámenes"],
+}
+
+# Lista JSON de claves esperadas en el prompt: "cuyas claves sean ... (["A", "B"])"
+REQUESTED_KEYS_PATTERN = re.compile(r"claves[^(]*\((\[.*?\])\)", re.DOTALL)
+
+
+def requested_keys(text):
+    """Claves que el prompt pide en la respuesta JSON (None si no lista ninguna)"""
+    match = REQUESTED_KEYS_PATTERN.search(text)
+    if not match:
+        return None
+    try:
+        keys = json.loads(match.group(1))
+    except ValueError:
+        return None
+    if not keys or not all(isinstance(key, str) for key in keys):
+        return None
+    return keys
+
+
+class MockBehavior:
+    """
+    Respuestas con guion, latencia y errores inyectados del servidor mock
+
+    Attributes:
+        stats (dict): requests, stream_requests, errors y tokens servidos
+    """
+
+    def __init__(self, rules=None, default=None, latency=0.0, jitter=0.0, token_delay=0.0,
+                 error_rate=0.0, error_status=429, fail_first=0, retry_after=None, seed=42):
+        """
+        Args:
+            rules (list): [{'match': texto, 'response': texto}] comparadas con el último mensaje
+            default (str): Respuesta si ninguna regla coincide (None = automática)
+            latency (float): Latencia base por petición (segundos)
+            jitter (float): Latencia extra aleatoria máxima (segundos)
+            token_delay (float): Espera entre fragmentos en streaming (segundos)
+            error_rate (float): Fracción de peticiones que fallan (0-1)
+            error_status (int): Status de los errores inyectados (429, 500, 503)
+            fail_first (int): Las N primeras peticiones fallan siempre
+            retry_after (float): Cabecera Retry-After de los errores (None = sin cabecera)
+            seed (int): Semilla de latencias y errores
+        """
+        self.rules = list(rules or [])
+        self.default = default
+        self.latency = latency
+        self.jitter = jitter
+        self.token_delay = token_delay
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.fail_first = fail_first
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'stream_requests': 0, 'errors': 0, 'completion_tokens': 0}
+
+    @classmethod
+    def from_script(cls, path, **kwargs):
+        """
+        Comportamiento desde un guion JSON {"rules": [...], "default": "..."}
+
+        Args:
+            path (str or Path): Archivo del guion
+            **kwargs: Resto de argumentos de MockBehavior
+
+        Returns:
+            MockBehavior
+        """
+        script = json.loads(Path(path).read_text(encoding='utf-8'))
+        return cls(rules=script.get('rules'), default=script.get('default'), **kwargs)
+
+    def admit(self, stream):
+        """
+        Registra una petición y decide si falla y cuánto tarda
+
+        Returns:
+            tuple: (status de error o None, latencia en segundos)
+        """
+        with self._lock:
+            self.stats['requests'] += 1
+            if stream:
+                self.stats['stream_requests'] += 1
+            number = self.stats['requests']
+            fail = number <= self.fail_first or self._rng.random() < self.error_rate
+            if fail:
+                self.stats['errors'] += 1
+            delay = self.latency + self._rng.random() * self.jitter
+        return (self.error_status if fail else None), delay
+
+    def respond(self, messages):
+        """
+        Texto de respuesta para una conversación
+
+        Args:
+            messages (list): Mensajes de la petición
+
+        Returns:
+            str: Respuesta con guion, por defecto o automática
+        """
+        last = messages[-1].get('content', '') if messages else ''
+        for rule in self.rules:
+            if rule.get('match', '') in last:
+                return rule['response']
+        if self.default is not None:
+            return self.default
+
+        if any('JSON' in (m.get('content') or '') for m in messages):
+            keys = requested_keys(last)
+            if keys:
+                return json.dumps({key: DEFAULT_JSON_RESPONSE for key in keys}, ensure_ascii=False)
+            return json.dumps(DEFAULT_JSON_RESPONSE, ensure_ascii=False)
+        with self._lock:
+            number = self.stats['requests']
+        return f"Respuesta simulada #{number}: {' '.join(last.split()[:12])}…"
+
+    def count_tokens(self, n):
+        with self._lock:
+            self.stats['completion_tokens'] += n
+
+
+def _split_tokens(text):
+    """Fragmentos de streaming (palabra + espacio, como deltas de OpenAI)"""
+    words = text.split(' ')
+    return [w + (' ' if i < len(words) - 1 else '') for i, w in enumerate(words)]
+
+
+def make_handler(behavior):
+    """
+    Clase de handler HTTP ligada a un MockBehavior
+
+    Args:
+        behavior (MockBehavior): Respuestas, latencia y errores
+
+    Returns:
+        type: Subclase de BaseHTTPRequestHandler
+    """
+
+    class MockLLMHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        server_version = 'MockLLM/1.0'
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            """Sin log por petición"""
+
+        def _send_json(self, status, payload, headers=None):
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path.rstrip('/') in ('/v1/stats', '/stats'):
+                self._send_json(200, behavior.stats)
+            else:
+                self._send_json(404, {'error': {'message': f'Ruta no encontrada: {self.path}', 'type': 'invalid_request_error'}})
+
+        def do_POST(self):
+            if not self.path.rstrip('/').endswith('/chat/completions'):
+                self._send_json(404, {'error': {'message': f'Ruta no encontrada: {self.path}', 'type': 'invalid_request_error'}})
+                return
+
+            length = int(self.headers.get('Content-Length', 0))
+            try:
+                request = json.loads(self.rfile.read(length) or b'{}')
+            except ValueError:
+                self._send_json(400, {'error': {'message': 'JSON inválido', 'type': 'invalid_request_error'}})
+                return
+
+            messages = request.get('messages') or []
+            model = request.get('model', 'mock')
+            stream = bool(request.get('stream'))
+
+            error_status, delay = behavior.admit(stream)
+            time.sleep(delay)
+
+            if error_status is not None:
+                message, code = ERROR_TYPES.get(error_status, ERROR_TYPES[500])
+                headers = {'Retry-After': str(behavior.retry_after)} if behavior.retry_after is not None else None
+                self._send_json(error_status, {'error': {'message': message, 'type': code, 'code': code}}, headers)
+                return
+
+            content = behavior.respond(messages)
+            tokens = _split_tokens(content)
+            behavior.count_tokens(len(tokens))
+            completion_id = f"chatcmpl-mock-{behavior.stats['requests']}"
+            created = int(time.time())
+
+            if not stream:
+                prompt_tokens = sum(len((m.get('content') or '').split()) for m in messages)
+                self._send_json(200, {
+                    'id': completion_id,
+                    'object': 'chat.completion',
+                    'created': created,
+                    'model': model,
+                    'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content},
+                                 'finish_reason': 'stop'}],
+                    'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': len(tokens),
+                              'total_tokens': prompt_tokens + len(tokens)},
+                })
+                return
+
+            # Streaming SSE: la conexión se cierra al terminar (sin Content-Length)
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.close_connection = True
+
+            def event(delta, finish_reason=None):
+                chunk = {
+                    'id': completion_id, 'object': 'chat.completion.chunk', 'created': created, 'model': model,
+                    'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}],
+                }
+                self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode('utf-8'))
+                self.wfile.flush()
+
+            event({'role': 'assistant'})
+            for token in tokens:
+                if behavior.token_delay:
+                    time.sleep(behavior.token_delay)
+                event({'content': token})
+            event({}, 'stop')
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+
+    return MockLLMHandler
+
+
+def create_mock_server(behavior=None, host='127.0.0.1', port=8787):
+    """
+    Servidor mock multi-hilo
+
+    Args:
+        behavior (MockBehavior): Respuestas, latencia y errores (por defecto sin latencia ni errores)
+        host (str): Interfaz
+        port (int): Puerto (0 = cualquiera libre)
+
+    Returns:
+        ThreadingHTTPServer: Servidor sin arrancar; api_base en server.api_base
+    """
+    behavior = behavior or MockBehavior()
+    server = ThreadingHTTPServer((host, port), make_handler(behavior))
+    server.daemon_threads = True
+    server.behavior = behavior
+    server.api_base = f"http://{host}:{server.server_address[1]}/v1"
+    return server
+
+
+def start_mock_server(behavior=None, host='127.0.0.1', port=0):
+    """
+    Arranca el servidor mock en un hilo de fondo
+
+    Args:
+        behavior (MockBehavior): Respuestas, latencia y errores
+        host (str): Interfaz
+        port (int): Puerto (0 = cualquiera libre)
+
+    Returns:
+        ThreadingHTTPServer: Servidor en marcha (detener con shutdown())
+    """
+    server = create_mock_server(behavior, host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ============================================
+# LÍNEA DE COMANDOS
+# ============================================
+
+def main(argv=None):
+    """Punto de entrada: python -m utils.mock_llm_server"""
+    parser = argparse.ArgumentParser(description="Servidor ChatCompletion local para pruebas sin red")
+    parser.add_argument('--host', default='127.0.0.1', help="Interfaz de escucha")
+    parser.add_argument('--port', type=int, default=8787, help="Puerto")
+    parser.add_argument('--script', default=None, help="Guion JSON con reglas y respuesta por defecto")
+    parser.add_argument('--latency', type=float, default=0.0, help="Latencia base por petición (s)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Latencia aleatoria extra máxima (s)")
+    parser.add_argument('--token-delay', type=float, default=0.0, help="Espera entre fragmentos en streaming (s)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fracción de peticiones con error (0-1)")
+    parser.add_argument('--error-status', type=int, default=429, choices=sorted(ERROR_TYPES), help="Status de error")
+    parser.add_argument('--fail-first', type=int, default=0, help="Las N primeras peticiones fallan")
+    parser.add_argument('--retry-after', type=float, default=None, help="Cabecera Retry-After de los errores (s)")
+    parser.add_argument('--seed', type=int, default=42, help="Semilla de latencias y errores")
+    args = parser.parse_args(argv)
+
+    options = dict(latency=args.latency, jitter=args.jitter, token_delay=args.token_delay,
+                   error_rate=args.error_rate, error_status=args.error_status, fail_first=args.fail_first,
+                   retry_after=args.retry_after, seed=args.seed)
+    behavior = MockBehavior.from_script(args.script, **options) if args.script else MockBehavior(**options)
+
+    server = create_mock_server(behavior, args.host, args.port)
+    print(f"✅ Mock LLM en {server.api_base} (OPENAI_API_BASE={server.api_base})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
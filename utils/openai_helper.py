@@ -5,27 +5,525 @@ OPENAI HELPER - IA GENERATIVA
 
 Módulo para integrar OpenAI API y generar análisis con IA
 Versión compatible con openai==0.28.0
+
+Todas las llamadas a la API pasan por un único LLMClient (get_llm_client):
+sesión HTTP compartida, timeout por llamada, reintentos con backoff ante
+rate limits y errores transitorios, límite global de concurrencia, caché
+de respuestas y métricas de peticiones, latencia y tokens.
 """
 
 import openai
-from .config import OPENAI_API_KEY, OPENAI_MODEL
+import requests
+from .config import (
+    OPENAI_API_KEY, OPENAI_API_BASE, OPENAI_MODEL, LLM_MAX_CONCURRENCY, LLM_REQUEST_TIMEOUT, LLM_MAX_RETRIES,
+    LLM_BACKOFF_SECONDS
+)
+from .llm_cache import get_response_cache, make_cache_key
+from .prompt_context import encode_table, estimate_message_tokens, estimate_tokens, fit_context
+from .structured_output import (
+    StructuredOutputError, merge_repair, parse_structured, plan_repair, structured_completion, supports_json_mode,
+    validate
+)
 import json
+import queue
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Errores transitorios que se reintentan con backoff
+RETRYABLE_ERRORS = (
+    openai.error.RateLimitError,
+    openai.error.APIConnectionError,
+    openai.error.Timeout,
+    openai.error.ServiceUnavailableError,
+    openai.error.TryAgain,
+)
+
+# APIError con status >= este valor (500, 502...) también se reintenta
+RETRYABLE_MIN_STATUS = 500
+
+# Latencias que se conservan para los percentiles de las métricas
+LATENCY_WINDOW = 500
+
+
+def is_retryable(error):
+    """True si el error es transitorio (rate limit, red, timeout o error 5xx del servidor)"""
+    if isinstance(error, RETRYABLE_ERRORS):
+        return True
+    return isinstance(error, openai.error.APIError) and (error.http_status or 0) >= RETRYABLE_MIN_STATUS
+
+
+class _Flight:
+    """
+    Llamada en curso compartida por peticiones idénticas (single-flight)
+    
+    El líder publica los fragmentos a medida que llegan; los seguidores los
+    leen en el mismo orden y reciben el mismo resultado o la misma excepción.
+    """
+    
+    def __init__(self):
+        self._cond = threading.Condition()
+        self.parts = []
+        self.done = False
+        self.error = None
+    
+    def publish(self, part):
+        with self._cond:
+            self.parts.append(part)
+            self._cond.notify_all()
+    
+    def finish(self, error=None):
+        with self._cond:
+            self.done = True
+            self.error = error
+            self._cond.notify_all()
+    
+    def follow(self):
+        """Fragmentos del líder a medida que llegan (re-lanza su excepción)"""
+        index = 0
+        while True:
+            with self._cond:
+                while index >= len(self.parts) and not self.done:
+                    self._cond.wait()
+                new_parts = self.parts[index:]
+                index = len(self.parts)
+                done, error = self.done, self.error
+            yield from new_parts
+            if done:
+                if error is not None:
+                    raise error
+                return
+
+
+class LLMClient:
+    """
+    Cliente único de ChatCompletion (punto de control de coste y latencia)
+    """
+    
+    def __init__(self, api_key=OPENAI_API_KEY, model=OPENAI_MODEL, timeout=LLM_REQUEST_TIMEOUT,
+                 max_retries=LLM_MAX_RETRIES, backoff=LLM_BACKOFF_SECONDS, max_concurrency=LLM_MAX_CONCURRENCY,
+                 cache=None, api_base=OPENAI_API_BASE):
+        """
+        Args:
+            api_key (str): API key de OpenAI
+            model (str): Modelo por defecto
+            timeout (float): Timeout por llamada (segundos)
+            max_retries (int): Reintentos ante errores transitorios
+            backoff (float): Espera base del backoff exponencial (segundos)
+            max_concurrency (int): Llamadas simultáneas máximas a la API
+            cache (LLMResponseCache): Caché de respuestas (por defecto la compartida)
+            api_base (str): URL base de la API (None = OpenAI; ej: servidor mock local)
+        """
+        self.api_key = api_key
+        self.api_base = api_base
+        self.model = model
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_concurrency = max_concurrency
+        self.cache = cache or get_response_cache()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        
+        # Sesión HTTP con pool keep-alive (get_llm_client la instala en openai para el cliente por defecto)
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=max_concurrency * 2)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # Llamadas en curso por clave de caché (peticiones idénticas comparten una)
+        self._flights = {}
+        self._flights_lock = threading.Lock()
+        
+        self._metrics_lock = threading.Lock()
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._counters = {
+            'requests': 0, 'api_calls': 0, 'cache_hits': 0, 'coalesced': 0, 'retries': 0, 'errors': 0,
+            'prompt_tokens': 0, 'completion_tokens': 0,
+        }
+    
+    # ---------- Métricas ----------
+    
+    def _count(self, **increments):
+        with self._metrics_lock:
+            for name, value in increments.items():
+                self._counters[name] += value
+    
+    def _record_latency(self, seconds):
+        with self._metrics_lock:
+            self._latencies.append(seconds)
+    
+    def metrics(self):
+        """
+        Métricas acumuladas del cliente
+        
+        Returns:
+            dict: requests, api_calls, cache_hits, coalesced (servidas por una
+                  llamada idéntica en curso), retries, errors, tokens y
+                  latencia de las llamadas a la API (media, p50, p95 en segundos)
+        """
+        with self._metrics_lock:
+            metrics = dict(self._counters)
+            latencies = sorted(self._latencies)
+        
+        metrics['cache_hit_rate'] = metrics['cache_hits'] / metrics['requests'] if metrics['requests'] else 0.0
+        if latencies:
+            metrics['latency_mean'] = sum(latencies) / len(latencies)
+            metrics['latency_p50'] = latencies[len(latencies) // 2]
+            metrics['latency_p95'] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        return metrics
+    
+    # ---------- Single-flight ----------
+    
+    def _join_flight(self, key):
+        """
+        Llamada en curso para una clave (o una nueva si no hay)
+        
+        Returns:
+            tuple: (_Flight, True si esta petición es el líder que debe llamar a la API)
+        """
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = self._flights[key] = _Flight()
+            return flight, True
+    
+    def _end_flight(self, key, flight, error=None):
+        """Cierra la llamada en curso (las nuevas peticiones ya leen la caché)"""
+        with self._flights_lock:
+            self._flights.pop(key, None)
+        flight.finish(error)
+    
+    # ---------- Llamadas a la API ----------
+    
+    def _retry_delay(self, attempt, error):
+        """Espera antes del reintento: Retry-After si existe, si no backoff exponencial con jitter"""
+        retry_after = (getattr(error, 'headers', None) or {}).get('retry-after')
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return self.backoff * (2 ** attempt) * (0.5 + random.random())
+    
+    def _create(self, **params):
+        """
+        ChatCompletion.create con timeout y reintentos con backoff
+        
+        Returns:
+            OpenAIObject o generador de fragmentos (stream=True)
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._count(api_calls=1)
+                return openai.ChatCompletion.create(
+                    api_key=self.api_key,
+                    api_base=self.api_base,
+                    request_timeout=self.timeout,
+                    **params
+                )
+            except Exception as e:
+                if not is_retryable(e) or attempt == self.max_retries:
+                    self._count(errors=1)
+                    raise
+                self._count(retries=1)
+                time.sleep(self._retry_delay(attempt, e))
+    
+    def complete(self, messages, model=None, temperature=0.7, max_tokens=1000, use_cache=True, response_format=None):
+        """
+        Respuesta completa (con caché persistente)
+        
+        Si ya hay en curso una petición idéntica (misma clave de caché), se
+        espera a su resultado en lugar de repetir la llamada.
+        
+        Args:
+            messages (list): Lista de mensajes
+            model (str): Modelo (por defecto el del cliente)
+            temperature (float): Temperatura
+            max_tokens (int): Máximo de tokens en la respuesta
+            use_cache (bool): False para ignorar la caché (la respuesta nueva sí se guarda)
+            response_format (dict): Formato de respuesta (ej: {"type": "json_object"})
+            
+        Returns:
+            str: Contenido de la respuesta (las excepciones de la API se propagan)
+        """
+        model = model or self.model
+        key = make_cache_key(model, messages, temperature, max_tokens, response_format)
+        self._count(requests=1)
+        
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._count(cache_hits=1)
+                return cached
+        
+        flight, leader = self._join_flight(key)
+        if not leader:
+            self._count(coalesced=1)
+            return ''.join(flight.follow())
+        
+        # Otra petición idéntica pudo terminar entre la consulta a la caché y el registro
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._count(cache_hits=1)
+                flight.publish(cached)
+                self._end_flight(key, flight)
+                return cached
+        
+        try:
+            start_time = time.perf_counter()
+            params = {'response_format': response_format} if response_format else {}
+            with self._slots:
+                response = self._create(
+                    model=model, messages=messages, temperature=temperature, max_tokens=max_tokens, **params
+                )
+            self._record_latency(time.perf_counter() - start_time)
+            
+            usage = response.get('usage') or {}
+            self._count(prompt_tokens=usage.get('prompt_tokens', 0), completion_tokens=usage.get('completion_tokens', 0))
+            
+            content = response.choices[0].message['content']
+            self.cache.set(key, content, model=model)
+        except Exception as e:
+            self._end_flight(key, flight, e)
+            raise
+        
+        flight.publish(content)
+        self._end_flight(key, flight)
+        return content
+    
+    def stream(self, messages, model=None, temperature=0.7, max_tokens=1000, use_cache=True):
+        """
+        Respuesta en streaming (fragmentos de texto a medida que llegan)
+        
+        Si la respuesta está en caché se entrega completa en un solo fragmento;
+        si no, al terminar el stream el texto final se guarda en la caché. Un
+        stream idéntico ya en curso se comparte: se reciben sus fragmentos.
+        
+        Args:
+            messages (list): Lista de mensajes
+            model (str): Modelo (por defecto el del cliente)
+            temperature (float): Temperatura
+            max_tokens (int): Máximo de tokens en la respuesta
+            use_cache (bool): False para ignorar la caché (la respuesta nueva sí se guarda)
+            
+        Yields:
+            str: Fragmentos de la respuesta (las excepciones de la API se propagan)
+        """
+        model = model or self.model
+        key = make_cache_key(model, messages, temperature, max_tokens)
+        self._count(requests=1)
+        
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._count(cache_hits=1)
+                yield cached
+                return
+        
+        flight, leader = self._join_flight(key)
+        if not leader:
+            self._count(coalesced=1)
+            yield from flight.follow()
+            return
+        
+        # Otra petición idéntica pudo terminar entre la consulta a la caché y el registro
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._count(cache_hits=1)
+                flight.publish(cached)
+                self._end_flight(key, flight)
+                yield cached
+                return
+        
+        try:
+            start_time = time.perf_counter()
+            parts = []
+            
+            # El stream ocupa un hueco de concurrencia hasta que termina
+            with self._slots:
+                chunks = self._create(
+                    model=model, messages=messages, temperature=temperature, max_tokens=max_tokens, stream=True
+                )
+                for chunk in chunks:
+                    delta = chunk['choices'][0].get('delta', {}).get('content')
+                    if delta:
+                        parts.append(delta)
+                        flight.publish(delta)
+                        yield delta
+            self._record_latency(time.perf_counter() - start_time)
+            
+            # Los streams no devuelven usage: se estiman los tokens del prompt y del texto recibido
+            content = ''.join(parts)
+            self._count(
+                prompt_tokens=estimate_message_tokens(messages, model),
+                completion_tokens=estimate_tokens(content, model)
+            )
+            self.cache.set(key, content, model=model)
+            self._end_flight(key, flight)
+        except Exception as e:
+            self._end_flight(key, flight, e)
+            raise
+        finally:
+            # El consumidor dejó el stream a medias: los seguidores no deben quedarse esperando
+            if not flight.done:
+                self._end_flight(key, flight, RuntimeError("Stream interrumpido antes de terminar"))
+    
+    # ---------- Varias peticiones en paralelo ----------
+    
+    def complete_many(self, requests, use_cache=True):
+        """
+        Ejecuta varias peticiones en paralelo y entrega cada resultado al terminar
+        
+        Args:
+            requests (dict): {clave: kwargs de complete (messages, model, ...)}
+            use_cache (bool): False para ignorar la caché
+            
+        Yields:
+            tuple: (clave, contenido, excepción) en orden de finalización;
+                   contenido es None si la petición falló
+        """
+        if not requests:
+            return
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(requests))) as executor:
+            futures = {
+                executor.submit(self.complete, use_cache=use_cache, **params): key
+                for key, params in requests.items()
+            }
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    yield key, future.result(), None
+                except Exception as e:
+                    yield key, None, e
+    
+    def stream_many(self, requests, use_cache=True):
+        """
+        Varias peticiones en streaming en paralelo, intercaladas en un único iterador
+        
+        Los hilos del pool consumen los streams; quien itera (ej: el script de
+        Streamlit) recibe los fragmentos de todas las peticiones según llegan.
+        
+        Args:
+            requests (dict): {clave: kwargs de stream (messages, model, ..., use_cache opcional)}
+            use_cache (bool): False para ignorar la caché (si la petición no trae su propio use_cache)
+            
+        Yields:
+            tuple: (clave, fragmento, excepción). Un fragmento None indica que la
+                   petición terminó (con excepción si falló)
+        """
+        if not requests:
+            return
+        
+        events = queue.Queue()
+        
+        def consume(key, params):
+            try:
+                for delta in self.stream(**{'use_cache': use_cache, **params}):
+                    events.put((key, delta, None))
+                events.put((key, None, None))
+            except Exception as e:
+                events.put((key, None, e))
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(requests))) as executor:
+            for key, params in requests.items():
+                executor.submit(consume, key, params)
+            
+            pending = len(requests)
+            while pending:
+                key, delta, error = events.get()
+                if delta is None:
+                    pending -= 1
+                yield key, delta, error
+
+
+# Cliente compartido por OpenAIHelper y las páginas
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_llm_client():
+    """
+    Cliente por defecto (creado una vez por proceso, compartido entre sesiones)
+    
+    Su sesión HTTP es la única que se instala como sesión global de openai
+    (openai.requestssession); los demás LLMClient no tocan el estado global.
+    
+    Returns:
+        LLMClient: Cliente configurado desde utils/config.py
+    """
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = LLMClient()
+            openai.requestssession = _default_client.session
+    return _default_client
+
+
+def cached_chat_completion(messages, model=None, temperature=0.7, max_tokens=1000, use_cache=True):
+    """Respuesta completa a través del cliente compartido (ver LLMClient.complete)"""
+    return get_llm_client().complete(messages, model, temperature, max_tokens, use_cache)
+
+
+def stream_chat_completion(messages, model=None, temperature=0.7, max_tokens=1000, use_cache=True):
+    """Respuesta en streaming a través del cliente compartido (ver LLMClient.stream)"""
+    return get_llm_client().stream(messages, model, temperature, max_tokens, use_cache)
+
+
+def run_chat_completions(requests, use_cache=True):
+    """Peticiones en paralelo a través del cliente compartido (ver LLMClient.complete_many)"""
+    return get_llm_client().complete_many(requests, use_cache)
+
+
+def stream_chat_completions(requests, use_cache=True):
+    """Streams en paralelo a través del cliente compartido (ver LLMClient.stream_many)"""
+    return get_llm_client().stream_many(requests, use_cache)
+
+
+# Esquema del análisis de fortalezas y debilidades (listas de textos no vacías)
+_TEXT_LIST = {'type': 'array', 'minItems': 1, 'items': {'type': 'string', 'minLength': 1}}
+STRENGTHS_SCHEMA = {
+    'type': 'object',
+    'required': ['fortalezas', 'debilidades', 'recomendaciones'],
+    'properties': {'fortalezas': _TEXT_LIST, 'debilidades': _TEXT_LIST, 'recomendaciones': _TEXT_LIST},
+}
+
+# Respuesta cuando el análisis no se pudo obtener
+STRENGTHS_PLACEHOLDER = {
+    "fortalezas": ["Análisis no disponible - error de formato"],
+    "debilidades": ["Análisis no disponible - error de formato"],
+    "recomendaciones": ["Análisis no disponible - error de formato"]
+}
+
+# Equipos por petición en el análisis agrupado
+BATCH_TEAMS_PER_REQUEST = 12
+
 
 class OpenAIHelper:
     """
     Clase para interactuar con OpenAI API (versión 0.28)
     """
     
-    def __init__(self):
+    def __init__(self, use_cache=True):
+        """
+        Args:
+            use_cache (bool): False para ignorar la caché de respuestas
+        """
         if not OPENAI_API_KEY:
             raise ValueError("OPENAI_API_KEY no está configurada en .env")
         
-        openai.api_key = OPENAI_API_KEY
+        self.client = get_llm_client()
         self.model = OPENAI_MODEL
+        self.use_cache = use_cache
     
     def _make_request(self, messages, temperature=0.7, max_tokens=1000):
         """
-        Realiza una petición a OpenAI API
+        Realiza una petición a OpenAI API (con caché de respuestas)
         
         Args:
             messages (list): Lista de mensajes
@@ -36,31 +534,55 @@ class OpenAIHelper:
             str: Respuesta de OpenAI
         """
         try:
-            response = openai.ChatCompletion.create(
+            return self.client.complete(
+                messages,
                 model=self.model,
-                messages=messages,
                 temperature=temperature,
-                max_tokens=max_tokens
+                max_tokens=max_tokens,
+                use_cache=self.use_cache
             )
-            return response.choices[0].message.content
         except Exception as e:
             return f"Error al conectar con OpenAI: {str(e)}"
     
-    def generate_match_summary(self, match_data):
+    def _stream_request(self, messages, temperature=0.7, max_tokens=1000):
+        """
+        Petición en streaming a OpenAI API (con caché de respuestas)
+        
+        Args:
+            messages (list): Lista de mensajes
+            temperature (float): Temperatura (creatividad)
+            max_tokens (int): Máximo de tokens en la respuesta
+            
+        Yields:
+            str: Fragmentos de la respuesta
+        """
+        try:
+            yield from self.client.stream(
+                messages,
+                model=self.model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                use_cache=self.use_cache
+            )
+        except Exception as e:
+            yield f"Error al conectar con OpenAI: {str(e)}"
+    
+    def generate_match_summary(self, match_data, stream=False):
         """
         Genera un resumen de un partido usando IA
         
         Args:
             match_data (dict): Datos del partido
+            stream (bool): Devolver un iterador de fragmentos
             
         Returns:
-            str: Resumen generado
+            str: Resumen generado (o iterador de fragmentos si stream=True)
         """
         prompt = f"""
         Como analista deportivo experto, genera un resumen conciso y profesional del siguiente partido:
         
         Datos del partido:
-        {json.dumps(match_data, indent=2, ensure_ascii=False)}
+        {fit_context(match_data)}
         
         El resumen debe incluir:
         - Resultado final y contexto
@@ -76,22 +598,16 @@ class OpenAIHelper:
             {"role": "user", "content": prompt}
         ]
         
+        if stream:
+            return self._stream_request(messages, temperature=0.7)
         return self._make_request(messages, temperature=0.7)
     
-    def analyze_strengths_weaknesses(self, team_stats):
-        """
-        Analiza fortalezas y debilidades de un equipo
-        
-        Args:
-            team_stats (dict): Estadísticas del equipo
-            
-        Returns:
-            dict: Análisis estructurado
-        """
+    def _strengths_messages(self, team_stats):
+        """Mensajes del análisis de fortalezas y debilidades de un equipo"""
         prompt = f"""
         Como analista táctico, analiza las siguientes estadísticas del equipo:
         
-        {json.dumps(team_stats, indent=2, ensure_ascii=False)}
+        {fit_context(team_stats)}
         
         Proporciona un análisis estructurado en formato JSON con:
         {{
@@ -104,60 +620,147 @@ class OpenAIHelper:
         RESPONDE SOLO CON EL JSON VÁLIDO, SIN MARKDOWN NI TEXTO ADICIONAL.
         """
         
-        messages = [
+        return [
             {"role": "system", "content": "Eres un analista táctico experto. Respondes SOLO en formato JSON válido, sin markdown."},
             {"role": "user", "content": prompt}
         ]
+    
+    def analyze_strengths_weaknesses(self, team_stats):
+        """
+        Analiza fortalezas y debilidades de un equipo
         
-        response = self._make_request(messages, temperature=0.5)
-        
-        try:
-            # Limpiar respuesta (quitar markdown si existe)
-            clean_response = response.strip()
-            
-            # Quitar ```json y ``` si existen
-            if clean_response.startswith('```json'):
-                clean_response = clean_response[7:]
-            if clean_response.startswith('```'):
-                clean_response = clean_response[3:]
-            if clean_response.endswith('```'):
-                clean_response = clean_response[:-3]
-            
-            clean_response = clean_response.strip()
+        Args:
+            team_stats (dict): Estadísticas del equipo
             
-            # Parsear JSON
-            result = json.loads(clean_response)
+        Returns:
+            dict: Análisis estructurado
+        """
+        try:
+            result = structured_completion(
+                self.client, self._strengths_messages(team_stats), STRENGTHS_SCHEMA,
+                model=self.model, temperature=0.5, use_cache=self.use_cache
+            )
             print(f"✅ Análisis de fortalezas parseado correctamente")
             return result
             
+        except StructuredOutputError as e:
+            print(f"⚠️ Respuesta JSON no válida: {str(e)}")
+            print(f"Respuesta recibida: {e.raw[:200]}...")
+            return dict(STRENGTHS_PLACEHOLDER)
+        
         except Exception as e:
-            print(f"⚠️ Error parseando JSON: {str(e)}")
-            print(f"Respuesta recibida: {response[:200]}...")
-            return {
-                "fortalezas": ["Análisis no disponible - error de formato"],
-                "debilidades": ["Análisis no disponible - error de formato"],
-                "recomendaciones": ["Análisis no disponible - error de formato"]
+            print(f"⚠️ Error al conectar con OpenAI: {str(e)}")
+            return dict(STRENGTHS_PLACEHOLDER)
+    
+    def analyze_teams_batch(self, teams_stats, teams_per_request=BATCH_TEAMS_PER_REQUEST):
+        """
+        Fortalezas y debilidades de muchos equipos con pocas peticiones
+        
+        Empaqueta los resúmenes de varios equipos en una sola petición con
+        respuesta JSON indexada por equipo (system prompt compartido). Cada
+        equipo se valida contra STRENGTHS_SCHEMA por separado: si su parte
+        llegó con errores se pide solo la reparación de esas claves, y si no
+        llegó se repite con una petición individual (todo en paralelo).
+        
+        Args:
+            teams_stats (dict): {equipo: estadísticas}
+            teams_per_request (int): Equipos por petición agrupada
+            
+        Returns:
+            dict: {equipo: {'fortalezas', 'debilidades', 'recomendaciones'}}
+                  en el mismo orden que teams_stats
+        """
+        teams = list(teams_stats)
+        chunks = [teams[i:i + teams_per_request] for i in range(0, len(teams), teams_per_request)]
+        json_mode = {'response_format': {"type": "json_object"}} if supports_json_mode(self.model) else {}
+        
+        batch_requests = {
+            i: {
+                'messages': self._batch_strengths_messages({team: teams_stats[team] for team in chunk}),
+                'model': self.model,
+                'temperature': 0.5,
+                'max_tokens': 150 + 250 * len(chunk),
+                **json_mode
             }
+            for i, chunk in enumerate(chunks)
+        }
+        
+        results = {}
+        retries = {}
+        for i, content, error in self.client.complete_many(batch_requests, use_cache=self.use_cache):
+            parsed = parse_structured(content, {'type': 'object'})[0] if error is None else None
+            
+            for team in chunks[i]:
+                analysis = parsed.get(team) if isinstance(parsed, dict) else None
+                errors = validate(analysis, STRENGTHS_SCHEMA) if analysis is not None else None
+                if errors == []:
+                    results[team] = analysis
+                elif isinstance(analysis, dict):
+                    # Parte del equipo con errores: reparar solo las claves que fallan
+                    raw = json.dumps(analysis, ensure_ascii=False)
+                    messages, keys = plan_repair(analysis, raw, errors, STRENGTHS_SCHEMA)
+                    retries[team] = (analysis, keys, {'messages': messages, 'temperature': 0, 'max_tokens': 500})
+                else:
+                    retries[team] = (None, None, {'messages': self._strengths_messages(teams_stats[team]),
+                                                  'temperature': 0.5, 'max_tokens': 1000})
+        
+        if retries:
+            print(f"⚠️ {len(retries)} equipos sin análisis válido en el lote: reparación o petición individual")
+            retry_requests = {
+                team: {**request, 'model': self.model, **json_mode}
+                for team, (_, _, request) in retries.items()
+            }
+            for team, content, error in self.client.complete_many(retry_requests, use_cache=self.use_cache):
+                analysis, keys, _ = retries[team]
+                errors = ["$: error de la API"]
+                if error is None:
+                    if analysis is None:
+                        analysis, errors = parse_structured(content, STRENGTHS_SCHEMA)
+                    else:
+                        analysis, errors = merge_repair(analysis, keys, content, STRENGTHS_SCHEMA)
+                results[team] = analysis if not errors else dict(STRENGTHS_PLACEHOLDER)
+        
+        return {team: results[team] for team in teams}
+    
+    def _batch_strengths_messages(self, teams_stats):
+        """Mensajes del análisis agrupado (una clave por equipo en la respuesta)"""
+        teams_block = encode_table([{'equipo': team, **stats} for team, stats in teams_stats.items()])
+        prompt = f"""Como analista táctico, analiza las estadísticas de cada equipo:
+
+{teams_block}
+
+Responde con UN objeto JSON cuyas claves sean exactamente los nombres de los equipos
+({json.dumps(list(teams_stats), ensure_ascii=False)}) y cuyo valor tenga la forma:
+{{"fortalezas": ["...", "...", "..."], "debilidades": ["...", "...", "..."], "recomendaciones": ["...", "..."]}}
+
+Base cada análisis solo en los datos de ese equipo.
+RESPONDE SOLO CON EL JSON VÁLIDO, SIN MARKDOWN NI TEXTO ADICIONAL."""
+        
+        return [
+            {"role": "system", "content": "Eres un analista táctico experto. Respondes SOLO en formato JSON válido, sin markdown."},
+            {"role": "user", "content": prompt}
+        ]
     
-    def generate_tactical_recommendations(self, opponent_data, team_data=None):
+    def generate_tactical_recommendations(self, opponent_data, team_data=None, stream=False):
         """
         Genera recomendaciones tácticas para enfrentar un oponente
         
         Args:
             opponent_data (dict): Datos del oponente
             team_data (dict): Datos del propio equipo (opcional)
+            stream (bool): Devolver un iterador de fragmentos
             
         Returns:
-            str: Recomendaciones tácticas
+            str: Recomendaciones tácticas (o iterador de fragmentos si stream=True)
         """
         prompt = f"""
         Como entrenador táctico, proporciona recomendaciones específicas para enfrentar al siguiente oponente:
         
         Oponente:
-        {json.dumps(opponent_data, indent=2, ensure_ascii=False)}
+        {fit_context(opponent_data)}
         
         {"Nuestro equipo:" if team_data else ""}
-        {json.dumps(team_data, indent=2, ensure_ascii=False) if team_data else ""}
+        {fit_context(team_data) if team_data else ""}
         
         Proporciona:
         1. Formación recomendada
@@ -174,22 +777,25 @@ class OpenAIHelper:
             {"role": "user", "content": prompt}
         ]
         
+        if stream:
+            return self._stream_request(messages, temperature=0.6, max_tokens=1500)
         return self._make_request(messages, temperature=0.6, max_tokens=1500)
     
-    def generate_season_report(self, season_data):
+    def generate_season_report(self, season_data, stream=False):
         """
         Genera un reporte completo de temporada
         
         Args:
             season_data (dict): Datos de la temporada
+            stream (bool): Devolver un iterador de fragmentos
             
         Returns:
-            str: Reporte de temporada
+            str: Reporte de temporada (o iterador de fragmentos si stream=True)
         """
         prompt = f"""
         Como analista deportivo, genera un reporte ejecutivo de la temporada:
         
-        {json.dumps(season_data, indent=2, ensure_ascii=False)}
+        {fit_context(season_data)}
         
         El reporte debe incluir:
         1. Resumen ejecutivo
@@ -206,29 +812,35 @@ class OpenAIHelper:
             {"role": "user", "content": prompt}
         ]
         
+        if stream:
+            return self._stream_request(messages, temperature=0.7, max_tokens=2000)
         return self._make_request(messages, temperature=0.7, max_tokens=2000)
     
-    def custom_analysis(self, prompt_text, data=None):
+    def custom_analysis(self, prompt_text, data=None, stream=False):
         """
         Análisis personalizado con IA
         
         Args:
             prompt_text (str): Pregunta o solicitud personalizada
             data (dict): Datos adicionales (opcional)
+            stream (bool): Devolver un iterador de fragmentos
             
         Returns:
-            str: Respuesta de IA
+            str: Respuesta de IA (o iterador de fragmentos si stream=True)
         """
         full_prompt = prompt_text
         
         if data:
-            full_prompt += f"\n\nDatos de contexto:\n{json.dumps(data, indent=2, ensure_ascii=False)}"
+            context = data if isinstance(data, dict) else {'datos': data}
+            full_prompt += f"\n\nDatos de contexto:\n{fit_context(context)}"
         
         messages = [
             {"role": "system", "content": "Eres un asistente experto en análisis deportivo."},
             {"role": "user", "content": full_prompt}
         ]
         
+        if stream:
+            return self._stream_request(messages)
         return self._make_request(messages)
 
 
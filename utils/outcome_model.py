@@ -0,0 +1,569 @@
+"""
+============================================
+MODELO MULTI-VARIABLE - RESULTADO DEL PARTIDO
+============================================
+
+Modelo de regresión multi-variable sobre el match store:
+
+1. Regresión logística (victoria vs no victoria)
+2. Dos regresiones de Poisson (goles a favor / goles en contra), de las que
+   se derivan P(W), P(T), P(L) y la diferencia de goles esperada
+
+Variables: opponent_quality (o el rating Elo pre-partido del rival cuando
+está disponible), team_academic_rank, mes de la temporada, home_advantage y
+temporada. Los modelos se ajustan con IRLS (Newton) en numpy con una pequeña
+penalización L2, la validación cruzada deja fuera una temporada por fold y
+los folds se ajustan en paralelo. Los coeficientes ajustados se guardan por
+versión de datos (memoria + JSON en outputs/models).
+"""
+
+import hashlib
+import json
+import math
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .match_store import data_version, oriented_goals, season_month_index
+from .ratings import add_rating_features
+
+# Variables candidatas y su etiqueta para la UI
+MODEL_FEATURES = {
+    'opponent_quality': 'Calidad del oponente',
+    'opponent_rating': 'Rating Elo del oponente',
+    'team_academic_rank': 'Academic Rank',
+    'season_month': 'Mes de la temporada (Ago=0)',
+    'home_advantage': 'Local (1) / Visitante (0)',
+    'season_index': 'Temporada',
+}
+
+# Carpeta de coeficientes cacheados por versión de datos
+MODEL_CACHE_DIR = Path(__file__).parent.parent / "outputs" / "models"
+
+# Goles máximos considerados al derivar probabilidades W/T/L de Poisson
+MAX_GOALS = 12
+
+# Modelos en memoria (LRU: los menos usados se descartan, el JSON en disco se conserva)
+MODEL_CACHE_SIZE = 8
+
+_model_cache = OrderedDict()
+_model_cache_lock = threading.Lock()
+
+
+# ============================================
+# PREPARACIÓN DE DATOS
+# ============================================
+
+def build_model_frame(df, use_ratings=True):
+    """
+    Construye la tabla de modelado (variables + objetivos)
+
+    Args:
+        df (pd.DataFrame): DataFrame de partidos (match store)
+        use_ratings (bool): Si True agrega opponent_rating (Elo pre-partido)
+
+    Returns:
+        pd.DataFrame: Columnas de MODEL_FEATURES disponibles + temporada,
+                      equipo, win, goals_for, goals_against
+    """
+    if use_ratings and 'opponent_rating' not in df.columns:
+        df = add_rating_features(df)
+
+    goals_for, goals_against = oriented_goals(df)
+
+    frame = pd.DataFrame({
+        'equipo': df['equipo'].to_numpy(),
+        'temporada': df['temporada'].to_numpy(),
+        'opponent_quality': df['opponent_quality'].to_numpy(dtype=np.float64),
+        'team_academic_rank': df['team_academic_rank'].to_numpy(dtype=np.float64),
+        'season_month': season_month_index(df['mes_num']).astype(np.float64),
+        'home_advantage': df['home_advantage'].to_numpy(dtype=np.float64),
+        'season_index': df['temporada'].str.slice(0, 4).astype(int).to_numpy(dtype=np.float64),
+        'win': (df['resultado_code'] == 'W').to_numpy(dtype=np.float64),
+        'result': df['resultado_code'].to_numpy(),
+        'goals_for': goals_for.astype(np.float64),
+        'goals_against': goals_against.astype(np.float64),
+    }, index=df.index)
+
+    if 'opponent_rating' in df.columns:
+        frame['opponent_rating'] = df['opponent_rating'].to_numpy(dtype=np.float64)
+
+    return frame
+
+
+# ============================================
+# AJUSTE (IRLS)
+# ============================================
+
+def _penalty(n_params, l2):
+    """Matriz de penalización L2 (sin penalizar el intercepto)"""
+    penalty = np.eye(n_params) * l2
+    penalty[0, 0] = 0.0
+    return penalty
+
+
+def _fit_logistic(X, y, l2=1e-2, max_iter=50, tol=1e-8):
+    """
+    Regresión logística por IRLS (Newton-Raphson) con penalización L2
+
+    Args:
+        X (np.ndarray): Matriz de diseño con intercepto en la columna 0
+        y (np.ndarray): Objetivo binario (0/1)
+        l2 (float): Penalización L2
+        max_iter (int): Iteraciones máximas
+        tol (float): Tolerancia sobre el paso
+
+    Returns:
+        np.ndarray: Coeficientes
+    """
+    penalty = _penalty(X.shape[1], l2)
+    beta = np.zeros(X.shape[1])
+    mean_y = np.clip(y.mean(), 1e-6, 1 - 1e-6)
+    beta[0] = np.log(mean_y / (1 - mean_y))
+
+    for _ in range(max_iter):
+        p = 1.0 / (1.0 + np.exp(-(X @ beta)))
+        weights = np.clip(p * (1 - p), 1e-10, None)
+        gradient = X.T @ (y - p) - penalty @ beta
+        hessian = (X * weights[:, None]).T @ X + penalty
+        step = np.linalg.solve(hessian, gradient)
+        beta += step
+        if np.max(np.abs(step)) < tol:
+            break
+
+    return beta
+
+
+def _fit_poisson(X, y, l2=1e-2, max_iter=50, tol=1e-8):
+    """
+    Regresión de Poisson (enlace log) por IRLS con penalización L2
+
+    Args:
+        X (np.ndarray): Matriz de diseño con intercepto en la columna 0
+        y (np.ndarray): Conteos (goles)
+        l2 (float): Penalización L2
+        max_iter (int): Iteraciones máximas
+        tol (float): Tolerancia sobre el paso
+
+    Returns:
+        np.ndarray: Coeficientes
+    """
+    penalty = _penalty(X.shape[1], l2)
+    beta = np.zeros(X.shape[1])
+    beta[0] = np.log(max(y.mean(), 1e-6))
+
+    for _ in range(max_iter):
+        mu = np.exp(np.clip(X @ beta, -20, 20))
+        gradient = X.T @ (y - mu) - penalty @ beta
+        hessian = (X * mu[:, None]).T @ X + penalty
+        step = np.linalg.solve(hessian, gradient)
+        beta += step
+        if np.max(np.abs(step)) < tol:
+            break
+
+    return beta
+
+
+def _poisson_pmf_matrix(mu, max_goals=MAX_GOALS):
+    """Probabilidades de Poisson (n x max_goals+1) para cada media"""
+    goals = np.arange(max_goals + 1)
+    log_factorial = np.array([math.lgamma(k + 1) for k in goals])
+    log_mu = np.log(np.clip(mu, 1e-12, None))[:, None]
+    return np.exp(goals * log_mu - mu[:, None] - log_factorial)
+
+
+def outcome_probabilities(mu_for, mu_against, max_goals=MAX_GOALS):
+    """
+    P(W), P(T), P(L) a partir de dos Poisson independientes
+
+    Args:
+        mu_for (np.ndarray): Goles esperados a favor
+        mu_against (np.ndarray): Goles esperados en contra
+        max_goals (int): Goles máximos considerados
+
+    Returns:
+        tuple: (p_win, p_tie, p_loss) como np.ndarray
+    """
+    pmf_for = _poisson_pmf_matrix(np.asarray(mu_for, dtype=np.float64), max_goals)
+    pmf_against = _poisson_pmf_matrix(np.asarray(mu_against, dtype=np.float64), max_goals)
+
+    # P(goles_contra < k) para cada k
+    cdf_below = np.cumsum(pmf_against, axis=1) - pmf_against
+
+    p_win = (pmf_for * cdf_below).sum(axis=1)
+    p_tie = (pmf_for * pmf_against).sum(axis=1)
+    total = (pmf_for.sum(axis=1) * pmf_against.sum(axis=1))
+    p_loss = np.clip(total - p_win - p_tie, 0, 1)
+
+    # Renormalizar la masa truncada
+    return p_win / total, p_tie / total, p_loss / total
+
+
+# ============================================
+# MODELO
+# ============================================
+
+class MatchOutcomeModel:
+    """
+    Modelo multi-variable del resultado (logístico + Poisson de goles)
+
+    Attributes:
+        features (list): Variables usadas (las de varianza 0 se descartan al ajustar)
+        l2 (float): Penalización L2
+    """
+
+    def __init__(self, features=None, l2=1e-2):
+        """
+        Args:
+            features (list): Variables candidatas (por defecto todas las de MODEL_FEATURES)
+            l2 (float): Penalización L2 (sobre variables estandarizadas)
+        """
+        self.candidate_features = list(features) if features else list(MODEL_FEATURES)
+        self.l2 = l2
+        self.features = []
+        self.means = None
+        self.scales = None
+        self.coef = {}
+        self.n_obs = 0
+
+    # ----------------------------------------
+    # Ajuste y predicción
+    # ----------------------------------------
+
+    def _design_matrix(self, frame):
+        """Matriz de diseño estandarizada con intercepto"""
+        values = frame[self.features].to_numpy(dtype=np.float64)
+        values = np.where(np.isfinite(values), values, self.means)
+        standardized = (values - self.means) / self.scales
+        return np.column_stack([np.ones(len(frame)), standardized])
+
+    def fit(self, frame):
+        """
+        Ajusta los tres modelos
+
+        Args:
+            frame (pd.DataFrame): Resultado de build_model_frame
+
+        Returns:
+            MatchOutcomeModel: self
+        """
+        available = [f for f in self.candidate_features if f in frame.columns]
+        values = frame[available].to_numpy(dtype=np.float64)
+        means = np.nanmean(values, axis=0)
+        scales = np.nanstd(values, axis=0)
+
+        # Variables constantes (ej: opponent_quality = 0.5) no aportan información
+        keep = scales > 1e-12
+        self.features = [f for f, k in zip(available, keep) if k]
+        self.means = means[keep]
+        self.scales = scales[keep]
+
+        X = self._design_matrix(frame)
+        self.coef = {
+            'win': _fit_logistic(X, frame['win'].to_numpy(), self.l2),
+            'goals_for': _fit_poisson(X, frame['goals_for'].to_numpy(), self.l2),
+            'goals_against': _fit_poisson(X, frame['goals_against'].to_numpy(), self.l2),
+        }
+        self.n_obs = len(frame)
+        return self
+
+    def predict(self, frame):
+        """
+        Predicción por lotes (una sola multiplicación matricial por modelo)
+
+        Args:
+            frame (pd.DataFrame): Resultado de build_model_frame
+
+        Returns:
+            pd.DataFrame: p_win_logit, mu_for, mu_against, expected_goal_diff,
+                          p_win, p_tie, p_loss (alineado con frame.index)
+        """
+        if not self.coef:
+            raise ValueError("El modelo no está ajustado")
+
+        X = self._design_matrix(frame)
+        p_win_logit = 1.0 / (1.0 + np.exp(-(X @ self.coef['win'])))
+        mu_for = np.exp(X @ self.coef['goals_for'])
+        mu_against = np.exp(X @ self.coef['goals_against'])
+        p_win, p_tie, p_loss = outcome_probabilities(mu_for, mu_against)
+
+        return pd.DataFrame({
+            'p_win_logit': p_win_logit,
+            'mu_for': mu_for,
+            'mu_against': mu_against,
+            'expected_goal_diff': mu_for - mu_against,
+            'p_win': p_win,
+            'p_tie': p_tie,
+            'p_loss': p_loss,
+        }, index=frame.index)
+
+    def coefficients(self):
+        """
+        Coeficientes por modelo (escala estandarizada: efecto de +1 desviación)
+
+        Returns:
+            pd.DataFrame: variable, etiqueta, coef_win, odds_ratio_win,
+                          coef_goals_for, rate_ratio_goals_for,
+                          coef_goals_against, rate_ratio_goals_against
+        """
+        names = ['intercept'] + self.features
+        table = pd.DataFrame({
+            'variable': names,
+            'etiqueta': ['Intercepto'] + [MODEL_FEATURES.get(f, f) for f in self.features],
+        })
+        for model_name, ratio_name in [('win', 'odds_ratio_win'),
+                                       ('goals_for', 'rate_ratio_goals_for'),
+                                       ('goals_against', 'rate_ratio_goals_against')]:
+            table[f'coef_{model_name}'] = self.coef[model_name]
+            table[ratio_name] = np.exp(self.coef[model_name])
+        return table
+
+    # ----------------------------------------
+    # Serialización
+    # ----------------------------------------
+
+    def to_dict(self):
+        """Representación serializable (JSON) del modelo ajustado"""
+        return {
+            'candidate_features': self.candidate_features,
+            'l2': self.l2,
+            'features': self.features,
+            'means': self.means.tolist(),
+            'scales': self.scales.tolist(),
+            'coef': {name: values.tolist() for name, values in self.coef.items()},
+            'n_obs': self.n_obs,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Reconstruye un modelo desde to_dict()"""
+        model = cls(features=data['candidate_features'], l2=data['l2'])
+        model.features = list(data['features'])
+        model.means = np.asarray(data['means'], dtype=np.float64)
+        model.scales = np.asarray(data['scales'], dtype=np.float64)
+        model.coef = {name: np.asarray(values, dtype=np.float64) for name, values in data['coef'].items()}
+        model.n_obs = data['n_obs']
+        return model
+
+
+# ============================================
+# MÉTRICAS Y VALIDACIÓN CRUZADA
+# ============================================
+
+def _auc(y, score):
+    """Área bajo la curva ROC (Mann-Whitney con rangos promedio)"""
+    positives = y == 1
+    n_pos, n_neg = positives.sum(), (~positives).sum()
+    if n_pos == 0 or n_neg == 0:
+        return np.nan
+    ranks = pd.Series(score).rank(method='average').to_numpy()
+    return (ranks[positives].sum() - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg)
+
+
+def _poisson_deviance(y, mu):
+    """Deviance de Poisson"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        term = np.where(y > 0, y * np.log(y / mu), 0.0)
+    return 2 * np.sum(term - (y - mu))
+
+
+def evaluate_predictions(frame, predictions, train_frame=None):
+    """
+    Métricas fuera de muestra de un conjunto de predicciones
+
+    Args:
+        frame (pd.DataFrame): Tabla de modelado del conjunto evaluado
+        predictions (pd.DataFrame): Resultado de MatchOutcomeModel.predict
+        train_frame (pd.DataFrame): Tabla de entrenamiento (para el modelo nulo)
+
+    Returns:
+        dict: log_loss, brier, accuracy, auc, r2_goal_diff,
+              deviance_explained_for, deviance_explained_against, rps, n
+    """
+    reference = train_frame if train_frame is not None else frame
+    y = frame['win'].to_numpy()
+    p = np.clip(predictions['p_win_logit'].to_numpy(), 1e-12, 1 - 1e-12)
+
+    goal_diff = (frame['goals_for'] - frame['goals_against']).to_numpy()
+    ss_res = np.sum((goal_diff - predictions['expected_goal_diff'].to_numpy()) ** 2)
+    ss_tot = np.sum((goal_diff - goal_diff.mean()) ** 2)
+
+    deviance_explained = {}
+    for target, column in [('for', 'goals_for'), ('against', 'goals_against')]:
+        observed = frame[column].to_numpy()
+        null_mu = np.full(len(observed), max(reference[column].mean(), 1e-6))
+        null_dev = _poisson_deviance(observed, null_mu)
+        model_dev = _poisson_deviance(observed, predictions[f'mu_{target}'].to_numpy())
+        deviance_explained[target] = 1 - model_dev / null_dev if null_dev > 0 else np.nan
+
+    # Ranked Probability Score sobre L < T < W (probabilidades de Poisson)
+    cumulative_pred = np.column_stack([
+        predictions['p_loss'].to_numpy(),
+        predictions['p_loss'].to_numpy() + predictions['p_tie'].to_numpy(),
+    ])
+    result = frame['result'].to_numpy()
+    cumulative_obs = np.column_stack([result == 'L', result != 'W']).astype(np.float64)
+    rps = np.mean(np.sum((cumulative_pred - cumulative_obs) ** 2, axis=1) / 2)
+
+    return {
+        'log_loss': float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p))),
+        'brier': float(np.mean((p - y) ** 2)),
+        'accuracy': float(np.mean((p >= 0.5) == (y == 1))),
+        'auc': float(_auc(y, p)),
+        'r2_goal_diff': float(1 - ss_res / ss_tot) if ss_tot > 0 else np.nan,
+        'deviance_explained_for': float(deviance_explained['for']),
+        'deviance_explained_against': float(deviance_explained['against']),
+        'rps': float(rps),
+        'n': int(len(frame)),
+    }
+
+
+def _fit_fold(frame, season, features, l2):
+    """Ajusta y evalúa un fold (una temporada fuera)"""
+    test_mask = (frame['temporada'] == season).to_numpy()
+    train, test = frame[~test_mask], frame[test_mask]
+
+    model = MatchOutcomeModel(features=features, l2=l2).fit(train)
+    predictions = model.predict(test)
+
+    metrics = evaluate_predictions(test, predictions, train_frame=train)
+    metrics['temporada'] = season
+    return metrics, predictions
+
+
+def cross_validate_by_season(frame, features=None, l2=1e-2, max_workers=4):
+    """
+    Validación cruzada dejando una temporada fuera, con folds en paralelo
+
+    Args:
+        frame (pd.DataFrame): Resultado de build_model_frame
+        features (list): Variables candidatas
+        l2 (float): Penalización L2
+        max_workers (int): Folds ajustados en paralelo
+
+    Returns:
+        tuple: (métricas por fold, métricas agregadas, predicciones fuera de muestra)
+    """
+    seasons = sorted(frame['temporada'].unique())
+    if len(seasons) < 2:
+        return pd.DataFrame(), {}, pd.DataFrame()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(lambda s: _fit_fold(frame, s, features, l2), seasons))
+
+    fold_metrics = pd.DataFrame([metrics for metrics, _ in results])
+    fold_metrics = fold_metrics[['temporada'] + [c for c in fold_metrics.columns if c != 'temporada']]
+
+    # Métricas globales sobre todas las predicciones fuera de muestra
+    oof_predictions = pd.concat([predictions for _, predictions in results]).loc[frame.index]
+    pooled = evaluate_predictions(frame, oof_predictions)
+
+    return fold_metrics, pooled, oof_predictions
+
+
+# ============================================
+# SERVICIO CACHEADO POR VERSIÓN DE DATOS
+# ============================================
+
+def get_outcome_model(df, features=None, l2=1e-2, use_ratings=True,
+                      cache_dir=MODEL_CACHE_DIR, max_workers=4):
+    """
+    Modelo ajustado + validación cruzada, cacheados por versión de datos
+
+    Busca primero en memoria, luego en cache_dir/<version>.json y solo
+    ajusta si no existe.
+
+    Args:
+        df (pd.DataFrame): DataFrame de partidos (match store)
+        features (list): Variables candidatas
+        l2 (float): Penalización L2
+        use_ratings (bool): Si True usa el rating Elo pre-partido del rival
+        cache_dir (Path): Carpeta del caché en disco (None para desactivarlo)
+        max_workers (int): Folds ajustados en paralelo
+
+    Returns:
+        dict: model (MatchOutcomeModel), coefficients (DataFrame),
+              cv_folds (DataFrame), cv_pooled (dict), version (str)
+    """
+    features = list(features) if features else list(MODEL_FEATURES)
+    version = data_version(df)
+    cache_key = f"{version}_{'-'.join(features)}_{l2}_{int(use_ratings)}"
+
+    with _model_cache_lock:
+        if cache_key in _model_cache:
+            _model_cache.move_to_end(cache_key)
+            return _model_cache[cache_key]
+
+    cache_path = None
+    if cache_dir is not None:
+        key_hash = hashlib.sha256(cache_key.encode('utf-8')).hexdigest()[:8]
+        cache_path = Path(cache_dir) / f"outcome_model_{version}_{key_hash}.json"
+
+    if cache_path is not None and cache_path.exists():
+        stored = json.loads(cache_path.read_text(encoding='utf-8'))
+        model = MatchOutcomeModel.from_dict(stored['model'])
+        cv_folds = pd.DataFrame(stored['cv_folds'])
+        cv_pooled = stored['cv_pooled']
+    else:
+        frame = build_model_frame(df, use_ratings=use_ratings)
+        model = MatchOutcomeModel(features=features, l2=l2).fit(frame)
+        cv_folds, cv_pooled, _ = cross_validate_by_season(
+            frame, features=features, l2=l2, max_workers=max_workers
+        )
+
+        if cache_path is not None:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            cache_path.write_text(json.dumps({
+                'version': version,
+                'model': model.to_dict(),
+                'cv_folds': cv_folds.to_dict(orient='records'),
+                'cv_pooled': cv_pooled,
+            }, indent=2), encoding='utf-8')
+
+    result = {
+        'model': model,
+        'coefficients': model.coefficients(),
+        'cv_folds': cv_folds,
+        'cv_pooled': cv_pooled,
+        'version': version,
+    }
+
+    with _model_cache_lock:
+        _model_cache[cache_key] = result
+        _model_cache.move_to_end(cache_key)
+        while len(_model_cache) > MODEL_CACHE_SIZE:
+            _model_cache.popitem(last=False)
+
+    return result
+
+
+# ============================================
+# TESTING
+# ============================================
+if __name__ == "__main__":
+    import time
+    from .match_store import load_match_store
+
+    print("Testing Outcome Model...")
+
+    matches = load_match_store()
+    if matches is None:
+        print("⚠️ No se encontró el CSV de partidos")
+    else:
+        start_time = time.perf_counter()
+        service = get_outcome_model(matches, cache_dir=None)
+        elapsed = time.perf_counter() - start_time
+
+        print(service['coefficients'].round(3).to_string())
+        print(service['cv_folds'].round(3).to_string())
+        print({k: round(v, 3) for k, v in service['cv_pooled'].items()})
+        print(f"\n✅ Ajuste + CV en {elapsed:.3f}s")
+
+        frame = build_model_frame(matches)
+        start_time = time.perf_counter()
+        service['model'].predict(pd.concat([frame] * 200))
+        print(f"✅ predict de {len(frame) * 200:,} filas en {time.perf_counter() - start_time:.3f}s")
@@ -0,0 +1,252 @@
+"""
+============================================
+TESTS DE PERMUTACIÓN - ACADEMIC PERIODIZATION
+============================================
+
+Tests de permutación vectorizados para la hipótesis de Academic
+Periodization:
+
+1. Decline Octubre -> Noviembre (global y por equipo)
+2. Interacción con `team_academic_rank`: correlación entre el ranking
+   académico y el decline de cada equipo-temporada
+
+Bajo la hipótesis nula el mes no influye en el resultado, así que las
+etiquetas de mes se barajan dentro de cada equipo-temporada. Todas las
+permutaciones se generan como una matriz (P x n) de índices y los
+estadísticos se calculan con sumas por bloques, sin bucles por permutación.
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# Máximo de elementos de la matriz de permutaciones por bloque (controla memoria)
+MAX_BLOCK_ELEMENTS = 4_000_000
+
+
+def _pct(wins, games):
+    """Porcentaje con NaN cuando no hay partidos"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(games > 0, wins / games * 100, np.nan)
+
+
+def _cohens_h(p_before, p_after):
+    """Tamaño de efecto de Cohen (h) entre dos proporciones en %"""
+    return (
+        2 * np.arcsin(np.sqrt(np.asarray(p_before) / 100))
+        - 2 * np.arcsin(np.sqrt(np.asarray(p_after) / 100))
+    )
+
+
+def _p_value(observed, null_samples, alternative):
+    """
+    p-valor de permutación con corrección (1 + extremos) / (1 + P)
+
+    Args:
+        observed (np.ndarray): Estadístico observado (por columna)
+        null_samples (np.ndarray): Distribución nula (P x columnas)
+        alternative (str): 'greater', 'less' o 'two-sided'
+
+    Returns:
+        np.ndarray: p-valores
+    """
+    n_perm = null_samples.shape[0]
+    valid = np.isfinite(null_samples)
+
+    if alternative == 'greater':
+        extreme = null_samples >= observed - 1e-12
+    elif alternative == 'less':
+        extreme = null_samples <= observed + 1e-12
+    else:
+        center = np.nanmean(np.where(valid, null_samples, np.nan), axis=0)
+        extreme = np.abs(null_samples - center) >= np.abs(observed - center) - 1e-12
+
+    count = (extreme & valid).sum(axis=0)
+    p_values = (1 + count) / (1 + n_perm)
+    return np.where(np.isfinite(observed), p_values, np.nan)
+
+
+def _row_correlation(y, x):
+    """Correlación de Pearson de cada fila de y con el vector x"""
+    x_centered = x - x.mean()
+    y_centered = y - y.mean(axis=-1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (y_centered @ x_centered) / (
+            np.sqrt((y_centered ** 2).sum(axis=-1)) * np.sqrt((x_centered ** 2).sum())
+        )
+
+
+def academic_periodization_tests(df, n_perm=10000, seed=42,
+                                 before_month='October', after_month='November'):
+    """
+    Tests de permutación del decline mensual y su interacción con el ranking académico
+
+    Args:
+        df (pd.DataFrame): DataFrame de partidos (ya filtrado)
+        n_perm (int): Número de permutaciones
+        seed (int): Semilla del generador aleatorio
+        before_month (str): Mes de referencia (antes de exámenes)
+        after_month (str): Mes de exámenes
+
+    Returns:
+        pd.DataFrame: Una fila por test con columnas prueba, equipo, estadistico,
+                      efecto, p_value, null_mean, null_std, n, alternativa
+    """
+    columns = ['prueba', 'equipo', 'estadistico', 'efecto', 'p_value',
+               'null_mean', 'null_std', 'n', 'alternativa']
+
+    subset = df[df['mes'].isin([before_month, after_month])]
+    if len(subset) == 0:
+        return pd.DataFrame(columns=columns)
+
+    # Orden por equipo y temporada: cada estrato es un bloque contiguo
+    subset = subset.sort_values(['equipo', 'temporada'], kind='mergesort')
+    strata = subset.groupby(['equipo', 'temporada'], sort=True)
+    stratum_codes = strata.ngroup().to_numpy()
+    stratum_keys = strata.size().reset_index()[['equipo', 'temporada']]
+    stratum_sizes = np.bincount(stratum_codes)
+    stratum_offsets = np.concatenate([[0], np.cumsum(stratum_sizes)[:-1]])
+
+    teams, team_of_stratum = np.unique(stratum_keys['equipo'].to_numpy(), return_inverse=True)
+    team_offsets = np.concatenate([[0], np.flatnonzero(np.diff(team_of_stratum)) + 1])
+    stratum_rank = strata['team_academic_rank'].first().to_numpy(dtype=np.float64)
+
+    wins = (subset['resultado_code'] == 'W').to_numpy(dtype=np.float64)
+    is_after = (subset['mes'] == after_month).to_numpy(dtype=np.float64)
+
+    # Partidos antes/después por estrato (invariantes bajo la permutación)
+    after_games = np.add.reduceat(is_after, stratum_offsets)
+    before_games = stratum_sizes - after_games
+    stratum_wins = np.add.reduceat(wins, stratum_offsets)
+    valid_strata = (after_games > 0) & (before_games > 0)
+
+    def statistics(after_wins):
+        """Estadísticos a partir de las victorias en el mes de exámenes (... x estratos)"""
+        before_wins = stratum_wins - after_wins
+
+        pooled = (
+            _pct(before_wins.sum(axis=-1), before_games.sum())
+            - _pct(after_wins.sum(axis=-1), after_games.sum())
+        )
+        team_decline = (
+            _pct(np.add.reduceat(before_wins, team_offsets, axis=-1), np.add.reduceat(before_games, team_offsets))
+            - _pct(np.add.reduceat(after_wins, team_offsets, axis=-1), np.add.reduceat(after_games, team_offsets))
+        )
+
+        # Decline por equipo-temporada vs ranking académico
+        unit_decline = (
+            _pct(before_wins[..., valid_strata], before_games[valid_strata])
+            - _pct(after_wins[..., valid_strata], after_games[valid_strata])
+        )
+        if valid_strata.sum() > 2 and np.ptp(stratum_rank[valid_strata]) > 0:
+            rank_corr = _row_correlation(unit_decline, stratum_rank[valid_strata])
+        else:
+            rank_corr = np.full(np.shape(pooled), np.nan)
+
+        return pooled, team_decline, rank_corr
+
+    observed_after_wins = np.add.reduceat(wins * is_after, stratum_offsets)
+    obs_pooled, obs_team, obs_corr = statistics(observed_after_wins)
+
+    # Permutaciones dentro de cada estrato: clave aleatoria + código de estrato
+    rng = np.random.default_rng(seed)
+    n_rows = len(subset)
+    block = max(1, MAX_BLOCK_ELEMENTS // n_rows)
+    null_pooled, null_team, null_corr = [], [], []
+
+    for start in range(0, n_perm, block):
+        rows = min(block, n_perm - start)
+        keys = rng.random((rows, n_rows)) + stratum_codes
+        permutation = np.argsort(keys, axis=1)
+
+        permuted_after_wins = np.add.reduceat(wins[permutation] * is_after, stratum_offsets, axis=1)
+        pooled, team_decline, rank_corr = statistics(permuted_after_wins)
+
+        null_pooled.append(pooled)
+        null_team.append(team_decline)
+        null_corr.append(rank_corr)
+
+    null_pooled = np.concatenate(null_pooled)[:, None]
+    null_team = np.concatenate(null_team, axis=0)
+    null_corr = np.concatenate(null_corr)[:, None]
+
+    # Tamaños de efecto (Cohen's h para proporciones)
+    pooled_before_pct = _pct(stratum_wins.sum() - observed_after_wins.sum(), before_games.sum())
+    pooled_after_pct = _pct(observed_after_wins.sum(), after_games.sum())
+    team_before_pct = _pct(
+        np.add.reduceat(stratum_wins - observed_after_wins, team_offsets),
+        np.add.reduceat(before_games, team_offsets)
+    )
+    team_after_pct = _pct(
+        np.add.reduceat(observed_after_wins, team_offsets),
+        np.add.reduceat(after_games, team_offsets)
+    )
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        rows = []
+
+        decline_label = f'Decline {before_month} → {after_month}'
+        rows.append({
+            'prueba': decline_label,
+            'equipo': 'Todos',
+            'estadistico': float(obs_pooled),
+            'efecto': float(_cohens_h(pooled_before_pct, pooled_after_pct)),
+            'p_value': float(_p_value(np.atleast_1d(obs_pooled), null_pooled, 'greater')[0]),
+            'null_mean': float(np.nanmean(null_pooled)),
+            'null_std': float(np.nanstd(null_pooled)),
+            'n': int(len(subset)),
+            'alternativa': 'greater',
+        })
+
+        team_p = _p_value(obs_team, null_team, 'greater')
+        team_h = _cohens_h(team_before_pct, team_after_pct)
+        team_sizes = np.add.reduceat(stratum_sizes, team_offsets)
+        for i, team in enumerate(teams):
+            rows.append({
+                'prueba': decline_label,
+                'equipo': team,
+                'estadistico': float(obs_team[i]),
+                'efecto': float(team_h[i]),
+                'p_value': float(team_p[i]),
+                'null_mean': float(np.nanmean(null_team[:, i])),
+                'null_std': float(np.nanstd(null_team[:, i])),
+                'n': int(team_sizes[i]),
+                'alternativa': 'greater',
+            })
+
+        # Hipótesis: mejor ranking (número menor) -> más decline -> correlación negativa
+        rows.append({
+            'prueba': 'Interacción Academic Rank × Decline',
+            'equipo': 'Todos',
+            'estadistico': float(obs_corr),
+            'efecto': float(obs_corr),
+            'p_value': float(_p_value(np.atleast_1d(obs_corr), null_corr, 'less')[0]),
+            'null_mean': float(np.nanmean(null_corr)),
+            'null_std': float(np.nanstd(null_corr)),
+            'n': int(valid_strata.sum()),
+            'alternativa': 'less',
+        })
+
+    return pd.DataFrame(rows, columns=columns)
+
+
+# ============================================
+# TESTING
+# ============================================
+if __name__ == "__main__":
+    import time
+    from .match_store import load_match_store
+
+    print("Testing Permutation Tests...")
+
+    matches = load_match_store()
+    if matches is None:
+        print("⚠️ No se encontró el CSV de partidos")
+    else:
+        start_time = time.perf_counter()
+        results = academic_periodization_tests(matches, n_perm=20_000)
+        elapsed = time.perf_counter() - start_time
+        print(results.round(3).to_string())
+        print(f"\n✅ 20,000 permutaciones en {elapsed:.3f}s")
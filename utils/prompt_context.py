@@ -0,0 +1,267 @@
+"""
+============================================
+PROMPT CONTEXT - CONTEXTO COMPACTO PARA IA
+============================================
+
+Codifica los datos que se envían en los prompts como texto compacto en
+lugar de JSON indentado: escalares como "clave: valor" y listas de
+registros como tablas con cabecera única (las claves no se repiten en
+cada fila).
+
+Antes de enviar, fit_context estima los tokens y, si el contexto supera
+el presupuesto (LLM_CONTEXT_TOKEN_BUDGET), lo reduce por pasos: menos
+decimales, listas recortadas y tablas truncadas con una fila resumen
+(media de las filas omitidas). Así las selecciones muy grandes no hacen
+fallar la petición.
+"""
+
+import math
+from functools import lru_cache
+
+from .config import LLM_CONTEXT_TOKEN_BUDGET, OPENAI_MODEL
+
+# Caracteres por token (estimación conservadora para texto en español)
+CHARS_PER_TOKEN = 3.5
+
+# Elementos que se conservan al recortar listas de valores
+LIST_KEEP = 12
+
+
+# ============================================
+# ESTIMACIÓN DE TOKENS
+# ============================================
+
+@lru_cache(maxsize=4)
+def _get_encoding(model):
+    """Codificador de tiktoken para el modelo (None si no está instalado)"""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def estimate_tokens(text, model=OPENAI_MODEL):
+    """
+    Tokens aproximados de un texto
+
+    Usa tiktoken si está instalado; si no, una estimación por caracteres.
+
+    Args:
+        text (str): Texto
+        model (str): Modelo (elige el codificador de tiktoken)
+
+    Returns:
+        int: Número de tokens estimado
+    """
+    encoding = _get_encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def estimate_message_tokens(messages, model=OPENAI_MODEL):
+    """
+    Tokens aproximados de una lista de mensajes (incluye ~4 por mensaje de formato)
+
+    Args:
+        messages (list): Mensajes de la conversación
+        model (str): Modelo
+
+    Returns:
+        int: Número de tokens estimado
+    """
+    return sum(estimate_tokens(m.get('content') or '', model) + 4 for m in messages) + 2
+
+
+# ============================================
+# CODIFICACIÓN COMPACTA
+# ============================================
+
+def _format_value(value, decimals):
+    """Valor como texto corto (floats redondeados, enteros sin decimales)"""
+    if value is None:
+        return "-"
+    if isinstance(value, bool):
+        return "sí" if value else "no"
+    if isinstance(value, float):
+        if math.isnan(value):
+            return "-"
+        if value.is_integer():
+            return str(int(value))
+        return f"{value:.{decimals}f}"
+    if isinstance(value, (list, tuple)):
+        return ", ".join(_format_value(v, decimals) for v in value)
+    if isinstance(value, dict):
+        return "; ".join(f"{k}={_format_value(v, decimals)}" for k, v in value.items())
+    return str(value).replace("|", "/").replace("\n", " ")
+
+
+def _is_table(value):
+    """True si es una lista (no vacía) de registros"""
+    return isinstance(value, (list, tuple)) and len(value) > 0 and all(isinstance(v, dict) for v in value)
+
+
+def encode_table(rows, columns=None, decimals=1):
+    """
+    Lista de registros como tabla compacta separada por '|'
+
+    Args:
+        rows (list): Lista de dicts
+        columns (list): Columnas a incluir (por defecto, todas en orden de aparición)
+        decimals (int): Decimales de los floats
+
+    Returns:
+        str: Cabecera + una línea por fila
+    """
+    if columns is None:
+        columns = []
+        for row in rows:
+            columns.extend(k for k in row if k not in columns)
+
+    lines = ["|".join(str(c) for c in columns)]
+    for row in rows:
+        lines.append("|".join(_format_value(row.get(c), decimals) for c in columns))
+    return "\n".join(lines)
+
+
+def encode_context(context, decimals=1):
+    """
+    Contexto (dict) como texto compacto
+
+    Escalares y listas cortas en una línea; listas de registros como tabla;
+    dicts anidados como bloques con su clave de título.
+
+    Args:
+        context (dict): Datos del prompt
+        decimals (int): Decimales de los floats
+
+    Returns:
+        str: Texto listo para el prompt
+    """
+    lines = []
+    for key, value in context.items():
+        if _is_table(value):
+            lines.append(f"{key} ({len(value)} filas):")
+            lines.append(encode_table(value, decimals=decimals))
+        elif isinstance(value, dict) and any(isinstance(v, (dict, list, tuple)) for v in value.values()):
+            lines.append(f"{key}:")
+            lines.append(encode_context(value, decimals))
+        else:
+            lines.append(f"{key}: {_format_value(value, decimals)}")
+    return "\n".join(lines)
+
+
+# ============================================
+# AJUSTE AL PRESUPUESTO
+# ============================================
+
+def _summary_row(rows):
+    """Fila resumen de las filas omitidas: media de columnas numéricas"""
+    summary = {}
+    for row in rows:
+        for key, value in row.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                summary.setdefault(key, []).append(value)
+
+    first_key = next(iter(rows[0]))
+    result = {first_key: f"otros ({len(rows)}, media)"}
+    result.update({k: sum(v) / len(v) for k, v in summary.items() if k != first_key})
+    return result
+
+
+def _truncate_tables(context, keep):
+    """Copia del contexto con cada tabla (también anidada) limitada a keep filas + resumen"""
+    truncated = {}
+    for key, value in context.items():
+        if _is_table(value) and len(value) > keep:
+            truncated[key] = list(value[:keep]) + [_summary_row(value[keep:])]
+        elif isinstance(value, dict):
+            truncated[key] = _truncate_tables(value, keep)
+        elif isinstance(value, (list, tuple)) and not _is_table(value) and len(value) > LIST_KEEP:
+            truncated[key] = list(value[:LIST_KEEP]) + [f"(+{len(value) - LIST_KEEP} más)"]
+        else:
+            truncated[key] = value
+    return truncated
+
+
+def _max_table_rows(context):
+    """Filas de la tabla más larga del contexto (0 si no hay tablas)"""
+    sizes = [0]
+    for value in context.values():
+        if _is_table(value):
+            sizes.append(len(value))
+        elif isinstance(value, dict):
+            sizes.append(_max_table_rows(value))
+    return max(sizes)
+
+
+def fit_context(context, max_tokens=LLM_CONTEXT_TOKEN_BUDGET, decimals=1, model=OPENAI_MODEL):
+    """
+    Codifica el contexto y lo reduce hasta que cabe en el presupuesto de tokens
+
+    Pasos, en orden, hasta caber: codificación compacta; sin decimales;
+    listas y tablas recortadas (las primeras filas se conservan, el resto
+    se resume en una fila de medias), reduciendo a la mitad cada vez; y,
+    como último recurso, corte del texto.
+
+    Args:
+        context (dict): Datos del prompt (poner primero las filas más relevantes)
+        max_tokens (int): Presupuesto de tokens del contexto
+        decimals (int): Decimales de los floats
+        model (str): Modelo (para estimar tokens)
+
+    Returns:
+        str: Contexto compacto dentro del presupuesto
+    """
+    text = encode_context(context, decimals)
+    if estimate_tokens(text, model) <= max_tokens:
+        return text
+
+    original_tokens = estimate_tokens(text, model)
+    decimals = 0
+    text = encode_context(context, decimals)
+
+    keep = _max_table_rows(context)
+    while estimate_tokens(text, model) > max_tokens and keep > 1:
+        keep = max(1, keep // 2)
+        text = encode_context(_truncate_tables(context, keep), decimals)
+
+    if estimate_tokens(text, model) > max_tokens:
+        max_chars = int(max_tokens * CHARS_PER_TOKEN)
+        text = text[:max_chars] + "\n…[contexto truncado]"
+
+    print(f"✂️ Contexto reducido: ~{original_tokens} → ~{estimate_tokens(text, model)} tokens (presupuesto {max_tokens})")
+    return text
+
+
+# ============================================
+# TESTING
+# ============================================
+if __name__ == "__main__":
+    import json
+
+    print("Testing Prompt Context...")
+
+    context = {
+        'equipos': [f"Equipo {i}" for i in range(40)],
+        'temporadas': [2022, 2023, 2024],
+        'total_partidos': 1200,
+        'resumen_equipos': [
+            {'nombre': f"Equipo {i}", 'academic_rank': i + 1, 'partidos': 30,
+             'victorias': 30 - i % 20, 'derrotas': i % 20, 'empates': 0, 'win_percentage': 100 - i * 2.345}
+            for i in range(40)
+        ]
+    }
+
+    indented = json.dumps(context, indent=2)
+    compact = encode_context(context)
+    print(f"JSON indentado: ~{estimate_tokens(indented)} tokens")
+    print(f"Compacto: ~{estimate_tokens(compact)} tokens")
+
+    fitted = fit_context(context, max_tokens=250)
+    print(fitted)
+    print(f"✅ Ajustado: ~{estimate_tokens(fitted)} tokens")
@@ -0,0 +1,503 @@
+"""
+============================================
+RATINGS ELO - FUERZA DE EQUIPOS
+============================================
+
+Motor de ratings Elo (con ventaja local, margen de victoria y opcionalmente
+incertidumbre estilo Glicko) que procesa el historial de partidos en orden
+cronológico. El estado son arrays de numpy indexados por equipo, de modo que
+escala a todos los equipos de la conferencia (rivales incluidos).
+
+Los ratings pre-partido sustituyen a `opponent_quality` (win% histórico
+calculado con toda la muestra) como feature de fuerza sin data leakage.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .match_store import unique_matches, match_dates
+
+# Score del equipo A según su resultado
+RESULT_SCORE = {'W': 1.0, 'T': 0.5, 'L': 0.0}
+
+
+class EloRatingEngine:
+    """
+    Motor de ratings Elo con modo batch (fit) e incremental (update)
+    """
+
+    def __init__(self, k_factor=20.0, home_advantage=60.0, initial_rating=1500.0,
+                 margin_of_victory=True, season_carryover=0.75,
+                 track_uncertainty=False, initial_rd=350.0, min_rd=60.0,
+                 rd_decay=0.93, season_rd_inflation=80.0):
+        """
+        Args:
+            k_factor (float): Factor K base
+            home_advantage (float): Puntos Elo que se suman al equipo local
+            initial_rating (float): Rating de un equipo nuevo
+            margin_of_victory (bool): Escalar K según la diferencia de goles
+            season_carryover (float): Fracción del rating que se conserva al
+                                      cambiar de temporada (el resto regresa a la media)
+            track_uncertainty (bool): Mantener desviación (RD) estilo Glicko
+            initial_rd (float): RD de un equipo nuevo
+            min_rd (float): RD mínima
+            rd_decay (float): Factor de reducción de RD tras cada partido
+            season_rd_inflation (float): Aumento de RD entre temporadas
+        """
+        self.k_factor = k_factor
+        self.home_advantage = home_advantage
+        self.initial_rating = initial_rating
+        self.margin_of_victory = margin_of_victory
+        self.season_carryover = season_carryover
+        self.track_uncertainty = track_uncertainty
+        self.initial_rd = initial_rd
+        self.min_rd = min_rd
+        self.rd_decay = rd_decay
+        self.season_rd_inflation = season_rd_inflation
+
+        self.reset()
+
+    def reset(self):
+        """Reinicia el estado del motor"""
+        self.teams = []
+        self.team_index = {}
+        self.ratings = np.empty(0, dtype=np.float64)
+        self.rd = np.empty(0, dtype=np.float64)
+        self.games_played = np.empty(0, dtype=np.int64)
+        self.last_season = None
+        self.last_date = None
+        self._seen_keys = set()
+        self._history_chunks = []
+        self._history = None
+
+    # ============================================
+    # ESTADO
+    # ============================================
+
+    def _ensure_teams(self, names):
+        """
+        Devuelve los índices de los equipos, dando de alta los nuevos
+
+        Args:
+            names (array-like): Nombres de equipos
+
+        Returns:
+            np.ndarray: Índices en los arrays de estado
+        """
+        uniques, inverse = np.unique(np.asarray(names, dtype=object), return_inverse=True)
+
+        new_names = [name for name in uniques if name not in self.team_index]
+        if new_names:
+            start = len(self.teams)
+            for offset, name in enumerate(new_names):
+                self.team_index[name] = start + offset
+            self.teams.extend(new_names)
+
+            n_new = len(new_names)
+            self.ratings = np.concatenate([self.ratings, np.full(n_new, self.initial_rating)])
+            self.rd = np.concatenate([self.rd, np.full(n_new, self.initial_rd)])
+            self.games_played = np.concatenate([self.games_played, np.zeros(n_new, dtype=np.int64)])
+
+        lookup = np.array([self.team_index[name] for name in uniques], dtype=np.int64)
+        return lookup[inverse]
+
+    def _start_season(self):
+        """Regresión a la media e inflación de RD al empezar temporada"""
+        if len(self.ratings) == 0:
+            return
+
+        mean_rating = self.ratings.mean()
+        self.ratings = mean_rating + self.season_carryover * (self.ratings - mean_rating)
+
+        if self.track_uncertainty:
+            self.rd = np.minimum(
+                self.initial_rd,
+                np.sqrt(self.rd ** 2 + self.season_rd_inflation ** 2)
+            )
+
+    def _mov_multiplier(self, goal_diff):
+        """
+        Multiplicador de margen de victoria (World Football Elo)
+
+        1 gol o empate -> 1.0, 2 goles -> 1.5, 3+ goles -> (11 + N) / 8
+        """
+        goal_diff = np.abs(goal_diff)
+        return np.where(
+            goal_diff <= 1, 1.0,
+            np.where(goal_diff == 2, 1.5, (11.0 + goal_diff) / 8.0)
+        )
+
+    def _uncertainty_multiplier(self, idx):
+        """Escala K entre 1x (RD mínima) y 2x (RD inicial)"""
+        span = self.initial_rd - self.min_rd
+        return 1.0 + (self.rd[idx] - self.min_rd) / span
+
+    # ============================================
+    # PROCESAMIENTO
+    # ============================================
+
+    def fit(self, df):
+        """
+        Procesa todo el historial desde cero (modo batch)
+
+        Args:
+            df (pd.DataFrame): DataFrame de partidos (match store)
+
+        Returns:
+            EloRatingEngine: self
+        """
+        self.reset()
+        self.update(df)
+        return self
+
+    def update(self, new_matches):
+        """
+        Procesa partidos nuevos sobre el estado actual (modo incremental)
+
+        Los partidos ya procesados (misma fecha y mismos equipos) se ignoran.
+        Los partidos de un mismo día se actualizan en bloque (periodo de rating).
+
+        Args:
+            new_matches (pd.DataFrame): Partidos nuevos (mismo esquema que el match store)
+
+        Returns:
+            int: Número de partidos procesados
+        """
+        games = unique_matches(new_matches)
+        games = games[~games['match_key'].isin(self._seen_keys)].reset_index(drop=True)
+
+        if len(games) == 0:
+            return 0
+
+        if self.last_date is not None and games['fecha'].iloc[0] < self.last_date:
+            print("⚠️ Hay partidos anteriores al último procesado; se aplican en orden de llegada")
+
+        a_idx = self._ensure_teams(games['team_a'])
+        b_idx = self._ensure_teams(games['team_b'])
+        a_home = games['a_home'].to_numpy()
+        goal_diff = games['goals_a'].to_numpy() - games['goals_b'].to_numpy()
+        score_a = games['result_a'].map(RESULT_SCORE).to_numpy(dtype=np.float64)
+        seasons = games['temporada'].to_numpy()
+        dates = games['fecha'].to_numpy()
+
+        # Límites de cada día (los partidos ya vienen ordenados por fecha)
+        _, day_starts = np.unique(dates, return_index=True)
+        day_bounds = np.append(np.sort(day_starts), len(games))
+
+        for start, end in zip(day_bounds[:-1], day_bounds[1:]):
+            if seasons[start] != self.last_season:
+                if self.last_season is not None:
+                    self._start_season()
+                self.last_season = seasons[start]
+
+            self._process_period(
+                dates[start], seasons[start],
+                a_idx[start:end], b_idx[start:end], a_home[start:end],
+                goal_diff[start:end], score_a[start:end]
+            )
+
+        self.last_date = dates[-1]
+        self._seen_keys.update(games['match_key'])
+        self._history = None
+        return len(games)
+
+    def _process_period(self, date, season, a_idx, b_idx, a_home, goal_diff, score_a):
+        """Actualiza los ratings con todos los partidos de un mismo día"""
+        rating_a = self.ratings[a_idx]
+        rating_b = self.ratings[b_idx]
+        rd_a = self.rd[a_idx]
+        rd_b = self.rd[b_idx]
+
+        # +HFA si A juega en casa, -HFA si juega fuera
+        diff = rating_a - rating_b + self.home_advantage * (2 * a_home - 1)
+        expected_a = 1.0 / (1.0 + 10.0 ** (-diff / 400.0))
+
+        k = np.full(len(a_idx), self.k_factor)
+        if self.margin_of_victory:
+            k = k * self._mov_multiplier(goal_diff)
+
+        delta = score_a - expected_a
+        if self.track_uncertainty:
+            delta_a = k * self._uncertainty_multiplier(a_idx) * delta
+            delta_b = -k * self._uncertainty_multiplier(b_idx) * delta
+        else:
+            delta_a = k * delta
+            delta_b = -delta_a
+
+        np.add.at(self.ratings, a_idx, delta_a)
+        np.add.at(self.ratings, b_idx, delta_b)
+        np.add.at(self.games_played, a_idx, 1)
+        np.add.at(self.games_played, b_idx, 1)
+
+        if self.track_uncertainty:
+            touched = np.unique(np.concatenate([a_idx, b_idx]))
+            self.rd[touched] = np.maximum(self.min_rd, self.rd[touched] * self.rd_decay)
+
+        n = len(a_idx)
+        self._history_chunks.append({
+            'fecha': np.full(2 * n, date),
+            'temporada': np.full(2 * n, season, dtype=object),
+            'team': np.concatenate([a_idx, b_idx]),
+            'opponent': np.concatenate([b_idx, a_idx]),
+            'rating_pre': np.concatenate([rating_a, rating_b]),
+            'rating_post': np.concatenate([rating_a + delta_a, rating_b + delta_b]),
+            'rd_pre': np.concatenate([rd_a, rd_b]),
+        })
+
+    # ============================================
+    # CONSULTAS
+    # ============================================
+
+    def history(self):
+        """
+        Snapshots de rating por partido (antes y después)
+
+        Returns:
+            pd.DataFrame: Columnas fecha, temporada, equipo, oponente,
+                          rating_pre, rating_post, rd_pre
+        """
+        if self._history is None:
+            columns = ['fecha', 'temporada', 'equipo', 'oponente', 'rating_pre', 'rating_post', 'rd_pre']
+            if not self._history_chunks:
+                return pd.DataFrame(columns=columns)
+
+            merged = {
+                key: np.concatenate([chunk[key] for chunk in self._history_chunks])
+                for key in self._history_chunks[0]
+            }
+            names = np.array(self.teams, dtype=object)
+            self._history = pd.DataFrame({
+                'fecha': pd.to_datetime(merged['fecha']),
+                'temporada': merged['temporada'],
+                'equipo': names[merged['team']],
+                'oponente': names[merged['opponent']],
+                'rating_pre': merged['rating_pre'],
+                'rating_post': merged['rating_post'],
+                'rd_pre': merged['rd_pre'],
+            })[columns]
+
+        return self._history
+
+    def current_ratings(self):
+        """
+        Ratings actuales de todos los equipos
+
+        Returns:
+            pd.DataFrame: Columnas equipo, rating, rd, partidos ordenadas por rating
+        """
+        table = pd.DataFrame({
+            'equipo': self.teams,
+            'rating': self.ratings,
+            'rd': self.rd,
+            'partidos': self.games_played,
+        })
+        return table.sort_values('rating', ascending=False).reset_index(drop=True)
+
+    def ratings_at(self, date):
+        """
+        Ratings de todos los equipos justo antes de una fecha (point-in-time)
+
+        Args:
+            date (str or datetime): Fecha de consulta
+
+        Returns:
+            pd.DataFrame: Columnas equipo, rating con el último rating
+                          post-partido anterior a la fecha
+        """
+        history = self.history()
+        before = history[history['fecha'] < pd.Timestamp(date)]
+        latest = before.groupby('equipo', sort=True).tail(1)
+        return latest[['equipo', 'rating_post']].rename(
+            columns={'rating_post': 'rating'}
+        ).sort_values('rating', ascending=False).reset_index(drop=True)
+
+
+# ============================================
+# FEATURES
+# ============================================
+
+def add_rating_features(df, engine=None):
+    """
+    Agrega ratings pre-partido (sin leakage) al DataFrame de partidos
+
+    Args:
+        df (pd.DataFrame): DataFrame de partidos (match store)
+        engine (EloRatingEngine): Motor ya entrenado (si None se entrena uno nuevo)
+
+    Returns:
+        pd.DataFrame: Copia de df con team_rating, opponent_rating y rating_diff
+    """
+    if engine is None:
+        engine = EloRatingEngine().fit(df)
+
+    history = engine.history()[['fecha', 'equipo', 'oponente', 'rating_pre']]
+    history = history.drop_duplicates(['fecha', 'equipo', 'oponente'])
+
+    result = df.copy()
+    result['_fecha'] = match_dates(result)
+
+    team_side = history.rename(columns={'fecha': '_fecha', 'rating_pre': 'team_rating'})
+    opponent_side = history.rename(columns={
+        'fecha': '_fecha', 'equipo': 'oponente', 'oponente': 'equipo',
+        'rating_pre': 'opponent_rating'
+    })
+
+    result = result.merge(team_side, on=['_fecha', 'equipo', 'oponente'], how='left')
+    result = result.merge(opponent_side, on=['_fecha', 'equipo', 'oponente'], how='left')
+    result['rating_diff'] = result['team_rating'] - result['opponent_rating']
+
+    return result.drop(columns='_fecha').set_index(df.index)
+
+
+# ============================================
+# SIMPLE RATING SYSTEM (SRS)
+# ============================================
+
+def _solve_srs(team_a, team_b, a_home, margin, home_term=True, tol=1e-10, max_iter=1000):
+    """
+    Resuelve por mínimos cuadrados margen = r_a - r_b + h * (±1)
+
+    La matriz de diseño (partido x equipo) se guarda en formato disperso:
+    cada partido tiene 2 o 3 valores no nulos (columnas `cols`, valores `vals`).
+    El sistema se resuelve con gradiente conjugado sobre mínimos cuadrados
+    (CGLS), usando solo productos dispersos X·v y X'·r en O(partidos), sin
+    construir matrices densas equipo x equipo. Partiendo de cero, CGLS
+    converge a la solución de norma mínima, es decir, ratings que suman 0.
+
+    Args:
+        team_a (np.ndarray): Índice del equipo A por partido
+        team_b (np.ndarray): Índice del equipo B por partido
+        a_home (np.ndarray): 1 si A juega en casa, 0 si fuera
+        margin (np.ndarray): Goles A - goles B
+        home_term (bool): Estimar término de ventaja local
+        tol (float): Tolerancia relativa de convergencia
+        max_iter (int): Iteraciones máximas
+
+    Returns:
+        tuple: (ratings por equipo, ventaja local estimada)
+    """
+    n_games = len(team_a)
+    n_teams = int(max(team_a.max(), team_b.max())) + 1
+    n_params = n_teams + 1 if home_term else n_teams
+
+    # Coordenadas de los valores no nulos de cada fila
+    cols = [team_a, team_b]
+    vals = [np.ones(n_games), -np.ones(n_games)]
+    if home_term:
+        cols.append(np.full(n_games, n_teams))
+        vals.append(2.0 * a_home - 1.0)
+    cols = np.stack(cols, axis=1)
+    vals = np.stack(vals, axis=1)
+    flat_cols = cols.ravel()
+
+    def matvec(x):
+        return (vals * x[cols]).sum(axis=1)
+
+    def rmatvec(r):
+        return np.bincount(flat_cols, weights=(vals * r[:, None]).ravel(), minlength=n_params)
+
+    # CGLS
+    solution = np.zeros(n_params)
+    residual = margin.astype(np.float64).copy()
+    gradient = rmatvec(residual)
+    direction = gradient.copy()
+    gamma = gradient @ gradient
+    threshold = (tol * np.sqrt(gamma)) ** 2
+
+    for _ in range(max_iter):
+        if gamma <= threshold:
+            break
+        projected = matvec(direction)
+        step = gamma / (projected @ projected)
+        solution += step * direction
+        residual -= step * projected
+        gradient = rmatvec(residual)
+        gamma_new = gradient @ gradient
+        direction = gradient + (gamma_new / gamma) * direction
+        gamma = gamma_new
+
+    ratings = solution[:n_teams]
+    home_advantage = solution[n_teams] if home_term else 0.0
+    return ratings, home_advantage
+
+
+def compute_srs(df, by_season=True, home_term=True, margin_cap=None):
+    """
+    Simple Rating System: fuerza ajustada por calendario
+
+    Args:
+        df (pd.DataFrame): DataFrame de partidos (match store)
+        by_season (bool): Resolver por temporada (True) o con todo el histórico
+        home_term (bool): Incluir término de ventaja local
+        margin_cap (int): Limitar el margen de goles (None = sin límite)
+
+    Returns:
+        pd.DataFrame: Columnas temporada, equipo, srs, mov, sos, partidos,
+                      home_advantage ordenadas por temporada y srs
+    """
+    games = unique_matches(df)
+    if not by_season:
+        games = games.assign(temporada='Todas')
+
+    results = []
+    for season, season_games in games.groupby('temporada', sort=True):
+        names, codes = np.unique(
+            np.concatenate([season_games['team_a'], season_games['team_b']]).astype(str),
+            return_inverse=True
+        )
+        n_games = len(season_games)
+        team_a = codes[:n_games]
+        team_b = codes[n_games:]
+
+        margin = (season_games['goals_a'] - season_games['goals_b']).to_numpy(dtype=np.float64)
+        if margin_cap is not None:
+            margin = np.clip(margin, -margin_cap, margin_cap)
+
+        ratings, home_advantage = _solve_srs(
+            team_a, team_b, season_games['a_home'].to_numpy(), margin, home_term
+        )
+
+        # MOV y SOS por equipo (cada partido cuenta para ambos lados)
+        team_idx = np.concatenate([team_a, team_b])
+        opp_idx = np.concatenate([team_b, team_a])
+        team_margin = np.concatenate([margin, -margin])
+        games_played = np.bincount(team_idx, minlength=len(names))
+        mov = np.bincount(team_idx, weights=team_margin, minlength=len(names)) / games_played
+        sos = np.bincount(team_idx, weights=ratings[opp_idx], minlength=len(names)) / games_played
+
+        results.append(pd.DataFrame({
+            'temporada': season,
+            'equipo': names,
+            'srs': ratings,
+            'mov': mov,
+            'sos': sos,
+            'partidos': games_played,
+            'home_advantage': home_advantage,
+        }))
+
+    if not results:
+        return pd.DataFrame(columns=['temporada', 'equipo', 'srs', 'mov', 'sos', 'partidos', 'home_advantage'])
+
+    srs = pd.concat(results, ignore_index=True)
+    return srs.sort_values(['temporada', 'srs'], ascending=[True, False]).reset_index(drop=True)
+
+
+# ============================================
+# TESTING
+# ============================================
+if __name__ == "__main__":
+    from .match_store import load_match_store
+
+    print("Testing Elo Ratings...")
+
+    matches = load_match_store()
+    if matches is None:
+        print("⚠️ No se encontró el CSV de partidos")
+    else:
+        engine = EloRatingEngine(track_uncertainty=True).fit(matches)
+        print(engine.current_ratings().head(10))
+        print(f"\n✅ {len(engine.teams)} equipos, {len(engine.history())} snapshots")
+
+        srs = compute_srs(matches, by_season=False)
+        print(srs.head(10))
+        print(f"\n✅ SRS - ventaja local: {srs['home_advantage'].iloc[0]:+.2f} goles")
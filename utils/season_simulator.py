@@ -0,0 +1,476 @@
+"""
+============================================
+SIMULADOR DE TEMPORADA - MONTE CARLO
+============================================
+
+Proyección del resto de la temporada:
+
+1. Modelo de goles de Poisson con ataque, defensa y ventaja local por
+   equipo (con corrección opcional de Dixon-Coles para marcadores bajos)
+2. Simulador Monte Carlo vectorizado: todos los partidos de todas las
+   simulaciones se sortean en una sola operación de arrays, y la tabla
+   final y las posiciones se calculan sin bucles por simulación
+
+Para corridas muy grandes las simulaciones se reparten en bloques que
+pueden ejecutarse en un pool de procesos.
+"""
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .match_store import POINTS_BY_RESULT, unique_matches
+
+# Goles máximos de la matriz de marcadores (por equipo)
+MAX_GOALS = 10
+
+# Rango de búsqueda del parámetro rho de Dixon-Coles
+DIXON_COLES_RHO_GRID = np.linspace(-0.25, 0.25, 101)
+
+
+# ============================================
+# MODELO DE GOLES
+# ============================================
+
+class PoissonGoalModel:
+    """
+    Modelo de goles log(mu) = base + home + ataque_equipo - defensa_rival
+
+    Attributes:
+        teams (np.ndarray): Nombres de los equipos (orden de los parámetros)
+        attack (np.ndarray): Parámetro de ataque por equipo
+        defense (np.ndarray): Parámetro de defensa por equipo (mayor = mejor)
+        base (float): Log de goles esperados de un equipo medio como visitante
+        home (float): Ventaja local (log)
+        rho (float): Parámetro de Dixon-Coles (0 = Poisson independiente)
+    """
+
+    def __init__(self, l2=1.0, dixon_coles=True, half_life_days=365.0):
+        """
+        Args:
+            l2 (float): Penalización L2 sobre ataque/defensa (encoge hacia la media)
+            dixon_coles (bool): Si True estima la corrección de marcadores bajos
+            half_life_days (float): Vida media del peso temporal (None = sin decaimiento)
+        """
+        self.l2 = l2
+        self.dixon_coles = dixon_coles
+        self.half_life_days = half_life_days
+        self.teams = np.array([], dtype=object)
+        self.attack = np.array([])
+        self.defense = np.array([])
+        self.base = 0.0
+        self.home = 0.0
+        self.rho = 0.0
+
+    def _team_index(self, names):
+        """Índices de los equipos (−1 para equipos desconocidos)"""
+        lookup = pd.Index(self.teams)
+        return lookup.get_indexer(np.asarray(names, dtype=object))
+
+    def fit(self, games, reference_date=None):
+        """
+        Ajusta el modelo por IRLS sobre partidos únicos
+
+        Args:
+            games (pd.DataFrame): Resultado de unique_matches
+            reference_date (pd.Timestamp): Fecha de referencia del decaimiento
+                                           (por defecto el último partido)
+
+        Returns:
+            PoissonGoalModel: self
+        """
+        self.teams = np.array(sorted(set(games['team_a']) | set(games['team_b'])), dtype=object)
+        n_teams = len(self.teams)
+        a_idx = self._team_index(games['team_a'])
+        b_idx = self._team_index(games['team_b'])
+        a_home = games['a_home'].to_numpy(dtype=np.float64)
+        n_games = len(games)
+
+        # Dos observaciones por partido: goles de A y goles de B
+        scorer = np.concatenate([a_idx, b_idx])
+        conceder = np.concatenate([b_idx, a_idx])
+        home = np.concatenate([a_home, 1 - a_home])
+        goals = np.concatenate([games['goals_a'], games['goals_b']]).astype(np.float64)
+
+        weights = np.ones(n_games)
+        if self.half_life_days and n_games > 0:
+            reference_date = reference_date or games['fecha'].max()
+            age_days = (reference_date - games['fecha']).dt.days.to_numpy(dtype=np.float64)
+            weights = 0.5 ** (np.clip(age_days, 0, None) / self.half_life_days)
+        weights = np.concatenate([weights, weights])
+
+        # Columnas: [base, home, ataque_0..T-1, concede_0..T-1]
+        n_params = 2 + 2 * n_teams
+        rows = np.arange(2 * n_games)
+        X = np.zeros((2 * n_games, n_params))
+        X[:, 0] = 1.0
+        X[:, 1] = home
+        X[rows, 2 + scorer] = 1.0
+        X[rows, 2 + n_teams + conceder] = 1.0
+
+        penalty = np.full(n_params, self.l2)
+        penalty[:2] = 0.0
+
+        beta = np.zeros(n_params)
+        beta[0] = np.log(max(np.average(goals, weights=weights), 1e-6))
+
+        for _ in range(50):
+            mu = np.exp(np.clip(X @ beta, -20, 20))
+            gradient = X.T @ (weights * (goals - mu)) - penalty * beta
+            hessian = (X * (weights * mu)[:, None]).T @ X + np.diag(penalty)
+            step = np.linalg.solve(hessian, gradient)
+            beta += step
+            if np.max(np.abs(step)) < 1e-8:
+                break
+
+        self.base = float(beta[0])
+        self.home = float(beta[1])
+        self.attack = beta[2:2 + n_teams]
+        self.defense = -beta[2 + n_teams:]
+
+        self.rho = 0.0
+        if self.dixon_coles and n_games > 0:
+            lam, mu = self.expected_goals(games['team_a'], games['team_b'], a_home)
+            self.rho = _fit_rho(
+                games['goals_a'].to_numpy(), games['goals_b'].to_numpy(),
+                lam, mu, weights[:n_games]
+            )
+
+        return self
+
+    def expected_goals(self, team_a, team_b, a_home):
+        """
+        Goles esperados de cada lado (vectorizado)
+
+        Los equipos sin historial usan ataque/defensa medios (0).
+
+        Args:
+            team_a (array-like): Equipos A
+            team_b (array-like): Equipos B
+            a_home (array-like): 1 si A es local, 0 si es visitante
+
+        Returns:
+            tuple: (goles esperados de A, goles esperados de B)
+        """
+        a_idx = self._team_index(team_a)
+        b_idx = self._team_index(team_b)
+        a_home = np.asarray(a_home, dtype=np.float64)
+
+        attack = np.append(self.attack, 0.0)
+        defense = np.append(self.defense, 0.0)
+
+        lam = np.exp(self.base + self.home * a_home + attack[a_idx] - defense[b_idx])
+        mu = np.exp(self.base + self.home * (1 - a_home) + attack[b_idx] - defense[a_idx])
+        return lam, mu
+
+    def score_matrix(self, lam, mu, max_goals=MAX_GOALS):
+        """
+        Probabilidad de cada marcador (partidos x goles_A x goles_B)
+
+        Args:
+            lam (np.ndarray): Goles esperados de A
+            mu (np.ndarray): Goles esperados de B
+            max_goals (int): Goles máximos por equipo
+
+        Returns:
+            np.ndarray: Matriz (G, max_goals+1, max_goals+1) normalizada
+        """
+        goals = np.arange(max_goals + 1)
+        log_factorial = np.array([math.lgamma(k + 1) for k in goals])
+        pmf_a = np.exp(goals * np.log(lam)[:, None] - lam[:, None] - log_factorial)
+        pmf_b = np.exp(goals * np.log(mu)[:, None] - mu[:, None] - log_factorial)
+        matrix = pmf_a[:, :, None] * pmf_b[:, None, :]
+
+        if self.rho != 0.0:
+            matrix[:, 0, 0] *= 1 - lam * mu * self.rho
+            matrix[:, 0, 1] *= 1 + lam * self.rho
+            matrix[:, 1, 0] *= 1 + mu * self.rho
+            matrix[:, 1, 1] *= 1 - self.rho
+
+        matrix = np.clip(matrix, 0, None)
+        return matrix / matrix.sum(axis=(1, 2), keepdims=True)
+
+    def parameters(self):
+        """
+        Parámetros por equipo
+
+        Returns:
+            pd.DataFrame: equipo, attack, defense, goles esperados vs equipo medio
+        """
+        table = pd.DataFrame({
+            'equipo': self.teams,
+            'attack': self.attack,
+            'defense': self.defense,
+        })
+        table['goles_favor_esperados'] = np.exp(self.base + self.home / 2 + self.attack)
+        table['goles_contra_esperados'] = np.exp(self.base + self.home / 2 - self.defense)
+        return table.sort_values('attack', ascending=False).reset_index(drop=True)
+
+
+def _fit_rho(goals_a, goals_b, lam, mu, weights):
+    """
+    Estima rho de Dixon-Coles por búsqueda en rejilla (ataque/defensa fijos)
+
+    Returns:
+        float: rho que maximiza la log-verosimilitud de la corrección tau
+    """
+    rho = DIXON_COLES_RHO_GRID[:, None]
+    tau = np.ones((len(DIXON_COLES_RHO_GRID), len(goals_a)))
+
+    zero_zero = (goals_a == 0) & (goals_b == 0)
+    zero_one = (goals_a == 0) & (goals_b == 1)
+    one_zero = (goals_a == 1) & (goals_b == 0)
+    one_one = (goals_a == 1) & (goals_b == 1)
+
+    tau = np.where(zero_zero, 1 - lam * mu * rho, tau)
+    tau = np.where(zero_one, 1 + lam * rho, tau)
+    tau = np.where(one_zero, 1 + mu * rho, tau)
+    tau = np.where(one_one, 1 - rho, tau)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_likelihood = np.where(tau > 0, np.log(tau), -np.inf) @ weights
+
+    return float(DIXON_COLES_RHO_GRID[np.argmax(log_likelihood)])
+
+
+# ============================================
+# SIMULACIÓN MONTE CARLO
+# ============================================
+
+def _sample_scores(cdf, n_sims, rng):
+    """
+    Sortea marcadores de todos los partidos para todas las simulaciones
+
+    Las CDF de cada partido se desplazan por su índice (partido g ocupa el
+    intervalo [g, g+1]) para sortear todo con un único searchsorted.
+
+    Args:
+        cdf (np.ndarray): CDF de marcadores por partido (G x K)
+        n_sims (int): Número de simulaciones
+        rng (np.random.Generator): Generador aleatorio
+
+    Returns:
+        np.ndarray: Índice del marcador (n_sims x G)
+    """
+    n_games, n_outcomes = cdf.shape
+    offsets = np.arange(n_games, dtype=np.float64)
+    flat_cdf = (cdf + offsets[:, None]).ravel()
+
+    uniforms = rng.random((n_sims, n_games)) + offsets
+    flat_index = np.searchsorted(flat_cdf, uniforms, side='right')
+    return np.minimum(flat_index - (offsets * n_outcomes).astype(np.int64), n_outcomes - 1)
+
+
+def _simulate_chunk(args):
+    """
+    Simula un bloque de temporadas (función de nivel de módulo para el pool)
+
+    Returns:
+        tuple: (conteo de posiciones T x T, suma de puntos T, suma de diferencia de goles T)
+    """
+    (cdf, goals_a_lookup, goals_b_lookup, a_slot, b_slot,
+     base_points, base_goal_diff, n_sims, seed) = args
+
+    rng = np.random.default_rng(seed)
+    n_teams = len(base_points)
+
+    score_index = _sample_scores(cdf, n_sims, rng)
+    goals_a = goals_a_lookup[score_index]
+    goals_b = goals_b_lookup[score_index]
+
+    points_a = np.where(goals_a > goals_b, POINTS_BY_RESULT['W'],
+                        np.where(goals_a == goals_b, POINTS_BY_RESULT['T'], POINTS_BY_RESULT['L']))
+    points_b = np.where(goals_b > goals_a, POINTS_BY_RESULT['W'],
+                        np.where(goals_a == goals_b, POINTS_BY_RESULT['T'], POINTS_BY_RESULT['L']))
+    diff_a = (goals_a - goals_b).astype(np.float64)
+
+    # Matrices de incidencia partido -> equipo (los rivales no seguidos se ignoran)
+    incidence_a = np.zeros((len(a_slot), n_teams))
+    incidence_b = np.zeros((len(b_slot), n_teams))
+    tracked_a = a_slot >= 0
+    tracked_b = b_slot >= 0
+    incidence_a[np.flatnonzero(tracked_a), a_slot[tracked_a]] = 1.0
+    incidence_b[np.flatnonzero(tracked_b), b_slot[tracked_b]] = 1.0
+
+    points = base_points + points_a @ incidence_a + points_b @ incidence_b
+    goal_diff = base_goal_diff + diff_a @ incidence_a - diff_a @ incidence_b
+
+    # Orden: puntos, diferencia de goles y desempate aleatorio
+    sort_key = points * 1e6 + goal_diff * 1e2 + rng.random(points.shape)
+    order = np.argsort(-sort_key, axis=1)
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.arange(n_teams)[None, :], axis=1)
+
+    position_counts = np.bincount(
+        (np.arange(n_teams)[None, :] * n_teams + positions).ravel(),
+        minlength=n_teams * n_teams
+    ).reshape(n_teams, n_teams)
+
+    return position_counts, points.sum(axis=0), goal_diff.sum(axis=0)
+
+
+def simulate_season(model, remaining, teams, base_points=None, base_goal_diff=None,
+                    n_sims=100_000, seed=42, chunk_size=25_000, n_jobs=1):
+    """
+    Simula el resto de la temporada n_sims veces
+
+    Args:
+        model (PoissonGoalModel): Modelo de goles ajustado
+        remaining (pd.DataFrame): Partidos pendientes (team_a, team_b, a_home)
+        teams (list): Equipos de la clasificación
+        base_points (dict): Puntos actuales por equipo
+        base_goal_diff (dict): Diferencia de goles actual por equipo
+        n_sims (int): Número de simulaciones
+        seed (int): Semilla
+        chunk_size (int): Simulaciones por bloque (controla memoria)
+        n_jobs (int): Procesos en paralelo (1 = mismo proceso)
+
+    Returns:
+        pd.DataFrame: equipo, puntos_actuales, puntos_esperados,
+                      dif_goles_esperada, prob_1, ..., prob_T
+    """
+    teams = list(teams)
+    n_teams = len(teams)
+    base_points = np.array([(base_points or {}).get(t, 0) for t in teams], dtype=np.float64)
+    base_goal_diff = np.array([(base_goal_diff or {}).get(t, 0) for t in teams], dtype=np.float64)
+
+    lam, mu = model.expected_goals(remaining['team_a'], remaining['team_b'], remaining['a_home'])
+    matrix = model.score_matrix(lam, mu)
+    n_outcomes = matrix.shape[1] * matrix.shape[2]
+    cdf = np.cumsum(matrix.reshape(len(remaining), n_outcomes), axis=1)
+    cdf[:, -1] = 1.0
+
+    goals_a_lookup, goals_b_lookup = np.divmod(np.arange(n_outcomes), matrix.shape[2])
+
+    slot = pd.Index(teams)
+    a_slot = slot.get_indexer(remaining['team_a'])
+    b_slot = slot.get_indexer(remaining['team_b'])
+
+    # Bloques con semillas independientes (reproducible con o sin pool)
+    sizes = [min(chunk_size, n_sims - start) for start in range(0, n_sims, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [
+        (cdf, goals_a_lookup, goals_b_lookup, a_slot, b_slot,
+         base_points, base_goal_diff, size, chunk_seed)
+        for size, chunk_seed in zip(sizes, seeds)
+    ]
+
+    if n_jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            results = list(executor.map(_simulate_chunk, tasks))
+    else:
+        results = [_simulate_chunk(task) for task in tasks]
+
+    position_counts = sum(r[0] for r in results)
+    points_sum = sum(r[1] for r in results)
+    goal_diff_sum = sum(r[2] for r in results)
+
+    table = pd.DataFrame({
+        'equipo': teams,
+        'puntos_actuales': base_points,
+        'puntos_esperados': points_sum / n_sims,
+        'dif_goles_esperada': goal_diff_sum / n_sims,
+    })
+    for position in range(n_teams):
+        table[f'prob_{position + 1}'] = position_counts[:, position] / n_sims
+
+    return table.sort_values('puntos_esperados', ascending=False).reset_index(drop=True)
+
+
+def project_season(df, season=None, cutoff=None, n_sims=100_000, seed=42,
+                   dixon_coles=True, n_jobs=1):
+    """
+    Proyecta una temporada desde una fecha de corte con el calendario real
+
+    Los partidos hasta la fecha de corte se consideran jugados (tabla actual
+    y ajuste del modelo) y los posteriores se simulan.
+
+    Args:
+        df (pd.DataFrame): DataFrame de partidos (match store)
+        season (str): Temporada a proyectar (por defecto la más reciente)
+        cutoff (pd.Timestamp): Fecha de corte (por defecto la mitad de la temporada)
+        n_sims (int): Número de simulaciones
+        seed (int): Semilla
+        dixon_coles (bool): Corrección de marcadores bajos
+        n_jobs (int): Procesos en paralelo
+
+    Returns:
+        dict: standings (DataFrame), model (PoissonGoalModel), remaining
+              (DataFrame), cutoff (Timestamp), season (str)
+    """
+    games = unique_matches(df)
+    season = season or games['temporada'].max()
+    season_games = games[games['temporada'] == season]
+
+    if cutoff is None:
+        cutoff = season_games['fecha'].quantile(0.5)
+    cutoff = pd.Timestamp(cutoff)
+
+    played = season_games[season_games['fecha'] <= cutoff]
+    remaining = season_games[season_games['fecha'] > cutoff].reset_index(drop=True)
+
+    # El modelo solo ve partidos anteriores al corte (sin leakage)
+    model = PoissonGoalModel(dixon_coles=dixon_coles).fit(
+        games[games['fecha'] <= cutoff], reference_date=cutoff
+    )
+
+    teams = sorted(df.loc[df['temporada'] == season, 'equipo'].unique())
+
+    # Puntos y diferencia de goles actuales desde la perspectiva de cada equipo
+    points_a = np.select(
+        [played['goals_a'] > played['goals_b'], played['goals_a'] == played['goals_b']],
+        [POINTS_BY_RESULT['W'], POINTS_BY_RESULT['T']], POINTS_BY_RESULT['L']
+    )
+    points_b = np.select(
+        [played['goals_b'] > played['goals_a'], played['goals_a'] == played['goals_b']],
+        [POINTS_BY_RESULT['W'], POINTS_BY_RESULT['T']], POINTS_BY_RESULT['L']
+    )
+    diff = (played['goals_a'] - played['goals_b']).to_numpy()
+
+    base_points = (
+        pd.Series(points_a, index=played['team_a'].to_numpy()).groupby(level=0).sum()
+        .add(pd.Series(points_b, index=played['team_b'].to_numpy()).groupby(level=0).sum(), fill_value=0)
+    )
+    base_goal_diff = (
+        pd.Series(diff, index=played['team_a'].to_numpy()).groupby(level=0).sum()
+        .add(pd.Series(-diff, index=played['team_b'].to_numpy()).groupby(level=0).sum(), fill_value=0)
+    )
+
+    standings = simulate_season(
+        model, remaining, teams,
+        base_points=base_points.to_dict(), base_goal_diff=base_goal_diff.to_dict(),
+        n_sims=n_sims, seed=seed, n_jobs=n_jobs
+    )
+
+    return {
+        'standings': standings,
+        'model': model,
+        'remaining': remaining,
+        'cutoff': cutoff,
+        'season': season,
+    }
+
+
+# ============================================
+# TESTING
+# ============================================
+if __name__ == "__main__":
+    import time
+    from .match_store import load_match_store
+
+    print("Testing Season Simulator...")
+
+    matches = load_match_store()
+    if matches is None:
+        print("⚠️ No se encontró el CSV de partidos")
+    else:
+        start_time = time.perf_counter()
+        projection = project_season(matches, n_sims=100_000)
+        elapsed = time.perf_counter() - start_time
+
+        print(f"Temporada {projection['season']} - corte {projection['cutoff'].date()}")
+        print(f"Partidos pendientes: {len(projection['remaining'])} | rho = {projection['model'].rho:+.3f}")
+        print(projection['standings'].round(3).to_string())
+        print(f"\n✅ 100,000 simulaciones en {elapsed:.3f}s")
@@ -0,0 +1,266 @@
+"""
+============================================
+STREAMING STATS - MOMENTOS INCREMENTALES (WELFORD)
+============================================
+
+Estados de momentos (count, mean, M2) por grupo para las métricas de
+consistencia: varianza de goles, coeficiente de variación y volatilidad de
+resultados (desviación de los puntos por partido).
+
+Los estados se guardan al nivel más fino (equipo, temporada, mes) y se
+combinan con la fórmula de Chan et al. (Welford en paralelo):
+
+    n = n_a + n_b
+    mean = mean_a + delta * n_b / n
+    M2 = M2_a + M2_b + delta² * n_a * n_b / n
+
+de modo que cualquier selección (equipo, equipo-temporada, ...) se sirve
+agregando estados pequeños, los estados de particiones procesadas en
+paralelo se pueden fusionar y los partidos nuevos se incorporan sin
+recorrer el histórico.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .match_store import oriented_goals, result_points
+
+# Variables con momentos y su etiqueta para la UI
+MOMENT_VARIABLES = {
+    'goals_for': 'Goles a Favor',
+    'goals_against': 'Goles en Contra',
+    'points': 'Puntos por Partido',
+}
+
+# Granularidad por defecto de los estados
+DEFAULT_GROUP_COLS = ('equipo', 'temporada', 'mes')
+
+
+def _observations(df):
+    """Valores por partido de cada variable de MOMENT_VARIABLES"""
+    goals_for, goals_against = oriented_goals(df)
+    return {
+        'goals_for': goals_for.astype(np.float64),
+        'goals_against': goals_against.astype(np.float64),
+        'points': result_points(df).astype(np.float64),
+    }
+
+
+def _combine(state, group_cols):
+    """
+    Combina filas de estados que comparten grupo (fórmula de Chan et al.)
+
+    Args:
+        state (pd.DataFrame): Estados con columnas group_cols + {var}_n/_mean/_m2
+        group_cols (list): Columnas del grupo resultante
+
+    Returns:
+        pd.DataFrame: Un estado por grupo
+    """
+    combined = state[group_cols].drop_duplicates().sort_values(group_cols).reset_index(drop=True)
+    codes = state.groupby(group_cols, sort=True).ngroup().to_numpy()
+    n_groups = len(combined)
+
+    for var in MOMENT_VARIABLES:
+        count = state[f'{var}_n'].to_numpy(dtype=np.float64)
+        mean = state[f'{var}_mean'].to_numpy(dtype=np.float64)
+        m2 = state[f'{var}_m2'].to_numpy(dtype=np.float64)
+
+        total = np.bincount(codes, weights=count, minlength=n_groups)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            group_mean = np.bincount(codes, weights=count * mean, minlength=n_groups) / total
+        group_mean = np.where(total > 0, group_mean, 0.0)
+
+        # M2 total = Σ M2_i + Σ n_i (mean_i - mean)²  (equivalente a fusionar de dos en dos)
+        spread = count * (mean - group_mean[codes]) ** 2
+        group_m2 = np.bincount(codes, weights=m2 + spread, minlength=n_groups)
+
+        combined[f'{var}_n'] = total.astype(np.int64)
+        combined[f'{var}_mean'] = group_mean
+        combined[f'{var}_m2'] = group_m2
+
+    return combined
+
+
+class StreamingMoments:
+    """
+    Momentos mergeables por grupo (count, mean, M2)
+
+    Attributes:
+        group_cols (list): Columnas que definen cada grupo
+        state (pd.DataFrame): Un estado por grupo
+    """
+
+    def __init__(self, group_cols=DEFAULT_GROUP_COLS):
+        """
+        Args:
+            group_cols (tuple): Columnas que definen cada grupo
+        """
+        self.group_cols = list(group_cols)
+        columns = self.group_cols + [
+            f'{var}_{stat}' for var in MOMENT_VARIABLES for stat in ('n', 'mean', 'm2')
+        ]
+        self.state = pd.DataFrame(columns=columns)
+
+    @classmethod
+    def from_frame(cls, df, group_cols=DEFAULT_GROUP_COLS):
+        """
+        Construye los estados a partir de un DataFrame de partidos
+
+        Args:
+            df (pd.DataFrame): DataFrame de partidos (o un lote nuevo)
+            group_cols (tuple): Columnas que definen cada grupo
+
+        Returns:
+            StreamingMoments: Estados del DataFrame
+        """
+        moments = cls(group_cols)
+        if len(df) == 0:
+            return moments
+
+        values = pd.DataFrame(_observations(df), index=df.index)
+        values[moments.group_cols] = df[moments.group_cols]
+        grouped = values.groupby(moments.group_cols, sort=True)
+
+        state = grouped.size().rename('_size').reset_index()[moments.group_cols]
+        for var in MOMENT_VARIABLES:
+            count = grouped[var].count().to_numpy()
+            state[f'{var}_n'] = count
+            state[f'{var}_mean'] = grouped[var].mean().to_numpy()
+            state[f'{var}_m2'] = grouped[var].var(ddof=0).to_numpy() * count
+
+        moments.state = state
+        return moments
+
+    def merge(self, other):
+        """
+        Fusiona otro conjunto de estados (ej: de otra partición o worker)
+
+        Args:
+            other (StreamingMoments): Estados con los mismos group_cols
+
+        Returns:
+            StreamingMoments: Nuevo objeto con los estados combinados
+        """
+        if other.group_cols != self.group_cols:
+            raise ValueError("Los estados deben tener las mismas columnas de grupo")
+
+        merged = StreamingMoments(self.group_cols)
+        parts = [s for s in (self.state, other.state) if len(s) > 0]
+        if parts:
+            merged.state = _combine(pd.concat(parts, ignore_index=True), self.group_cols)
+        return merged
+
+    def update(self, new_matches):
+        """
+        Incorpora partidos nuevos sin recorrer el histórico
+
+        Args:
+            new_matches (pd.DataFrame): Lote de partidos nuevos (no vistos)
+
+        Returns:
+            StreamingMoments: self (actualizado)
+        """
+        updated = self.merge(StreamingMoments.from_frame(new_matches, self.group_cols))
+        self.state = updated.state
+        return self
+
+    def rollup(self, group_cols, filters=None):
+        """
+        Agrega los estados a una granularidad más gruesa
+
+        Args:
+            group_cols (list): Columnas del resultado (subconjunto de self.group_cols)
+            filters (dict): {columna: valores permitidos} aplicados antes de agregar
+
+        Returns:
+            StreamingMoments: Estados agregados
+        """
+        state = self.state
+        for column, allowed in (filters or {}).items():
+            state = state[state[column].isin(allowed)]
+
+        rolled = StreamingMoments(group_cols)
+        if len(state) > 0:
+            rolled.state = _combine(state, list(group_cols))
+        return rolled
+
+    def summary(self):
+        """
+        Métricas de consistencia a partir de los estados
+
+        Returns:
+            pd.DataFrame: group_cols + por variable {var}_n, {var}_mean,
+                          {var}_std (muestral) y {var}_cv (%)
+        """
+        summary = self.state[self.group_cols].copy()
+        for var in MOMENT_VARIABLES:
+            count = self.state[f'{var}_n'].to_numpy(dtype=np.float64)
+            mean = self.state[f'{var}_mean'].to_numpy(dtype=np.float64)
+            m2 = self.state[f'{var}_m2'].to_numpy(dtype=np.float64)
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                std = np.where(count > 1, np.sqrt(m2 / (count - 1)), np.nan)
+                cv = np.where(mean > 0, std / mean * 100, 0.0)
+
+            summary[f'{var}_n'] = count.astype(np.int64)
+            summary[f'{var}_mean'] = mean
+            summary[f'{var}_std'] = std
+            summary[f'{var}_cv'] = cv
+        return summary
+
+
+def partitioned_moments(df, group_cols=DEFAULT_GROUP_COLS, n_partitions=4, max_workers=4):
+    """
+    Construye los estados en particiones paralelas y los fusiona
+
+    Args:
+        df (pd.DataFrame): DataFrame de partidos
+        group_cols (tuple): Columnas que definen cada grupo
+        n_partitions (int): Número de particiones (por filas)
+        max_workers (int): Workers en paralelo
+
+    Returns:
+        StreamingMoments: Estados de todo el DataFrame
+    """
+    bounds = np.linspace(0, len(df), n_partitions + 1, dtype=np.int64)
+    partitions = [df.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        states = list(executor.map(lambda part: StreamingMoments.from_frame(part, group_cols), partitions))
+
+    merged = StreamingMoments(group_cols)
+    for state in states:
+        merged = merged.merge(state)
+    return merged
+
+
+# ============================================
+# TESTING
+# ============================================
+if __name__ == "__main__":
+    from .match_store import load_match_store
+
+    print("Testing Streaming Moments...")
+
+    matches = load_match_store()
+    if matches is None:
+        print("⚠️ No se encontró el CSV de partidos")
+    else:
+        full = StreamingMoments.from_frame(matches)
+        parallel = partitioned_moments(matches, n_partitions=7)
+
+        incremental = StreamingMoments.from_frame(matches.iloc[:200])
+        incremental.update(matches.iloc[200:])
+
+        by_team = full.rollup(['equipo']).summary()
+        for other in (parallel, incremental):
+            diff = np.nanmax(np.abs(
+                other.rollup(['equipo']).summary()[['goals_for_std', 'points_std']].to_numpy()
+                - by_team[['goals_for_std', 'points_std']].to_numpy()
+            ))
+            print(f"✅ Diferencia máxima vs cálculo completo: {diff:.2e}")
+
+        print(by_team[['equipo', 'goals_for_mean', 'goals_for_std', 'goals_for_cv', 'points_std']].round(3))
@@ -0,0 +1,374 @@
+"""
+============================================
+STRUCTURED OUTPUT - RESPUESTAS JSON CON ESQUEMA
+============================================
+
+Capa para pedir respuestas JSON al modelo y no tirar respuestas casi
+correctas:
+
+1. JSON mode (response_format json_object) en los modelos que lo admiten
+2. Validación contra un esquema declarado (subconjunto de JSON Schema:
+   type, properties, required, items, minItems, minLength)
+3. Reparación local barata del texto (fences, texto alrededor, comillas
+   tipográficas, comas finales, literales de Python, JSON cortado)
+4. Si aún falla, un prompt corto de reparación que pide solo las claves
+   con errores y las combina con la parte válida
+"""
+
+import json
+import re
+
+# Prefijos de modelos con JSON mode (response_format={"type": "json_object"})
+JSON_MODE_MODELS = (
+    'gpt-4o', 'gpt-4.1', 'gpt-4-turbo', 'gpt-4-1106', 'gpt-4-0125', 'gpt-3.5-turbo',
+)
+
+# Caracteres de la respuesta original que se incluyen en el prompt de reparación
+REPAIR_MAX_CHARS = 1500
+
+# Tipos de JSON Schema -> tipos de Python
+_SCHEMA_TYPES = {
+    'object': dict,
+    'array': list,
+    'string': str,
+    'number': (int, float),
+    'integer': int,
+    'boolean': bool,
+}
+
+
+class StructuredOutputError(ValueError):
+    """
+    La respuesta no cumple el esquema ni tras la reparación
+
+    Attributes:
+        errors (list): Errores de validación
+        raw (str): Última respuesta recibida
+    """
+
+    def __init__(self, errors, raw):
+        super().__init__("; ".join(errors[:5]))
+        self.errors = errors
+        self.raw = raw
+
+
+def supports_json_mode(model):
+    """True si el modelo admite response_format json_object"""
+    return bool(model) and model.startswith(JSON_MODE_MODELS)
+
+
+# ============================================
+# VALIDACIÓN
+# ============================================
+
+def validate(value, schema, path='$'):
+    """
+    Valida un valor contra el esquema
+
+    Args:
+        value: Valor ya parseado
+        schema (dict): Esquema (type, properties, required, items, minItems, minLength)
+        path (str): Ruta del valor en los mensajes de error
+
+    Returns:
+        list: Errores ('$.clave: motivo'); vacía si es válido
+    """
+    expected = schema.get('type')
+    if expected:
+        python_type = _SCHEMA_TYPES[expected]
+        if not isinstance(value, python_type) or (expected in ('number', 'integer') and isinstance(value, bool)):
+            return [f"{path}: se esperaba {expected}"]
+
+    errors = []
+    if expected == 'object':
+        for key in schema.get('required', []):
+            if key not in value:
+                errors.append(f"{path}.{key}: falta")
+        for key, subschema in schema.get('properties', {}).items():
+            if key in value:
+                errors.extend(validate(value[key], subschema, f"{path}.{key}"))
+
+    elif expected == 'array':
+        if len(value) < schema.get('minItems', 0):
+            errors.append(f"{path}: mínimo {schema['minItems']} elementos")
+        if 'items' in schema:
+            for i, item in enumerate(value):
+                errors.extend(validate(item, schema['items'], f"{path}[{i}]"))
+
+    elif expected == 'string':
+        if len(value.strip()) < schema.get('minLength', 0):
+            errors.append(f"{path}: texto vacío")
+
+    return errors
+
+
+def failed_keys(errors):
+    """Claves de primer nivel con errores ('$.clave...' -> 'clave')"""
+    keys = []
+    for error in errors:
+        match = re.match(r"\$\.([^.\[:]+)", error)
+        if match and match.group(1) not in keys:
+            keys.append(match.group(1))
+    return keys
+
+
+def schema_example(schema):
+    """Ejemplo compacto de la forma del esquema (para los prompts)"""
+    expected = schema.get('type')
+    if expected == 'object':
+        return {key: schema_example(sub) for key, sub in schema.get('properties', {}).items()}
+    if expected == 'array':
+        return [schema_example(schema.get('items', {})), "..."]
+    if expected in ('number', 'integer'):
+        return 0
+    if expected == 'boolean':
+        return True
+    return "texto"
+
+
+def subschema(schema, keys):
+    """Esquema de objeto restringido a unas claves"""
+    properties = schema.get('properties', {})
+    return {
+        'type': 'object',
+        'properties': {key: properties[key] for key in keys if key in properties},
+        'required': [key for key in schema.get('required', []) if key in keys],
+    }
+
+
+# ============================================
+# PARSEO Y REPARACIÓN LOCAL
+# ============================================
+
+def extract_json(text):
+    """
+    Fragmento JSON de una respuesta (sin fences ni texto alrededor)
+
+    Args:
+        text (str): Respuesta del modelo
+
+    Returns:
+        str: Desde el primer '{' o '[' hasta su último cierre (o hasta el final si está cortado)
+    """
+    fenced = re.search(r"```(?:json)?\s*(.*?)(?:```|$)", text, re.DOTALL)
+    if fenced:
+        text = fenced.group(1)
+
+    starts = [i for i in (text.find('{'), text.find('[')) if i >= 0]
+    if not starts:
+        return text.strip()
+    start = min(starts)
+    end = text.rfind('}' if text[start] == '{' else ']')
+    return text[start:end + 1] if end > start else text[start:]
+
+
+def _close_brackets(text):
+    """Cierra comillas, llaves y corchetes abiertos (JSON cortado por max_tokens)"""
+    stack = []
+    in_string = escape = False
+    for char in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif char == '\\':
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '{[':
+            stack.append('}' if char == '{' else ']')
+        elif char in '}]' and stack:
+            stack.pop()
+
+    if in_string:
+        text += '"'
+    text = re.sub(r"[,:]\s*$", "", text.rstrip())
+    return text + ''.join(reversed(stack))
+
+
+def _local_fixes(text):
+    """Reparaciones en orden de menor a mayor riesgo"""
+    yield text
+    text = text.replace('“', '"').replace('”', '"').replace('’', "'")
+    yield text
+    text = re.sub(r",\s*([}\]])", r"\1", text)
+    yield text
+    text = re.sub(r"\bTrue\b", "true", re.sub(r"\bFalse\b", "false", re.sub(r"\bNone\b", "null", text)))
+    yield text
+    if '"' not in text:
+        text = re.sub(r"'([^'\\]*)'", r'"\1"', text)
+        yield text
+    yield re.sub(r",\s*([}\]])", r"\1", _close_brackets(text))
+
+
+def repair_json(text):
+    """
+    Parsea una respuesta JSON aplicando reparaciones locales si hace falta
+
+    Args:
+        text (str): Respuesta del modelo
+
+    Returns:
+        tuple: (valor, reparado) -- reparado es True si hizo falta alguna corrección
+
+    Raises:
+        ValueError: Si ninguna reparación produce JSON válido
+    """
+    candidate = extract_json(text)
+    for i, fixed in enumerate(_local_fixes(candidate)):
+        try:
+            return json.loads(fixed), (i > 0 or candidate != text.strip())
+        except ValueError:
+            continue
+    raise ValueError("JSON no válido ni tras la reparación local")
+
+
+def parse_structured(text, schema):
+    """
+    Parsea (con reparación local) y valida una respuesta
+
+    Args:
+        text (str): Respuesta del modelo
+        schema (dict): Esquema esperado
+
+    Returns:
+        tuple: (valor o None, lista de errores)
+    """
+    try:
+        value, _ = repair_json(text)
+    except ValueError as e:
+        return None, [f"$: {e}"]
+    return value, validate(value, schema)
+
+
+# ============================================
+# PETICIONES CON REPARACIÓN
+# ============================================
+
+def repair_messages(raw, errors, schema, keys=None):
+    """
+    Prompt corto de reparación (sin los datos originales)
+
+    Args:
+        raw (str): Respuesta con errores
+        errors (list): Errores de validación
+        schema (dict): Esquema esperado
+        keys (list): Claves a devolver (None = objeto completo)
+
+    Returns:
+        list: Mensajes
+    """
+    target = subschema(schema, keys) if keys else schema
+    what = f"solo las claves {', '.join(keys)}" if keys else "el objeto completo"
+    prompt = (
+        "Esta respuesta JSON no cumple el formato pedido.\n"
+        "Errores:\n" + "\n".join(f"- {e}" for e in errors[:10]) + "\n\n"
+        f"Respuesta recibida:\n{raw[:REPAIR_MAX_CHARS]}\n\n"
+        f"Devuelve un objeto JSON con {what}, corregido y con esta forma:\n"
+        f"{json.dumps(schema_example(target), ensure_ascii=False)}\n"
+        "RESPONDE SOLO CON EL JSON VÁLIDO, SIN MARKDOWN NI TEXTO ADICIONAL."
+    )
+    return [
+        {"role": "system", "content": "Corriges respuestas JSON. Respondes SOLO en formato JSON válido, sin markdown."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def plan_repair(value, raw, errors, schema):
+    """
+    Petición de reparación: solo las claves con errores si el resto es válido
+
+    Returns:
+        tuple: (mensajes, claves pedidas o None si se pide el objeto completo)
+    """
+    keys = failed_keys(errors) if isinstance(value, dict) and schema.get('type') == 'object' else []
+    if keys and len(keys) < len(schema.get('properties', {})):
+        return repair_messages(raw, errors, schema, keys), keys
+    return repair_messages(raw, errors, schema), None
+
+
+def merge_repair(value, keys, repaired_text, schema):
+    """
+    Combina la parte válida con la respuesta de reparación
+
+    Returns:
+        tuple: (valor, errores)
+    """
+    target = subschema(schema, keys) if keys else schema
+    repaired, errors = parse_structured(repaired_text, target)
+    if errors:
+        return repaired, errors
+    if keys:
+        repaired = {**value, **{key: repaired[key] for key in keys if key in repaired}}
+    return repaired, validate(repaired, schema)
+
+
+def structured_completion(client, messages, schema, model=None, temperature=0.7, max_tokens=1000,
+                          use_cache=True, repair=True):
+    """
+    Respuesta JSON validada (JSON mode + reparación local + prompt de reparación)
+
+    Args:
+        client (LLMClient): Cliente IA
+        messages (list): Mensajes (deben pedir JSON)
+        schema (dict): Esquema esperado
+        model (str): Modelo (por defecto el del cliente)
+        temperature (float): Temperatura
+        max_tokens (int): Máximo de tokens
+        use_cache (bool): False para ignorar la caché
+        repair (bool): Permitir el prompt de reparación
+
+    Returns:
+        Valor parseado y válido
+
+    Raises:
+        StructuredOutputError: Si no cumple el esquema tras la reparación
+    """
+    model = model or client.model
+    response_format = {"type": "json_object"} if supports_json_mode(model) else None
+
+    raw = client.complete(messages, model=model, temperature=temperature, max_tokens=max_tokens,
+                          use_cache=use_cache, response_format=response_format)
+    value, errors = parse_structured(raw, schema)
+    if not errors:
+        return value
+    if not repair:
+        raise StructuredOutputError(errors, raw)
+
+    print(f"🔧 Respuesta JSON con errores ({len(errors)}): pidiendo reparación")
+    fix_messages, keys = plan_repair(value, raw, errors, schema)
+    repaired_text = client.complete(fix_messages, model=model, temperature=0, max_tokens=max_tokens,
+                                    use_cache=use_cache, response_format=response_format)
+    value, errors = merge_repair(value, keys, repaired_text, schema)
+    if errors:
+        raise StructuredOutputError(errors, repaired_text)
+    return value
+
+
+# ============================================
+# TESTING
+# ============================================
+if __name__ == "__main__":
+    print("Testing Structured Output...")
+
+    schema = {
+        'type': 'object',
+        'required': ['fortalezas', 'debilidades'],
+        'properties': {
+            'fortalezas': {'type': 'array', 'minItems': 1, 'items': {'type': 'string', 'minLength': 1}},
+            'debilidades': {'type': 'array', 'minItems': 1, 'items': {'type': 'string', 'minLength': 1}},
+        }
+    }
+
+    samples = [
+        '```json\n{"fortalezas": ["Defensa"], "debilidades": ["Ataque"]}\n```',
+        'Aquí tienes: {"fortalezas": [“Defensa”,], "debilidades": ["Ataque"],}',
+        '{"fortalezas": ["Defensa", "Presión"], "debilidades": ["Ata',
+        "{'fortalezas': ['Defensa'], 'debilidades': []}",
+    ]
+    for sample in samples:
+        value, errors = parse_structured(sample, schema)
+        print(f"{'✅' if not errors else '⚠️'} {value} {errors}")
+        if errors:
+            print(f"   Reparar solo: {plan_repair(value, sample, errors, schema)[1]}")
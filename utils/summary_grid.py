@@ -0,0 +1,151 @@
+"""
+============================================
+SUMMARY GRID - RESUMEN RÁPIDO MULTI-EQUIPO
+============================================
+
+Tabla resumen vectorizada por equipo (un único groupby) y renderizado de
+las tarjetas del Resumen Rápido como una sola cuadrícula HTML paginada.
+El número de elementos de Streamlit no crece con el número de equipos.
+"""
+
+import html
+
+import numpy as np
+import pandas as pd
+
+# Opciones de orden: etiqueta -> (columna, ascendente)
+SUMMARY_SORT_OPTIONS = {
+    'Win %': ('win_pct', False),
+    'Victorias': ('victorias', False),
+    'Partidos': ('partidos', False),
+    'Academic Rank': ('academic_rank', True),
+    'Equipo (A-Z)': ('equipo', True),
+}
+
+
+def team_summary_table(df):
+    """
+    Resumen por equipo en una sola pasada
+
+    Args:
+        df (pd.DataFrame): DataFrame de partidos (ya filtrado)
+
+    Returns:
+        pd.DataFrame: equipo, partidos, victorias, derrotas, empates,
+                      win_pct, academic_rank
+    """
+    result = df['resultado_code']
+    summary = pd.DataFrame({
+        'equipo': df['equipo'],
+        'victorias': (result == 'W').astype(np.int64),
+        'derrotas': (result == 'L').astype(np.int64),
+        'empates': (result == 'T').astype(np.int64),
+        'academic_rank': df['team_academic_rank'],
+    }).groupby('equipo', sort=True).agg(
+        partidos=('victorias', 'size'),
+        victorias=('victorias', 'sum'),
+        derrotas=('derrotas', 'sum'),
+        empates=('empates', 'sum'),
+        academic_rank=('academic_rank', 'first'),
+    ).reset_index()
+
+    summary['win_pct'] = np.where(
+        summary['partidos'] > 0, summary['victorias'] / summary['partidos'] * 100, 0.0
+    )
+    summary['academic_rank'] = summary['academic_rank'].astype(np.int64)
+    return summary[['equipo', 'partidos', 'victorias', 'derrotas', 'empates', 'win_pct', 'academic_rank']]
+
+
+def sort_summary(summary, sort_label, top_k=None):
+    """
+    Ordena el resumen y se queda con los K primeros
+
+    Args:
+        summary (pd.DataFrame): Resultado de team_summary_table
+        sort_label (str): Clave de SUMMARY_SORT_OPTIONS
+        top_k (int): Número de equipos a conservar (None = todos)
+
+    Returns:
+        pd.DataFrame: Resumen ordenado
+    """
+    column, ascending = SUMMARY_SORT_OPTIONS[sort_label]
+    ordered = summary.sort_values([column, 'equipo'], ascending=[ascending, True], kind='mergesort')
+    if top_k:
+        ordered = ordered.head(top_k)
+    return ordered.reset_index(drop=True)
+
+
+def paginate(table, page, page_size):
+    """
+    Página de una tabla
+
+    Args:
+        table (pd.DataFrame): Tabla completa
+        page (int): Página (empezando en 1)
+        page_size (int): Filas por página
+
+    Returns:
+        tuple: (página de la tabla, número total de páginas)
+    """
+    n_pages = max(1, int(np.ceil(len(table) / page_size)))
+    page = min(max(1, page), n_pages)
+    start = (page - 1) * page_size
+    return table.iloc[start:start + page_size], n_pages
+
+
+def render_summary_grid(summary, color_fn, columns=4):
+    """
+    HTML de la cuadrícula de tarjetas (un único componente)
+
+    Args:
+        summary (pd.DataFrame): Filas a mostrar (resultado de team_summary_table)
+        color_fn (callable): rank -> (color_fondo, color_texto) de la banda académica
+        columns (int): Tarjetas por fila
+
+    Returns:
+        str: HTML listo para st.markdown(..., unsafe_allow_html=True)
+    """
+    band_colors = {rank: color_fn(rank) for rank in summary['academic_rank'].unique()}
+
+    cards = []
+    for row in summary.itertuples(index=False):
+        bg_color, text_color = band_colors[row.academic_rank]
+        cards.append(f"""
+            <div style='padding: 16px; border-radius: 10px; border: 2px solid #e0e0e0; background-color: #f8f9fa;'>
+                <h4 style='margin: 0 0 10px 0; color: #1f77b4;'>{html.escape(str(row.equipo))}</h4>
+                <div style='display: grid; grid-template-columns: 1fr 1fr; gap: 6px; font-size: 0.9em;'>
+                    <div>Partidos<br><b style='font-size: 1.4em;'>{row.partidos}</b></div>
+                    <div>Victorias<br><b style='font-size: 1.4em;'>{row.victorias}</b>
+                        <span style='color: #155724;'>({row.win_pct:.1f}%)</span></div>
+                    <div>Derrotas<br><b style='font-size: 1.4em;'>{row.derrotas}</b></div>
+                    <div>Empates<br><b style='font-size: 1.4em;'>{row.empates}</b></div>
+                </div>
+                <div style='padding: 8px; border-radius: 5px; background-color: {bg_color}; color: {text_color};
+                            text-align: center; font-weight: bold; margin-top: 10px;'>
+                    🎓 Academic Rank: #{row.academic_rank}
+                </div>
+            </div>""")
+
+    return (
+        f"<div style='display: grid; grid-template-columns: repeat({columns}, minmax(0, 1fr)); "
+        f"gap: 12px; margin-bottom: 10px;'>{''.join(cards)}</div>"
+    )
+
+
+# ============================================
+# TESTING
+# ============================================
+if __name__ == "__main__":
+    from .match_store import load_match_store
+
+    print("Testing Summary Grid...")
+
+    matches = load_match_store()
+    if matches is None:
+        print("⚠️ No se encontró el CSV de partidos")
+    else:
+        summary = sort_summary(team_summary_table(matches), 'Win %')
+        print(summary)
+        page, n_pages = paginate(summary, 1, 2)
+        grid = render_summary_grid(page, lambda rank: ("#ffffff", "#000000"))
+        print(f"\n✅ {len(page)} tarjetas en 1 componente ({n_pages} páginas, {len(grid):,} caracteres)")
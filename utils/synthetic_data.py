@@ -0,0 +1,454 @@
+"""
+============================================
+DATOS SINTÉTICOS - PRUEBAS DE ESCALA
+============================================
+
+Generador reproducible (con semilla) de datos de partidos con el mismo
+esquema que data/multi_team_data_complete.csv, más los formatos crudos que
+consumen los parsers del proyecto:
+
+1. Partidos (CSV multi-equipo): equipos, temporadas, partidos por temporada
+   y proporción local/visitante configurables; goles de Poisson con
+   ataque/defensa por equipo y ventaja local
+2. Texto del documento de equipos (formato de process_team_data)
+3. HTML de calendario y de box score (formato de Scraper3C2A)
+
+Todo el CSV se genera con operaciones de arrays, así que escala a
+millones de filas:
+
+    python -m utils.synthetic_data --teams 200 --seasons 10 --games 30 --out outputs/synthetic
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Carpeta de salida por defecto (fuera de data/, ignorada por git)
+SYNTHETIC_OUTPUT_DIR = Path(__file__).parent.parent / "outputs" / "synthetic"
+
+# Columnas del CSV multi-equipo (mismo orden que el archivo real)
+MATCH_COLUMNS = [
+    'equipo', 'temporada', 'day', 'local_code', 'oponente', 'resultado_code', 'score',
+    'goals_for', 'goals_against', 'mes', 'mes_num', 'team_academic_rank',
+    'home_advantage', 'opponent_quality', 'local_visitante'
+]
+
+# Meses de la temporada de soccer y su peso en el calendario
+SEASON_MONTHS = {8: 'August', 9: 'September', 10: 'October', 11: 'November', 12: 'December'}
+MONTH_WEIGHTS = [0.12, 0.30, 0.30, 0.22, 0.06]
+
+# Nombres de mes en español (encabezados del documento de equipos)
+SPANISH_MONTHS = {
+    'August': 'Agosto', 'September': 'Septiembre', 'October': 'Octubre',
+    'November': 'Noviembre', 'December': 'Diciembre'
+}
+
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+# Piezas de nombres de equipos (solo letras: el parser de texto usa [A-Z\s]+)
+_NAME_PREFIXES = [
+    'Alder', 'Bay', 'Cedar', 'Coast', 'Desert', 'Eagle', 'Elm', 'Falcon', 'Glen', 'Granite',
+    'Harbor', 'Hawk', 'Iron', 'Lake', 'Lincoln', 'Maple', 'Mesa', 'Mission', 'Oak', 'Ocean',
+    'Orchard', 'Palm', 'Pine', 'Ridge', 'River', 'Rock', 'Sage', 'Sierra', 'Stone', 'Summit',
+]
+_NAME_SUFFIXES = [
+    'Valley', 'Hills', 'Canyon', 'Springs', 'Park', 'Point', 'Grove', 'Heights', 'Creek', 'Vista',
+    'Bluff', 'Meadow', 'Harbor', 'Shore', 'Crest', 'Field', 'Brook', 'Ranch', 'Falls', 'Port',
+]
+_NAME_QUALIFIERS = ['', 'North', 'South', 'East', 'West', 'Central', 'Upper', 'Lower']
+
+
+def team_names(n_teams):
+    """
+    Nombres de equipo únicos y deterministas
+
+    Args:
+        n_teams (int): Número de equipos (hasta 4.800)
+
+    Returns:
+        list: Nombres
+    """
+    names = [
+        f"{prefix} {suffix}" + (f" {qualifier}" if qualifier else "")
+        for qualifier in _NAME_QUALIFIERS
+        for suffix in _NAME_SUFFIXES
+        for prefix in _NAME_PREFIXES
+    ]
+    if n_teams > len(names):
+        raise ValueError(f"Máximo {len(names)} equipos sintéticos")
+    return names[:n_teams]
+
+
+# ============================================
+# PARTIDOS (CSV MULTI-EQUIPO)
+# ============================================
+
+def generate_matches(n_teams=40, n_seasons=5, games_per_season=20, home_share=0.5,
+                     both_sides=True, first_season=2021, base_goals=1.35, home_boost=0.15,
+                     strength_spread=0.25, seed=42):
+    """
+    Genera partidos sintéticos con el esquema del CSV multi-equipo
+
+    Con both_sides cada partido aparece dos veces (una por equipo), igual
+    que en el CSV real cuando ambos equipos están seguidos; sin él solo se
+    guarda la perspectiva del equipo listado, como con los rivales no
+    seguidos. El marcador se escribe con el ganador primero ("3-0" en una
+    derrota significa 0-3).
+
+    Args:
+        n_teams (int): Número de equipos
+        n_seasons (int): Número de temporadas
+        games_per_season (int): Partidos por equipo y temporada (promedio)
+        home_share (float): Proporción de partidos en casa del equipo listado
+        both_sides (bool): Incluir también la fila del rival
+        first_season (int): Año inicial de la primera temporada
+        base_goals (float): Goles esperados de un equipo medio como visitante
+        home_boost (float): Ventaja local (log de goles)
+        strength_spread (float): Desviación del ataque/defensa por equipo
+        seed (int): Semilla
+
+    Returns:
+        pd.DataFrame: Partidos con MATCH_COLUMNS
+    """
+    rng = np.random.default_rng(seed)
+    names = np.array(team_names(n_teams), dtype=object)
+    academic_rank = rng.integers(1, 121, size=n_teams)
+
+    games_per_season_total = n_teams * games_per_season // 2
+    n_games = games_per_season_total * n_seasons
+
+    season_idx = np.repeat(np.arange(n_seasons), games_per_season_total)
+    team_a = rng.integers(0, n_teams, size=n_games)
+    team_b = (team_a + rng.integers(1, n_teams, size=n_games)) % n_teams
+    a_home = rng.random(n_games) < home_share
+
+    # Fuerza por equipo y temporada (deriva entre temporadas)
+    attack = rng.normal(0, strength_spread, size=(n_seasons, n_teams))
+    defense = rng.normal(0, strength_spread, size=(n_seasons, n_teams))
+    attack += np.cumsum(rng.normal(0, 0.05, size=(n_seasons, n_teams)), axis=0)
+
+    log_base = np.log(base_goals)
+    lam_a = np.exp(log_base + home_boost * a_home + attack[season_idx, team_a] - defense[season_idx, team_b])
+    lam_b = np.exp(log_base + home_boost * ~a_home + attack[season_idx, team_b] - defense[season_idx, team_a])
+    goals_a = rng.poisson(lam_a)
+    goals_b = rng.poisson(lam_b)
+
+    months = np.array(list(SEASON_MONTHS))
+    month = rng.choice(months, size=n_games, p=MONTH_WEIGHTS)
+    day = rng.integers(1, 29, size=n_games)
+
+    # Filas por perspectiva (A y, opcionalmente, B) en el orden del CSV
+    # real: equipo, temporada y fecha. Se ordenan los enteros y las
+    # columnas de texto se obtienen con tablas de búsqueda.
+    def rows(side_a, side_b):
+        return np.concatenate([side_a, side_b]) if both_sides else side_a
+
+    equipo = rows(team_a, team_b)
+    season_rows = rows(season_idx, season_idx)
+    month_rows = rows(month, month)
+    day_rows = rows(day, day)
+    order = np.lexsort((day_rows, month_rows, season_rows, equipo))
+
+    equipo, season_rows, month_rows, day_rows = (
+        equipo[order], season_rows[order], month_rows[order], day_rows[order]
+    )
+    oponente = rows(team_b, team_a)[order]
+    home = rows(a_home, ~a_home).astype(np.int64)[order]
+    goals_own = rows(goals_a, goals_b)[order]
+    goals_opp = rows(goals_b, goals_a)[order]
+
+    result = np.sign(goals_own - goals_opp) + 1  # 0 = L, 1 = T, 2 = W
+    high = np.maximum(goals_own, goals_opp)
+    low = np.minimum(goals_own, goals_opp)
+
+    max_goals = int(high.max()) + 1 if len(high) else 1
+    score_labels = np.array([f"{h}-{l}" for h in range(max_goals) for l in range(max_goals)], dtype=object)
+    season_labels = np.array([f"{first_season + s}-{first_season + s + 1}" for s in range(n_seasons)], dtype=object)
+    month_names = np.array([''] * 13, dtype=object)
+    for number, name in SEASON_MONTHS.items():
+        month_names[number] = name
+
+    # opponent_quality como en add_advanced_features (win% frente a cada oponente)
+    wins_against = np.bincount(oponente, weights=(result == 2), minlength=n_teams)
+    games_against = np.bincount(oponente, minlength=n_teams)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        quality = np.round(np.where(games_against > 0, wins_against / games_against, 0.0), 3)
+
+    df = pd.DataFrame({
+        'equipo': names[equipo],
+        'temporada': season_labels[season_rows],
+        'day': day_rows,
+        'local_code': np.array(['at', 'vs'], dtype=object)[home],
+        'oponente': names[oponente],
+        'resultado_code': np.array(['L', 'T', 'W'], dtype=object)[result],
+        'score': score_labels[high * max_goals + low],
+        'goals_for': high,
+        'goals_against': low,
+        'mes': month_names[month_rows],
+        'mes_num': month_rows,
+        'team_academic_rank': academic_rank[equipo],
+        'home_advantage': home,
+        'opponent_quality': quality[oponente],
+        'local_visitante': np.array(['Visitante', 'Local'], dtype=object)[home],
+    })
+    return df[MATCH_COLUMNS]
+
+
+def to_raw_matches(df):
+    """
+    Convierte al formato de extract_matches_from_text (entrada de add_advanced_features)
+
+    Args:
+        df (pd.DataFrame): Resultado de generate_matches
+
+    Returns:
+        pd.DataFrame: equipo, oponente, local_visitante, resultado, marcador,
+                      goles_favor, goles_contra, mes, temporada
+    """
+    return pd.DataFrame({
+        'equipo': df['equipo'],
+        'oponente': df['oponente'],
+        'local_visitante': df['local_visitante'],
+        'resultado': df['resultado_code'],
+        'marcador': df['score'],
+        'goles_favor': df['goals_for'],
+        'goles_contra': df['goals_against'],
+        'mes': df['mes'],
+        'temporada': df['temporada'],
+    })
+
+
+# ============================================
+# FORMATOS CRUDOS (TEXTO Y HTML)
+# ============================================
+
+def _weekday(df):
+    """Día de la semana abreviado de cada partido"""
+    year = df['temporada'].str.slice(0, 4).astype(int)
+    dates = pd.to_datetime(pd.DataFrame({'year': year, 'month': df['mes_num'], 'day': df['day']}))
+    return np.array(WEEKDAYS, dtype=object)[dates.dt.weekday.to_numpy()]
+
+
+def render_team_document_text(df):
+    """
+    Texto con el formato del documento de equipos (process_word_document)
+
+    Args:
+        df (pd.DataFrame): Resultado de generate_matches
+
+    Returns:
+        str: Texto con secciones "=== EQUIPO ===", "Temporada AAAA-AAAA",
+             encabezados de mes y líneas "Tue. 26 at Rival T, 0-0 Final"
+    """
+    lines = (
+        pd.Series(_weekday(df), index=df.index) + '. ' + df['day'].astype(str) + ' '
+        + df['local_code'] + ' ' + df['oponente'] + ' ' + df['resultado_code'] + ', '
+        + df['score'] + ' Final'
+    )
+
+    output = []
+    for team, team_df in df.groupby('equipo', sort=False):
+        output.append(f"=== {team.upper()} ===")
+        for season, season_df in team_df.groupby('temporada', sort=False):
+            output.append(f"Temporada {season}")
+            current_month = None
+            for month, line in zip(season_df['mes'], lines.loc[season_df.index]):
+                if month != current_month:
+                    output.append(SPANISH_MONTHS.get(month, month))
+                    current_month = month
+                output.append(line)
+    return "\n".join(output)
+
+
+def render_schedule_html(team_season_df, base_path="/sports/msoc/synthetic/boxscores"):
+    """
+    HTML de calendario con el formato que lee Scraper3C2A.get_irvine_matches
+
+    Args:
+        team_season_df (pd.DataFrame): Partidos de un equipo en una temporada
+        base_path (str): Ruta base de los enlaces a box score
+
+    Returns:
+        str: HTML del calendario
+    """
+    weekdays = _weekday(team_season_df)
+    sections = []
+    for month, month_df in team_season_df.groupby('mes', sort=False):
+        rows = []
+        for i, row in enumerate(month_df.itertuples(index=False)):
+            weekday = weekdays[team_season_df.index.get_loc(month_df.index[i])]
+            rows.append(
+                f"<tr><td><div class='nowrap'>{weekday}. {row.day}</div></td>"
+                f"<td>{row.local_code} <span class='team-name'>{row.oponente}</span></td>"
+                f"<td><span data-context='result'>{row.resultado_code}</span>, {row.score}</td>"
+                f"<td><a href='{base_path}/{row.temporada}-{row.mes_num:02d}{row.day:02d}'>Box Score</a></td></tr>"
+            )
+        sections.append(
+            f"<div><span class='month-title'>{month}</span><table><tbody>{''.join(rows)}</tbody></table></div>"
+        )
+    return f"<html><body>{''.join(sections)}</body></html>"
+
+
+def render_box_score_html(match, rng, roster_size=18):
+    """
+    HTML de box score con el formato que lee Scraper3C2A.get_box_score_data
+
+    Args:
+        match (dict or namedtuple): Fila de generate_matches (perspectiva de 'equipo')
+        rng (np.random.Generator): Generador aleatorio
+        roster_size (int): Jugadores por equipo
+
+    Returns:
+        str: HTML con rosters, Scoring Summary y Penalty Summary
+    """
+    team, opponent = match.equipo, match.oponente
+    if match.resultado_code == 'L':
+        goals = {team: match.goals_against, opponent: match.goals_for}
+    else:
+        goals = {team: match.goals_for, opponent: match.goals_against}
+
+    tables = []
+    scorers = {}
+    for side in (team, opponent):
+        players = [f"{side.split()[0][0]}. Player{n:02d}" for n in range(1, roster_size + 1)]
+        goal_counts = np.bincount(rng.integers(0, roster_size, size=goals[side]), minlength=roster_size)
+        shots = goal_counts + rng.poisson(0.6, size=roster_size)
+        on_goal = goal_counts + rng.binomial(shots - goal_counts, 0.4)
+        assists = np.bincount(rng.integers(0, roster_size, size=goals[side]), minlength=roster_size)
+        scorers[side] = [players[i] for i in np.repeat(np.arange(roster_size), goal_counts)]
+
+        rows = "".join(
+            f"<tr><th><a class='player-name'>{players[i]}</a></th>"
+            f"<td>{shots[i]}</td><td>{on_goal[i]}</td><td>{goal_counts[i]}</td><td>{assists[i]}</td></tr>"
+            for i in range(roster_size)
+        )
+        totals = (f"<tr class='totals'><th>Totals</th><td>{shots.sum()}</td><td>{on_goal.sum()}</td>"
+                  f"<td>{goal_counts.sum()}</td><td>{assists.sum()}</td></tr>")
+        tables.append(
+            f"<table class='table'><caption><span class='team-name'>{side}</span></caption>"
+            f"<tbody>{rows}{totals}</tbody></table>"
+        )
+
+    # Goles en orden temporal con marcador acumulado
+    events = [(side, scorer) for side in (team, opponent) for scorer in scorers[side]]
+    minutes = np.sort(rng.integers(1, 91, size=len(events)))
+    order = rng.permutation(len(events))
+    running = {team: 0, opponent: 0}
+    scoring_rows = []
+    for minute, idx in zip(minutes, order):
+        side, scorer = events[idx]
+        running[side] += 1
+        scoring_rows.append(
+            f"<tr><td><div class='team-logo'><span class='offscreen'>{side}</span></div></td>"
+            f"<td><span class='period'>{1 if minute <= 45 else 2}</span></td>"
+            f"<td class='time'>{minute:02d}:{rng.integers(0, 60):02d}</td>"
+            f"<td class='text'>Goal by {scorer}</td>"
+            f"<td class='total'>{running[team]}-{running[opponent]}</td></tr>"
+        )
+    tables.append(
+        f"<table class='table'><caption>Scoring Summary</caption><tbody>{''.join(scoring_rows)}</tbody></table>"
+    )
+
+    n_cards = rng.poisson(2.5)
+    penalty_rows = []
+    for minute in np.sort(rng.integers(1, 91, size=n_cards)):
+        side = team if rng.random() < 0.5 else opponent
+        card = 'Red card' if rng.random() < 0.05 else 'Yellow card'
+        penalty_rows.append(
+            f"<tr><td><div class='team-logo'><span class='offscreen'>{side}</span></div></td>"
+            f"<td><span class='period'>{1 if minute <= 45 else 2}</span></td>"
+            f"<td class='time'>{minute:02d}:00</td>"
+            f"<td class='text'>{card} - {side.split()[0][0]}. Player{rng.integers(1, roster_size + 1):02d}</td></tr>"
+        )
+    tables.append(
+        f"<table class='table'><caption>Penalty Summary</caption><tbody>{''.join(penalty_rows)}</tbody></table>"
+    )
+
+    return f"<html><body>{''.join(tables)}</body></html>"
+
+
+def write_dataset(output_dir, n_teams=40, n_seasons=5, games_per_season=20, home_share=0.5,
+                  both_sides=True, n_box_scores=50, seed=42):
+    """
+    Escribe un dataset sintético completo
+
+    Args:
+        output_dir (str or Path): Carpeta de salida
+        n_teams (int): Número de equipos
+        n_seasons (int): Número de temporadas
+        games_per_season (int): Partidos por equipo y temporada
+        home_share (float): Proporción de partidos en casa del equipo listado
+        both_sides (bool): Incluir también la fila del rival
+        n_box_scores (int): Box scores HTML a generar
+        seed (int): Semilla
+
+    Returns:
+        dict: Rutas escritas y número de filas
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    df = generate_matches(n_teams, n_seasons, games_per_season, home_share, both_sides, seed=seed)
+    csv_path = output_dir / "multi_team_data_synthetic.csv"
+    df.to_csv(csv_path, index=False)
+
+    text_path = output_dir / "team_document.txt"
+    text_path.write_text(render_team_document_text(df), encoding='utf-8')
+
+    first_team = df[(df['equipo'] == df['equipo'].iloc[0]) & (df['temporada'] == df['temporada'].iloc[0])]
+    schedule_path = output_dir / "schedule.html"
+    schedule_path.write_text(render_schedule_html(first_team), encoding='utf-8')
+
+    box_dir = output_dir / "box_scores"
+    box_dir.mkdir(exist_ok=True)
+    rng = np.random.default_rng(seed + 1)
+    sample = df.iloc[rng.choice(len(df), size=min(n_box_scores, len(df)), replace=False)]
+    for i, match in enumerate(sample.itertuples(index=False)):
+        (box_dir / f"box_score_{i:05d}.html").write_text(render_box_score_html(match, rng), encoding='utf-8')
+
+    return {
+        'csv': csv_path,
+        'text': text_path,
+        'schedule_html': schedule_path,
+        'box_scores': box_dir,
+        'rows': len(df),
+    }
+
+
+# ============================================
+# LÍNEA DE COMANDOS
+# ============================================
+
+def main(argv=None):
+    """Punto de entrada: python -m utils.synthetic_data"""
+    parser = argparse.ArgumentParser(description="Genera datos sintéticos de partidos para pruebas de escala")
+    parser.add_argument('--teams', type=int, default=40, help="Número de equipos")
+    parser.add_argument('--seasons', type=int, default=5, help="Número de temporadas")
+    parser.add_argument('--games', type=int, default=20, help="Partidos por equipo y temporada")
+    parser.add_argument('--home-share', type=float, default=0.5, help="Proporción de partidos en casa del equipo listado")
+    parser.add_argument('--one-side', action='store_true', help="Solo la fila del equipo listado por partido")
+    parser.add_argument('--box-scores', type=int, default=50, help="Box scores HTML a generar")
+    parser.add_argument('--seed', type=int, default=42, help="Semilla")
+    parser.add_argument('--out', default=str(SYNTHETIC_OUTPUT_DIR), help="Carpeta de salida")
+    args = parser.parse_args(argv)
+
+    start_time = time.perf_counter()
+    written = write_dataset(
+        args.out, args.teams, args.seasons, args.games, args.home_share,
+        not args.one_side, args.box_scores, args.seed
+    )
+    elapsed = time.perf_counter() - start_time
+
+    print(f"✅ {written['rows']:,} filas en {written['csv']}")
+    print(f"✅ Documento de texto: {written['text']}")
+    print(f"✅ Calendario HTML: {written['schedule_html']}")
+    print(f"✅ Box scores HTML: {written['box_scores']}")
+    print(f"⏱️ {elapsed:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,101 @@
+"""
+============================================
+TENDENCIAS - FORMA RECIENTE (ROLLING)
+============================================
+
+Métricas de forma reciente por equipo calculadas con ventanas móviles
+agrupadas: win rate, diferencia de goles y puntos por partido en los
+últimos N partidos. Se calculan para todos los equipos en una sola pasada.
+"""
+
+import pandas as pd
+
+from .match_store import chronological_sort, oriented_goals, result_points
+
+# Columnas de salida y su etiqueta para la UI
+ROLLING_METRICS = {
+    'rolling_win_pct': 'Win % (últimos N)',
+    'rolling_goal_diff': 'Diferencia de Goles (últimos N)',
+    'rolling_ppg': 'Puntos por Partido (últimos N)',
+}
+
+
+def compute_rolling_form(df, window=5, min_periods=1, reset_each_season=False):
+    """
+    Calcula la forma reciente (rolling) de todos los equipos a la vez
+
+    Args:
+        df (pd.DataFrame): DataFrame de partidos (match store)
+        window (int): Número de partidos de la ventana
+        min_periods (int): Partidos mínimos para emitir un valor
+        reset_each_season (bool): Si True la ventana se reinicia en cada temporada
+
+    Returns:
+        pd.DataFrame: Un registro por partido con columnas equipo, temporada,
+                      mes, mes_num, day, oponente, partido_num y las métricas
+                      de ROLLING_METRICS
+    """
+    ordered = chronological_sort(df)
+    goals_for, goals_against = oriented_goals(ordered)
+
+    base = pd.DataFrame({
+        'equipo': ordered['equipo'].to_numpy(),
+        'temporada': ordered['temporada'].to_numpy(),
+        'mes': ordered['mes'].to_numpy(),
+        'mes_num': ordered['mes_num'].to_numpy(),
+        'day': ordered['day'].to_numpy(),
+        'oponente': ordered['oponente'].to_numpy(),
+        'win': (ordered['resultado_code'] == 'W').to_numpy(dtype=float) * 100,
+        'goal_diff': (goals_for - goals_against).astype(float),
+        'points': result_points(ordered).astype(float),
+    })
+
+    group_keys = ['equipo', 'temporada'] if reset_each_season else ['equipo']
+
+    # Una sola pasada de ventanas móviles agrupadas (sin bucles por equipo)
+    rolled = (
+        base.groupby(group_keys, sort=False)[['win', 'goal_diff', 'points']]
+        .rolling(window, min_periods=min_periods)
+        .mean()
+        .reset_index(level=list(range(len(group_keys))), drop=True)
+        .sort_index()
+    )
+
+    result = base[['equipo', 'temporada', 'mes', 'mes_num', 'day', 'oponente']].copy()
+    result['partido_num'] = base.groupby(group_keys, sort=False).cumcount() + 1
+    result['rolling_win_pct'] = rolled['win']
+    result['rolling_goal_diff'] = rolled['goal_diff']
+    result['rolling_ppg'] = rolled['points']
+
+    return result
+
+
+def latest_form(rolling_df):
+    """
+    Última forma disponible por equipo
+
+    Args:
+        rolling_df (pd.DataFrame): Resultado de compute_rolling_form
+
+    Returns:
+        pd.DataFrame: Una fila por equipo con sus métricas más recientes
+    """
+    latest = rolling_df.groupby('equipo', sort=False).tail(1)
+    return latest.sort_values('equipo').reset_index(drop=True)
+
+
+# ============================================
+# TESTING
+# ============================================
+if __name__ == "__main__":
+    from .match_store import load_match_store
+
+    print("Testing Rolling Form...")
+
+    matches = load_match_store()
+    if matches is None:
+        print("⚠️ No se encontró el CSV de partidos")
+    else:
+        form = compute_rolling_form(matches, window=5)
+        print(latest_form(form)[['equipo', 'temporada', 'rolling_win_pct', 'rolling_ppg']])
+        print("\n✅ Testing completo")
@@ -325,6 +325,38 @@ class AdvancedVisualizations:
 # FUNCIONES DE AYUDA
 # ============================================
 
+def add_performance_bands(fig, bands, opacity=0.15):
+    """
+    Agrega bandas de color de fondo (zonas de rendimiento) a una figura
+
+    Args:
+        fig (go.Figure): Figura de Plotly
+        bands (list): Lista de dicts con 'y0', 'y1', 'color' y opcionalmente
+                      'label' y 'label_color' para la anotación
+        opacity (float): Opacidad de las bandas
+
+    Returns:
+        go.Figure: La misma figura con las bandas agregadas
+    """
+    for band in bands:
+        kwargs = {}
+        if band.get('label'):
+            kwargs = dict(
+                annotation_text=band['label'],
+                annotation_position="left",
+                annotation=dict(font_size=10, font_color=band.get('label_color', 'black'))
+            )
+
+        fig.add_hrect(
+            y0=band['y0'], y1=band['y1'],
+            fillcolor=band['color'], opacity=opacity,
+            layer="below", line_width=0,
+            **kwargs
+        )
+
+    return fig
+
+
 def create_radar(team_name, stats):
     """Función auxiliar para crear radar chart"""
     viz = AdvancedVisualizations()